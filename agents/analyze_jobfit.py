@@ -1,44 +1,17 @@
+import asyncio
+import os
 from states.state import GraphState
+from states.profile_store import get_profile_text
+from cache.response_cache import invoke_cached, ainvoke_cached
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
-from memory_manager.format_recent_msg import format_recent_messages
-import os
-from dotenv import load_dotenv
-load_dotenv()
-
-# llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=os.getenv("google_api_key"))
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0.0,
-    max_retries=2,
-    api_key= os.getenv("groq_api_key")
-    
-)
-def analyze_job_fit(state: GraphState) -> dict:
-    """
-    Compares profile against a job role using a structured System/Human prompt.
-    It uses recent conversation history for context.
-
-    Args:
-        state: The current state of the graph.
-
-    Returns:
-        A dictionary with the job fit report.
-    """
-    print("---AGENT: Executing Job Fit Analyzer---")
+from langchain_core.runnables import RunnableConfig
+from memory_manager.conversation_memory import format_history
+from agents.profile_views import build_profile_view
+from cache.artifact_store import load_profile_text
 
-    profile_text = state.get('profile_text')
-    
-    conversation_history = format_recent_messages(state['messages'])
-
-    if not profile_text:
-        error_message = AIMessage(content="I need your profile data before I can perform a job fit analysis. Please provide your LinkedIn URL first.")
-        return {"messages": [error_message]}
 
-    
-    system_message_template = """
+SYSTEM_PROMPT = """
     You are an expert AI recruitment strategist. Your task is to analyze a user's LinkedIn profile against an industry-standard job description that you will generate.
 
     **Follow these steps precisely:**
@@ -77,7 +50,7 @@ def analyze_job_fit(state: GraphState) -> dict:
     *   Example: "2. **Learn a Cloud Platform:** To fill the cloud technology gap, consider taking a foundational course in AWS or Azure and adding a small deployment project to your portfolio."
     """
 
-    human_message_template = """
+HUMAN_PROMPT = """
     **INPUTS FOR YOUR ANALYSIS:**
     ---
     **Recent Conversation History:**
@@ -88,21 +61,55 @@ def analyze_job_fit(state: GraphState) -> dict:
     ---
     """
 
-    
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_message_template),
-        ("human", human_message_template),
-    ])
+# Built once; only the inputs change from turn to turn.
+PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("human", HUMAN_PROMPT),
+])
 
-    
-    chain = prompt_template | llm
 
-    
-    print("---AGENT: Sending request to LLM for job fit analysis...---")
-    analysis_response = chain.invoke({
+def _missing_profile_reply() -> dict:
+    error_message = AIMessage(content="I need your profile data before I can perform a job fit analysis. Please provide your LinkedIn URL first.")
+    return {"messages": [error_message]}
+
+
+def _build_prompt(state: GraphState) -> tuple:
+    """
+    Builds the inputs of PROMPT_TEMPLATE for the job fit analysis.
+
+    Returns:
+        A (prompt_template, inputs) tuple.
+    """
+    conversation_history = format_history(state)
+
+    return PROMPT_TEMPLATE, {
         "conversation_history": conversation_history,
-        "profile_text": profile_text
-    })
+        "profile_text": build_profile_view(get_profile_text(state), "analyze_job_fit", conversation_history)
+    }
+
+
+def analyze_job_fit(state: GraphState, config: RunnableConfig = None) -> dict:
+    """
+    Compares profile against a job role using a structured System/Human prompt.
+    It uses recent conversation history for context.
+
+    Args:
+        state: The current state of the graph.
+        config: The run config. Set "cache_bypass" in its "configurable"
+            section to skip the response cache.
+
+    Returns:
+        A dictionary with the job fit report.
+    """
+    print("---AGENT: Executing Job Fit Analyzer---")
+
+    if not get_profile_text(state):
+        return _missing_profile_reply()
+
+    prompt_template, inputs = _build_prompt(state)
+
+    print("---AGENT: Sending request to LLM for job fit analysis...---")
+    analysis_response = invoke_cached("analyze_job_fit", prompt_template, inputs, config)
 
     print("---AGENT: Analysis complete.---")
     
@@ -112,6 +119,22 @@ def analyze_job_fit(state: GraphState) -> dict:
     }
 
 
+async def aanalyze_job_fit(state: GraphState, config: RunnableConfig = None) -> dict:
+    """Async variant of `analyze_job_fit`, for graphs run with `ainvoke`/`astream`."""
+    print("---AGENT: Executing Job Fit Analyzer---")
+
+    if not await asyncio.to_thread(get_profile_text, state):
+        return _missing_profile_reply()
+
+    prompt_template, inputs = await asyncio.to_thread(_build_prompt, state)
+
+    print("---AGENT: Sending request to LLM for job fit analysis...---")
+    analysis_response = await ainvoke_cached("analyze_job_fit", prompt_template, inputs, config)
+
+    print("---AGENT: Analysis complete.---")
+    return {"messages": [analysis_response]}
+
+
 def test_job_fit_agent_with_spec_prompt():
     """
     Tests the JobFitAgent that uses the single, spec-compliant prompt.
@@ -119,11 +142,11 @@ def test_job_fit_agent_with_spec_prompt():
     print("--- Starting Test for Spec-Compliant Job Fit Agent ---")
 
     
-    try:
-        with open("agents/formatted_profile.txt", "r") as f:
-            profile_text_for_test = f.read()
-    except FileNotFoundError:
-        print("Error: Create 'formatted_profile.txt' with formatted profile data to run this test.")
+    # Load the profile by URL or content hash from the artifact store (cache/artifact_store.py)
+    profile_text_for_test = load_profile_text(os.getenv("TEST_PROFILE_KEY", ""))
+    if not profile_text_for_test:
+        print("Error: Set TEST_PROFILE_KEY to a profile URL or hash in the artifact store to run this test "
+              "(python -m cache.artifact_store import <file> --url <url>).")
         return
 
 
@@ -1,46 +1,16 @@
+import asyncio
+import os
 from states.state import GraphState
+from states.profile_store import get_profile_text
+from cache.response_cache import invoke_cached, ainvoke_cached
 from langchain_core.messages import AIMessage, HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from memory_manager.format_recent_msg import format_recent_messages
+from agents.profile_views import build_profile_view
+from cache.artifact_store import load_profile_text
 from langchain_core.prompts import ChatPromptTemplate
-import os
-from langchain_groq import ChatGroq
-from dotenv import load_dotenv
-load_dotenv()
-
-# llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=os.getenv("google_api_key"))
-
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0.0,
-    max_retries=2,
-    api_key= os.getenv("groq_api_key")
-    # other params...
-)
-def analyze_profile(state: GraphState) -> dict:
-    """
-    Performs a general analysis of the user's LinkedIn profile using a
-    structured System/Human prompt template.
-
-    Args:
-        state: The current state of the graph.
-
-    Returns:
-        A dictionary with the analysis to update the state's messages.
-    """
-    print("---AGENT: Executing Profile Analyzer---")
-
-    profile_text = state.get('profile_text')
+from langchain_core.runnables import RunnableConfig
 
-    if not profile_text:
-        print("---AGENT: Error - Profile text not found in state.---")
-        error_message = AIMessage(content="It seems I don't have your profile data loaded yet. Please provide your LinkedIn URL first.")
-        return {"messages": [error_message]}
 
-    
-
-    
-    system_message_template = """
+SYSTEM_PROMPT = """
     You are a world-class LinkedIn profile optimization coach. Your tone is encouraging, professional, and highly constructive.
     Your task is to provide a comprehensive critique of the user's LinkedIn profile that they will provide.
 
@@ -71,21 +41,54 @@ def analyze_profile(state: GraphState) -> dict:
 
     Provide your feedback in a clear, well-structured format using Markdown for headings and bullet points.
     """
-    
-    human_message_template = "Here is the user's LinkedIn profile to analyze:\n\n---{profile_text}---"
 
-    
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_message_template),
-        ("human", human_message_template),
-    ])
+HUMAN_PROMPT = "Here is the user's LinkedIn profile to analyze:\n\n---{profile_text}---"
 
-    
-    chain = prompt_template | llm
+# Built once; only the inputs change from turn to turn.
+PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("human", HUMAN_PROMPT),
+])
+
+
+def _missing_profile_reply() -> dict:
+    print("---AGENT: Error - Profile text not found in state.---")
+    error_message = AIMessage(content="It seems I don't have your profile data loaded yet. Please provide your LinkedIn URL first.")
+    return {"messages": [error_message]}
+
+
+def _build_prompt(state: GraphState) -> tuple:
+    """
+    Builds the inputs of PROMPT_TEMPLATE for the analysis.
+
+    Returns:
+        A (prompt_template, inputs) tuple.
+    """
+    return PROMPT_TEMPLATE, {"profile_text": build_profile_view(get_profile_text(state), "analyze_profile")}
+
+
+def analyze_profile(state: GraphState, config: RunnableConfig = None) -> dict:
+    """
+    Performs a general analysis of the user's LinkedIn profile using a
+    structured System/Human prompt template.
+
+    Args:
+        state: The current state of the graph.
+        config: The run config. Set "cache_bypass" in its "configurable"
+            section to skip the response cache.
+
+    Returns:
+        A dictionary with the analysis to update the state's messages.
+    """
+    print("---AGENT: Executing Profile Analyzer---")
+
+    if not get_profile_text(state):
+        return _missing_profile_reply()
+
+    prompt_template, inputs = _build_prompt(state)
 
-    
     print("---AGENT: Sending request to LLM for analysis...---")
-    analysis_response = chain.invoke({"profile_text": profile_text})
+    analysis_response = invoke_cached("analyze_profile", prompt_template, inputs, config)
 
     print("---AGENT: Analysis complete.---")
     
@@ -94,15 +97,31 @@ def analyze_profile(state: GraphState) -> dict:
         "messages": [analysis_response]
     }
 
+
+async def aanalyze_profile(state: GraphState, config: RunnableConfig = None) -> dict:
+    """Async variant of `analyze_profile`, for graphs run with `ainvoke`/`astream`."""
+    print("---AGENT: Executing Profile Analyzer---")
+
+    if not await asyncio.to_thread(get_profile_text, state):
+        return _missing_profile_reply()
+
+    prompt_template, inputs = await asyncio.to_thread(_build_prompt, state)
+
+    print("---AGENT: Sending request to LLM for analysis...---")
+    analysis_response = await ainvoke_cached("analyze_profile", prompt_template, inputs, config)
+
+    print("---AGENT: Analysis complete.---")
+    return {"messages": [analysis_response]}
+
 def test_analyze_profile():
     print("--- Starting Profile Analyzer Test ---")
 
 
-    try:
-        with open("agents/formatted_profile.txt", "r") as f:
-            profile_text_for_test = f.read()
-    except FileNotFoundError:
-        print("Error: Create a file named 'formatted_profile.txt' with the user's formatted profile data to run this test.")
+    # Load the profile by URL or content hash from the artifact store (cache/artifact_store.py)
+    profile_text_for_test = load_profile_text(os.getenv("TEST_PROFILE_KEY", ""))
+    if not profile_text_for_test:
+        print("Error: Set TEST_PROFILE_KEY to a profile URL or hash in the artifact store to run this test "
+              "(python -m cache.artifact_store import <file> --url <url>).")
         return
 
 
@@ -1,45 +1,17 @@
+import asyncio
+import os
 from states.state import GraphState
+from states.profile_store import get_profile_text
+from cache.response_cache import invoke_cached, ainvoke_cached
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
-from memory_manager.format_recent_msg import format_recent_messages
-import os
-from dotenv import load_dotenv
-load_dotenv()
-
-# llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=os.getenv("google_api_key"))
-
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0.0,
-    max_retries=2,
-    api_key= os.getenv("groq_api_key")
-    
-)
-
-def counsel_career(state: GraphState) -> dict:
-    """
-    Identifies skill gaps and provides career advice using a structured
-    System/Human prompt and recent conversation history.
-
-    Args:
-        state: The current state of the graph.
-
-    Returns:
-        A dictionary with the career advice.
-    """
-    print("---AGENT: Executing Career Counselor---")
-
-    profile_text = state.get('profile_text')
-    conversation_history = format_recent_messages(state['messages'])
+from langchain_core.runnables import RunnableConfig
+from memory_manager.conversation_memory import format_history
+from agents.profile_views import build_profile_view
+from cache.artifact_store import load_profile_text
 
-    if not profile_text:
-        error_message = AIMessage(content="I need your profile data before I can provide career advice. Please provide your LinkedIn URL first.")
-        return {"messages": [error_message]}
 
-   
-    system_message_template = """
+SYSTEM_PROMPT = """
     You are a senior career strategist and counselor for tech professionals. Your task is to provide a detailed skill gap analysis and a strategic career plan based on the user's profile and their career aspirations, which you will determine from the recent conversation history.
 
     **Follow these steps precisely:**
@@ -72,7 +44,7 @@ def counsel_career(state: GraphState) -> dict:
     *   Example: "2. **Update Your Profile:** As you learn, begin adding these new skills and project experiences to your LinkedIn to reflect your growth."
     """
 
-    human_message_template = """
+HUMAN_PROMPT = """
     **INPUTS FOR YOUR ANALYSIS:**
     ---
     **Recent Conversation History:**
@@ -83,21 +55,55 @@ def counsel_career(state: GraphState) -> dict:
     ---
     """
 
-    
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_message_template),
-        ("human", human_message_template),
-    ])
+# Built once; only the inputs change from turn to turn.
+PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("human", HUMAN_PROMPT),
+])
 
-    
-    chain = prompt_template | llm
 
-    
-    print("---AGENT: Sending request to LLM for career counseling...---")
-    counseling_response = chain.invoke({
+def _missing_profile_reply() -> dict:
+    error_message = AIMessage(content="I need your profile data before I can provide career advice. Please provide your LinkedIn URL first.")
+    return {"messages": [error_message]}
+
+
+def _build_prompt(state: GraphState) -> tuple:
+    """
+    Builds the inputs of PROMPT_TEMPLATE for the career plan.
+
+    Returns:
+        A (prompt_template, inputs) tuple.
+    """
+    conversation_history = format_history(state)
+
+    return PROMPT_TEMPLATE, {
         "conversation_history": conversation_history,
-        "profile_text": profile_text
-    })
+        "profile_text": build_profile_view(get_profile_text(state), "counsel_career", conversation_history)
+    }
+
+
+def counsel_career(state: GraphState, config: RunnableConfig = None) -> dict:
+    """
+    Identifies skill gaps and provides career advice using a structured
+    System/Human prompt and recent conversation history.
+
+    Args:
+        state: The current state of the graph.
+        config: The run config. Set "cache_bypass" in its "configurable"
+            section to skip the response cache.
+
+    Returns:
+        A dictionary with the career advice.
+    """
+    print("---AGENT: Executing Career Counselor---")
+
+    if not get_profile_text(state):
+        return _missing_profile_reply()
+
+    prompt_template, inputs = _build_prompt(state)
+
+    print("---AGENT: Sending request to LLM for career counseling...---")
+    counseling_response = invoke_cached("counsel_career", prompt_template, inputs, config)
 
     print("---AGENT: Career counseling complete.---")
     
@@ -107,6 +113,21 @@ def counsel_career(state: GraphState) -> dict:
     }
 
 
+async def acounsel_career(state: GraphState, config: RunnableConfig = None) -> dict:
+    """Async variant of `counsel_career`, for graphs run with `ainvoke`/`astream`."""
+    print("---AGENT: Executing Career Counselor---")
+
+    if not await asyncio.to_thread(get_profile_text, state):
+        return _missing_profile_reply()
+
+    prompt_template, inputs = await asyncio.to_thread(_build_prompt, state)
+
+    print("---AGENT: Sending request to LLM for career counseling...---")
+    counseling_response = await ainvoke_cached("counsel_career", prompt_template, inputs, config)
+
+    print("---AGENT: Career counseling complete.---")
+    return {"messages": [counseling_response]}
+
 
 def test_career_counselor_agent():
     """
@@ -115,11 +136,11 @@ def test_career_counselor_agent():
     print("--- Starting Test for Career Counselor Agent ---")
 
     # Load the profile text from our test file
-    try:
-        with open("agents/formatted_profile.txt", "r") as f:
-            profile_text_for_test = f.read()
-    except FileNotFoundError:
-        print("Error: Create 'formatted_profile.txt' to run this test.")
+    # Load the profile by URL or content hash from the artifact store (cache/artifact_store.py)
+    profile_text_for_test = load_profile_text(os.getenv("TEST_PROFILE_KEY", ""))
+    if not profile_text_for_test:
+        print("Error: Set TEST_PROFILE_KEY to a profile URL or hash in the artifact store to run this test "
+              "(python -m cache.artifact_store import <file> --url <url>).")
         return
 
     # --- Test Scenario: User asks for advice on a specific career transition ---
@@ -1,45 +1,17 @@
+import asyncio
+import os
 from states.state import GraphState
+from states.profile_store import get_profile_text
+from cache.response_cache import invoke_cached, ainvoke_cached
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_groq import ChatGroq
-from memory_manager.format_recent_msg import format_recent_messages
-import os
-from dotenv import load_dotenv
-load_dotenv()
-
-# llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=os.getenv("google_api_key"))
-
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0.0,
-    max_retries=2,
-    api_key= os.getenv("groq_api_key")
-    # other params...
-)
+from langchain_core.runnables import RunnableConfig
+from memory_manager.conversation_memory import format_history
+from agents.profile_views import build_profile_view
+from cache.artifact_store import load_profile_text
 
 
-def enhance_content(state: GraphState) -> dict:
-    """
-    Rewrites a specific section of the user's LinkedIn profile using a
-    structured System/Human prompt and recent conversation history.
-
-    Args:
-        state: The current state of the graph.
-
-    Returns:
-        A dictionary with the rewritten content.
-    """
-    print("---AGENT: Executing Content Enhancer---")
-
-    profile_text = state.get('profile_text')
-    conversation_history = format_recent_messages(state['messages'])
-
-    if not profile_text:
-        error_message = AIMessage(content="I need your profile data before I can rewrite a section. Please provide your LinkedIn URL first.")
-        return {"messages": [error_message]}
-
-    
-    system_message_template = """
+SYSTEM_PROMPT = """
     You are an expert LinkedIn profile copywriter and career coach. Your task is to rewrite a section of the user's profile based on their request, which you will find in the conversation history.
     Your goal is to make the section more impactful, achievement-oriented, and aligned with industry best practices.
 
@@ -58,7 +30,7 @@ def enhance_content(state: GraphState) -> dict:
         *   After providing the rewritten content, add a brief "Why it's better:" section explaining the key improvements you made (e.g., "Used stronger action verbs," "Added quantifiable impact," "Included keywords for your target role.").
     """
 
-    human_message_template = """
+HUMAN_PROMPT = """
     **INPUTS FOR YOUR ANALYSIS:**
     ---
     **Recent Conversation History:**
@@ -69,21 +41,56 @@ def enhance_content(state: GraphState) -> dict:
     ---
     """
 
-    
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_message_template),
-        ("human", human_message_template),
-    ])
+# Built once; only the inputs change from turn to turn.
+PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("human", HUMAN_PROMPT),
+])
 
-    
-    chain = prompt_template | llm
 
-    
-    print("---AGENT: Sending request to LLM for content enhancement...---")
-    enhancement_response = chain.invoke({
+def _missing_profile_reply() -> dict:
+    error_message = AIMessage(content="I need your profile data before I can rewrite a section. Please provide your LinkedIn URL first.")
+    return {"messages": [error_message]}
+
+
+def _build_prompt(state: GraphState) -> tuple:
+    """
+    Builds the inputs of PROMPT_TEMPLATE for the rewrite.
+
+    Returns:
+        A (prompt_template, inputs) tuple.
+    """
+    conversation_history = format_history(state)
+    request = next((message.content for message in reversed(state["messages"]) if message.type == "human"), "")
+
+    return PROMPT_TEMPLATE, {
         "conversation_history": conversation_history,
-        "profile_text": profile_text
-    })
+        "profile_text": build_profile_view(get_profile_text(state), "enhance_content", request)
+    }
+
+
+def enhance_content(state: GraphState, config: RunnableConfig = None) -> dict:
+    """
+    Rewrites a specific section of the user's LinkedIn profile using a
+    structured System/Human prompt and recent conversation history.
+
+    Args:
+        state: The current state of the graph.
+        config: The run config. Set "cache_bypass" in its "configurable"
+            section to skip the response cache.
+
+    Returns:
+        A dictionary with the rewritten content.
+    """
+    print("---AGENT: Executing Content Enhancer---")
+
+    if not get_profile_text(state):
+        return _missing_profile_reply()
+
+    prompt_template, inputs = _build_prompt(state)
+
+    print("---AGENT: Sending request to LLM for content enhancement...---")
+    enhancement_response = invoke_cached("enhance_content", prompt_template, inputs, config)
 
     print("---AGENT: Content enhancement complete.---")
     
@@ -93,6 +100,22 @@ def enhance_content(state: GraphState) -> dict:
     }
 
 
+async def aenhance_content(state: GraphState, config: RunnableConfig = None) -> dict:
+    """Async variant of `enhance_content`, for graphs run with `ainvoke`/`astream`."""
+    print("---AGENT: Executing Content Enhancer---")
+
+    if not await asyncio.to_thread(get_profile_text, state):
+        return _missing_profile_reply()
+
+    prompt_template, inputs = await asyncio.to_thread(_build_prompt, state)
+
+    print("---AGENT: Sending request to LLM for content enhancement...---")
+    enhancement_response = await ainvoke_cached("enhance_content", prompt_template, inputs, config)
+
+    print("---AGENT: Content enhancement complete.---")
+    return {"messages": [enhancement_response]}
+
+
 # In your test file (e.g., agent_test.py)
 
 def test_content_enhancer_agent_corrected():
@@ -102,11 +125,11 @@ def test_content_enhancer_agent_corrected():
     print("--- Starting Test for CORRECTED Content Enhancer Agent ---")
 
     # Load the profile text from our test file
-    try:
-        with open("agents/formatted_profile.txt", "r") as f:
-            profile_text_for_test = f.read()
-    except FileNotFoundError:
-        print("Error: Create 'formatted_profile.txt' to run this test.")
+    # Load the profile by URL or content hash from the artifact store (cache/artifact_store.py)
+    profile_text_for_test = load_profile_text(os.getenv("TEST_PROFILE_KEY", ""))
+    if not profile_text_for_test:
+        print("Error: Set TEST_PROFILE_KEY to a profile URL or hash in the artifact store to run this test "
+              "(python -m cache.artifact_store import <file> --url <url>).")
         return
 
     # --- SCENARIO 1: General enhancement request ---
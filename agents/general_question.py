@@ -1,20 +1,18 @@
 from states.state import GraphState
+from llm.registry import get_llm
+from memory_manager.conversation_memory import split_history
 from langchain_core.messages import AIMessage, HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
-import os
-from dotenv import load_dotenv
-load_dotenv()
-
-# llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=os.getenv("google_api_key"))
-
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0.0,
-    max_retries=2,
-    api_key= os.getenv("groq_api_key")
-    
-)
+
+
+def _build_prompt(state: GraphState) -> list:
+    """The instructions, the rolling summary and the recent window (within MEMORY_TOKEN_BUDGET)."""
+    summary, _, window = split_history(state)
+    prompt_messages = [
+        AIMessage(content="You are a helpful and friendly AI career coach. Answer the user's general question."),
+    ]
+    if summary:
+        prompt_messages.append(AIMessage(content=f"Summary of our earlier conversation: {summary}"))
+    return prompt_messages + window
 
 
 def general_question(state: GraphState) -> dict:
@@ -28,17 +26,20 @@ def general_question(state: GraphState) -> dict:
         A dictionary with the AI's chat response.
     """
     print("---AGENT: Handling General Question---")
-    
-    
-    convo = state['messages'][-4:]
-    
-    prompt_messages = [
-        AIMessage(content="You are a helpful and friendly AI career coach. Answer the user's general question."),
-    ] + state['messages']
 
-    response = llm.invoke(prompt_messages)
+    prompt_messages = _build_prompt(state)
+
+    response = get_llm("general_question").invoke(prompt_messages)
     
     return {"messages": [response]}
 
 
+async def ageneral_question(state: GraphState) -> dict:
+    """Async variant of `general_question`, for graphs run with `ainvoke`/`astream`."""
+    print("---AGENT: Handling General Question---")
 
+    prompt_messages = _build_prompt(state)
+
+    response = await get_llm("general_question").ainvoke(prompt_messages)
+
+    return {"messages": [response]}
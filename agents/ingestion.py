@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.linkedin_scraper import linkedin_scraper, format_profile_data
+
+QUEUED = "queued"
+SCRAPING = "scraping"
+FORMATTING = "formatting"
+READY = "ready"
+FAILED = "failed"
+
+# Scrapes running at once across every session of this process; further jobs wait in the queue.
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "4"))
+# Finished jobs kept for status lookups before the oldest are forgotten.
+MAX_FINISHED_JOBS = 1000
+
+_executor = ThreadPoolExecutor(max_workers=INGESTION_WORKERS, thread_name_prefix="ingestion")
+_jobs = {}
+_lock = threading.Lock()
+
+
+def _update(job_id: str, **fields) -> None:
+    with _lock:
+        _jobs[job_id].update(fields, updated_at=time.time())
+
+
+def _run(job_id: str, profile_url: str, on_ready) -> None:
+    try:
+        _update(job_id, status=SCRAPING)
+        raw_data = linkedin_scraper(profile_url)
+        if not raw_data:
+            _update(job_id, status=FAILED, error="Failed to scrape profile.")
+            return
+        _update(job_id, status=FORMATTING)
+        profile_text = format_profile_data(raw_data, profile_url=profile_url)
+        if not profile_text:
+            _update(job_id, status=FAILED, error="Could not format profile data.")
+            return
+        if on_ready:
+            on_ready(profile_text)
+        _update(job_id, status=READY, profile_text=profile_text)
+    except Exception as e:
+        print(f"---INGESTION: Job {job_id} failed: {e}---")
+        _update(job_id, status=FAILED, error=str(e))
+    finally:
+        _prune()
+
+
+def _prune() -> None:
+    with _lock:
+        finished = sorted(
+            (job["updated_at"], job_id) for job_id, job in _jobs.items() if job["status"] in (READY, FAILED)
+        )
+        for _, job_id in finished[:-MAX_FINISHED_JOBS]:
+            del _jobs[job_id]
+
+
+def submit_ingestion(profile_url: str, on_ready=None) -> str:
+    """
+    Queues a profile to be scraped and formatted in the background.
+
+    Args:
+        profile_url: The linkedin.com/in/ URL of the profile.
+        on_ready: Optional callback run on the worker with the formatted
+            profile text before the job is marked ready, e.g. to create the
+            episode's thread.
+
+    Returns:
+        The job ID to pass to `get_job`.
+    """
+    job_id = str(uuid.uuid4())
+    now = time.time()
+    with _lock:
+        _jobs[job_id] = {
+            "job_id": job_id,
+            "profile_url": profile_url,
+            "status": QUEUED,
+            "error": None,
+            "profile_text": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+    _executor.submit(_run, job_id, profile_url, on_ready)
+    return job_id
+
+
+def get_job(job_id: str):
+    """
+    Returns a snapshot of a job.
+
+    Returns:
+        A dictionary with the job's `status` (queued, scraping, formatting,
+        ready or failed), `error` and `profile_text`, or None if the job is
+        unknown.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
+
+
+def get_stats() -> dict:
+    """Returns the number of jobs in each status."""
+    with _lock:
+        counts = {status: 0 for status in (QUEUED, SCRAPING, FORMATTING, READY, FAILED)}
+        for job in _jobs.values():
+            counts[job["status"]] += 1
+    return counts
@@ -0,0 +1,285 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import NamedTuple
+
+# The examples shown to the LLM in the router's classification prompt. They
+# double as the seed training set for the local classifier, so the two tiers
+# always agree on what each category looks like.
+SEED_EXAMPLES = {
+    "analyze_profile": ["review my profile", "what do you think of my LinkedIn?", "give me feedback"],
+    "analyze_job_fit": ["compare me to a data scientist", "am I a good fit for a project manager role?", "how do I stack up for this job?"],
+    "enhance_content": ["help me rewrite my summary", "can you make my headline better?", "improve this job description"],
+    "counsel_career": ["what should I learn next?", "how do I transition into AI?", "what skills am I missing for a PM role?"],
+    "end_session": ["thanks, that's all for now", "goodbye", "perfect, thank you!"],
+    "general_question": ["hi", "what can you do?", "how does this work?"],
+}
+
+# Held-out messages, never trained on, used to calibrate the fast-path threshold.
+HELD_OUT_EXAMPLES = [
+    ("can you look over my linkedin profile", "analyze_profile"),
+    ("what's weak about my profile?", "analyze_profile"),
+    ("rate my profile out of ten", "analyze_profile"),
+    ("give me honest feedback on my linkedin", "analyze_profile"),
+    ("is my profile good enough for recruiters?", "analyze_profile"),
+    ("am I qualified for a senior data engineer job?", "analyze_job_fit"),
+    ("how well do I fit this product manager posting?", "analyze_job_fit"),
+    ("compare my profile to a machine learning engineer role", "analyze_job_fit"),
+    ("would I be a good fit for a data analyst position?", "analyze_job_fit"),
+    ("how do I stack up against this job description?", "analyze_job_fit"),
+    ("rewrite my headline", "enhance_content"),
+    ("can you improve my about section?", "enhance_content"),
+    ("make my summary more impactful", "enhance_content"),
+    ("help me rewrite the description of my last job", "enhance_content"),
+    ("polish my experience section", "enhance_content"),
+    ("what certifications should I get next?", "counsel_career"),
+    ("how can I move into product management?", "counsel_career"),
+    ("which skills should I learn for a data science career?", "counsel_career"),
+    ("what should I focus on to become a team lead?", "counsel_career"),
+    ("how do I transition from marketing into tech?", "counsel_career"),
+    ("thanks a lot, that's all", "end_session"),
+    ("thank you, bye", "end_session"),
+    ("great, that's everything for now", "end_session"),
+    ("bye", "end_session"),
+    ("hello there", "general_question"),
+    ("who are you?", "general_question"),
+    ("what can you help me with?", "general_question"),
+    ("how does this tool work?", "general_question"),
+    ("help", "general_question"),
+    ("good", "general_question"),
+    ("ok", "general_question"),
+    ("hmm", "general_question"),
+]
+
+_HELD_OUT_TEXTS = frozenset(text for text, _ in HELD_OUT_EXAMPLES)
+
+TRAFFIC_LOG_PATH = os.getenv("ROUTER_TRAFFIC_LOG", "router_traffic.jsonl")
+# When the traffic log reaches this size it is moved to "<path>.1" (replacing
+# the previous one) and a new log is started; 0 disables logging.
+TRAFFIC_LOG_MAX_BYTES = int(os.getenv("ROUTER_TRAFFIC_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+# Minimum confidence for the fast path. Unset, it is calibrated on
+# HELD_OUT_EXAMPLES when the classifier is trained: the lowest threshold at
+# which at least FAST_PATH_MIN_PRECISION of the held-out fast-path routes are right.
+CONFIDENCE_THRESHOLD = float(os.environ["ROUTER_FAST_PATH_THRESHOLD"]) if os.getenv("ROUTER_FAST_PATH_THRESHOLD") else None
+FAST_PATH_MIN_PRECISION = float(os.getenv("ROUTER_FAST_PATH_MIN_PRECISION", "0.95"))
+# A message must also share this many terms with the winning category and
+# reach this cosine similarity, so a single shared word never routes it.
+MIN_MATCHED_TERMS = int(os.getenv("ROUTER_FAST_PATH_MIN_TERMS", "2"))
+MIN_SIMILARITY = float(os.getenv("ROUTER_FAST_PATH_MIN_SIMILARITY", "0.3"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def _features(text: str) -> Counter:
+    """Word unigrams and bigrams of the case-folded text."""
+    words = _TOKEN_RE.findall(text.casefold())
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return features
+
+
+class _Model(NamedTuple):
+    """The classifier's precomputed weights; replaced as a whole when examples are added."""
+    num_docs: int
+    idf: dict
+    centroids: dict
+
+
+class IntentClassifier:
+    """
+    A TF-IDF nearest-centroid classifier over word n-grams.
+
+    Each category keeps the summed term counts of its examples. A message is
+    scored by cosine similarity against every category centroid. The
+    confidence is the relative margin between the best and the runner-up
+    score, scaled by how much of the message the winning category has seen
+    before. It is 0 unless the message shares at least `min_terms` terms
+    with the winning category and reaches `min_similarity`, so ambiguous,
+    unfamiliar or one-word messages are left to the LLM.
+
+    The normalized centroids are rebuilt when examples are added, not on
+    every prediction, so `predict` only reads them and takes no lock.
+    """
+
+    def __init__(self, threshold: float = 0.5, min_terms: int = MIN_MATCHED_TERMS,
+                 min_similarity: float = MIN_SIMILARITY):
+        self.threshold = threshold
+        self.min_terms = min_terms
+        self.min_similarity = min_similarity
+        self._class_terms = defaultdict(Counter)
+        self._doc_freq = Counter()
+        self._num_docs = 0
+        self._lock = threading.Lock()
+        self._model = _Model(0, {}, {})
+
+    def add_example(self, text: str, route: str) -> None:
+        self.add_examples([(text, route)])
+
+    def add_examples(self, examples) -> None:
+        """Trains on (text, route) pairs and rebuilds the centroids once."""
+        with self._lock:
+            for text, route in examples:
+                features = _features(text)
+                if not features:
+                    continue
+                self._class_terms[route].update(features)
+                self._doc_freq.update(features.keys())
+                self._num_docs += 1
+            idf = {term: math.log((1 + self._num_docs) / (1 + df)) + 1.0 for term, df in self._doc_freq.items()}
+            centroids = {route: _normalize(terms, idf, self._num_docs) for route, terms in self._class_terms.items()}
+            self._model = _Model(self._num_docs, idf, centroids)
+
+    def predict(self, text: str) -> tuple:
+        """
+        Scores a message against every category.
+
+        Returns:
+            A (route, confidence) tuple. The route is the best matching
+            category and the confidence is in [0, 1].
+        """
+        features = _features(text)
+        model = self._model
+        if not features or not model.centroids:
+            return None, 0.0
+        query = _normalize(features, model.idf, model.num_docs)
+        scores = []
+        for route, centroid in model.centroids.items():
+            matched = [term for term in query if term in centroid]
+            score = sum(query[term] * centroid[term] for term in matched)
+            coverage = sum(query[term] ** 2 for term in matched)
+            scores.append((score, coverage, len(matched), route))
+        scores.sort(reverse=True)
+        best_score, coverage, matched, best_route = scores[0]
+        if best_score <= 0.0:
+            return None, 0.0
+        if matched < self.min_terms or best_score < self.min_similarity:
+            return best_route, 0.0
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        return best_route, (best_score - runner_up) / best_score * coverage
+
+
+def _normalize(counts: Counter, idf: dict, num_docs: int) -> dict:
+    unseen_idf = math.log(1 + num_docs) + 1.0
+    weights = {term: (1 + math.log(count)) * idf.get(term, unseen_idf) for term, count in counts.items()}
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    return {term: w / norm for term, w in weights.items()}
+
+
+def calibrate_threshold(classifier: IntentClassifier, examples, min_precision: float = 0.95) -> tuple:
+    """
+    Picks the lowest confidence threshold at which the fast path is right at
+    least `min_precision` of the time on labelled (text, route) examples the
+    classifier was not trained on.
+
+    Returns:
+        A (threshold, precision, coverage) tuple; coverage is the share of
+        the examples that would skip the LLM.
+    """
+    predictions = [(classifier.predict(text), route) for text, route in examples]
+    candidates = sorted({confidence for (_, confidence), _ in predictions if confidence > 0.0})
+    for threshold in candidates:
+        taken = [(predicted, route) for (predicted, confidence), route in predictions if confidence >= threshold]
+        precision = sum(predicted == route for predicted, route in taken) / len(taken)
+        if precision >= min_precision:
+            return threshold, precision, len(taken) / len(examples)
+    return 1.0, 1.0, 0.0
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+_stats = {"requests": 0, "fast_path_hits": 0, "llm_fallbacks": 0}
+_stats_lock = threading.Lock()
+
+
+def get_classifier() -> IntentClassifier:
+    """Returns the process-wide classifier, training it on first use."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                classifier = IntentClassifier()
+                seeds = [(example, route) for route, examples in SEED_EXAMPLES.items() for example in examples]
+                classifier.add_examples(seeds + [item for item in _load_traffic_log() if item[0] not in _HELD_OUT_TEXTS])
+                if CONFIDENCE_THRESHOLD is not None:
+                    classifier.threshold = CONFIDENCE_THRESHOLD
+                else:
+                    classifier.threshold, _, _ = calibrate_threshold(classifier, HELD_OUT_EXAMPLES, FAST_PATH_MIN_PRECISION)
+                _classifier = classifier
+    return _classifier
+
+
+def _load_traffic_log():
+    for path in (TRAFFIC_LOG_PATH + ".1", TRAFFIC_LOG_PATH):
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get("route") in SEED_EXAMPLES and record.get("text"):
+                        yield record["text"], record["route"]
+        except FileNotFoundError:
+            continue
+
+
+_log_lock = threading.Lock()
+
+
+def _append_traffic_log(record: dict) -> None:
+    if TRAFFIC_LOG_MAX_BYTES <= 0:
+        return
+    with _log_lock:
+        try:
+            if os.path.exists(TRAFFIC_LOG_PATH) and os.path.getsize(TRAFFIC_LOG_PATH) >= TRAFFIC_LOG_MAX_BYTES:
+                os.replace(TRAFFIC_LOG_PATH, TRAFFIC_LOG_PATH + ".1")
+            with open(TRAFFIC_LOG_PATH, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"---ROUTER: Could not write traffic log: {e}---")
+
+
+def classify(text: str) -> tuple:
+    """
+    Tries to route a message locally.
+
+    Args:
+        text: The user's latest message.
+
+    Returns:
+        A (route, confidence) tuple. The route is None when the confidence
+        is below the threshold and the LLM should decide instead.
+    """
+    classifier = get_classifier()
+    route, confidence = classifier.predict(text)
+    with _stats_lock:
+        _stats["requests"] += 1
+        if route is not None and confidence >= classifier.threshold:
+            _stats["fast_path_hits"] += 1
+        else:
+            _stats["llm_fallbacks"] += 1
+            route = None
+    return route, confidence
+
+
+def record_llm_decision(text: str, route: str) -> None:
+    """
+    Learns from a decision made by the LLM router and appends it to the
+    traffic log (rotated at TRAFFIC_LOG_MAX_BYTES) so that future processes
+    start with it.
+    """
+    if route not in SEED_EXAMPLES or not text or text in _HELD_OUT_TEXTS:
+        return
+    get_classifier().add_example(text, route)
+    _append_traffic_log({"text": text, "route": route})
+
+
+def get_stats() -> dict:
+    """Returns fast-path counters and the share of LLM round trips saved."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["hit_rate"] = stats["fast_path_hits"] / stats["requests"] if stats["requests"] else 0.0
+    return stats
@@ -1,155 +1,164 @@
-from apify_client import ApifyClient
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 load_dotenv()
 
-client = ApifyClient(os.getenv("APIFY_API_TOKEN"))
-# In your scraper file
+from cache import profile_cache
+from agents.scraper_backends import LINKEDIN_COOKIE_PATH, get_backend, item_profile_url
+# Re-exported: callers import the formatter from here alongside the scraper.
+from agents.profile_parser import format_profile_data
 
-def linkedin_scraper(profile_url: str) -> dict: 
+# URLs sent to one actor run by `linkedin_scraper_batch`, and how many runs may go at once.
+SCRAPER_BATCH_SIZE = int(os.getenv("SCRAPER_BATCH_SIZE", "25"))
+SCRAPER_MAX_PARALLEL_RUNS = int(os.getenv("SCRAPER_MAX_PARALLEL_RUNS", "3"))
+
+def linkedin_scraper(profile_url: str, use_cache: bool = True) -> dict:
     """
-    Scrapes a single LinkedIn profile using the provided URL.
+    Returns the raw data for a single LinkedIn profile.
+
+    Args:
+        profile_url: The linkedin.com/in/ URL of the profile.
+        use_cache: Serve the profile from the persistent profile cache when
+            possible (see cache/profile_cache.py). False always scrapes and
+            replaces the cached copy.
     """
-    # Load cookies from a JSON file
+    if use_cache:
+        return profile_cache.get_profile(profile_url, _scrape_profile)
+    item = _scrape_profile(profile_url)
+    profile_cache.store_profile(profile_url, item)
+    return item
+
 
+def _load_cookies():
+    if not get_backend().needs_cookies:
+        return []
     try:
-        with open("unit_test/cookie.json", "r") as f:
-            cookies = json.load(f)
+        with open(LINKEDIN_COOKIE_PATH, "r") as f:
+            return json.load(f)
     except FileNotFoundError:
-        print("ERROR: cookie.json not found. Please ensure it's in the 'unit_test' directory.")
+        print(f"ERROR: {LINKEDIN_COOKIE_PATH} not found. Please export your LinkedIn cookies there or set LINKEDIN_COOKIE_PATH.")
         return None
 
-    
 
- 
+def _run_actor(urls: list, cookies) -> dict:
     run_input = {
         "cookie": cookies,
         "minDelay": 15,
         "maxDelay": 60,
         "proxy": {"useApifyProxy": True, "apifyProxyCountry": "US"},
-        "urls": [profile_url], 
+        "urls": urls,
     }
+    return get_backend().call(run_input)
+
+
+def _scrape_profile(profile_url: str) -> dict:
+    """
+    Scrapes a single LinkedIn profile using the provided URL.
+    """
+    cookies = _load_cookies()
+    if cookies is None:
+        return None
 
     print("Running Apify actor... This may take a moment.")
-    run = client.actor("curious_coder/linkedin-profile-scraper").call(run_input=run_input)
+    run = _run_actor([profile_url], cookies)
 
-    print("💾 Check your data here: https://console.apify.com/storage/datasets/" + run["defaultDatasetId"])
-    
-    # Fetch the result. This is a more robust way to get the item.
-    dataset_items = list(client.dataset(run["defaultDatasetId"]).iterate_items())
-    if not dataset_items:
+    # Only the first item is needed, so stop reading the dataset there.
+    item = next(iter(get_backend().iterate_items(run["defaultDatasetId"])), None)
+    if not item:
         print("ERROR: Apify did not return any profile data. The URL might be invalid, private, or the session cookie may have expired.")
         return None
-        
-    return dataset_items[0]
 
-def format_profile_data(item: dict) -> str:
+    return item
+
+
+def _scrape_chunk(urls: list, cookies, on_profile=None) -> tuple:
+    """
+    Scrapes up to one chunk of URLs in a single actor run.
+
+    Returns:
+        A (profiles, failures) tuple of dicts keyed by input URL.
+    """
+    by_key = {profile_cache.canonical_profile_url(url): url for url in urls}
+    profiles, failures = {}, {}
+    try:
+        run = _run_actor(urls, cookies)
+    except Exception as e:
+        return profiles, {url: f"Actor run failed: {e}" for url in urls}
+
+    # Items are streamed page by page and matched to their input URL as they arrive.
+    for item in get_backend().iterate_items(run["defaultDatasetId"]):
+        key = profile_cache.canonical_profile_url(item_profile_url(item) or "")
+        if key not in by_key and len(urls) == 1:
+            key = next(iter(by_key))
+        url = by_key.get(key)
+        if url is None or url in profiles:
+            continue
+        profiles[url] = item
+        profile_cache.store_profile(url, item)
+        if on_profile:
+            on_profile(url, item)
+
+    reason = "No data returned. The URL might be invalid or private, or the session cookie may have expired."
+    if run.get("status") not in (None, "SUCCEEDED"):
+        reason = f"Actor run ended with status {run['status']}"
+    for url in urls:
+        if url not in profiles:
+            failures[url] = reason
+    return profiles, failures
+
+
+def linkedin_scraper_batch(profile_urls: list, chunk_size: int = None, max_parallel_runs: int = None,
+                           use_cache: bool = True, on_profile=None) -> tuple:
     """
-    Extracts key information from the raw Apify profile data and formats it
-    into a clean, readable string for LLM processing.
+    Scrapes many LinkedIn profiles, several URLs per actor run.
 
     Args:
-        item: The raw dictionary containing the scraped LinkedIn profile data.
+        profile_urls: The linkedin.com/in/ URLs to scrape. Duplicates (in
+            any URL form) are scraped once.
+        chunk_size: URLs per actor run; defaults to SCRAPER_BATCH_SIZE.
+        max_parallel_runs: Actor runs in flight at once; defaults to
+            SCRAPER_MAX_PARALLEL_RUNS.
+        use_cache: Take profiles that are still fresh from the profile cache
+            instead of scraping them.
+        on_profile: Optional callback called with (url, item) as soon as
+            each profile arrives.
 
     Returns:
-        A formatted string containing the cleaned-up profile information.
+        A (profiles, failures) tuple: raw profile dicts keyed by input URL,
+        and the reason each remaining URL could not be scraped.
     """
-    
-    
-    first_name = item.get('firstName', '')
-    last_name = item.get('lastName', '')
-    full_name = f"{first_name} {last_name}".strip()
-    headline = item.get('headline', 'N/A')
-
-    formatted_string = f"**Profile for {full_name}**\n\n"
-    formatted_string += f"**Headline:** {headline}\n\n"
-
-    
-    summary = item.get('summary', 'N/A')
-    formatted_string += f"**Summary (About Section):**\n{summary}\n\n"
-
-    
-    formatted_string += "**Experience:**\n\n"
-    positions = item.get('positions', [])
-    if not positions:
-        formatted_string += "No professional experience listed.\n\n"
-    else:
-        for i, pos in enumerate(positions, 1):
-            title = pos.get('title', 'N/A')
-            company_name = pos.get('companyName', 'N/A')
-            
-            
-            time_period_str = "Present"
-            time_period = pos.get('timePeriod', {})
-            if time_period:
-                start_date = time_period.get('startDate', {})
-                start_month = start_date.get('month')
-                start_year = start_date.get('year')
-                
-                end_date = time_period.get('endDate', {})
-                end_month = end_date.get('month')
-                end_year = end_date.get('year')
-
-                start_str = f"{start_month}/{start_year}" if start_month and start_year else "N/A"
-                end_str = f"{end_month}/{end_year}" if end_month and end_year else "Present"
-                time_period_str = f"{start_str} - {end_str}"
-
-            formatted_string += f"{i}. **{title}** at {company_name} ({time_period_str})\n"
-            
-            description = pos.get('description', '[No description provided]').strip()
-            
-            formatted_description = "\n".join([f"    * {line}" for line in description.split('\n')])
-            formatted_string += f"{formatted_description}\n\n"
-
-    
-    formatted_string += "**Education:**\n\n"
-    educations = item.get('educations', [])
-    if not educations:
-        formatted_string += "No education listed.\n\n"
-    else:
-        for edu in educations:
-            degree = edu.get('degreeName', '')
-            school = edu.get('schoolName', 'N/A')
-            field = edu.get('fieldOfStudy')
-            
-            
-            time_period = edu.get('timePeriod', {})
-            start_year = time_period.get('startDate', {}).get('year', '')
-            end_year = time_period.get('endDate', {}).get('year', '')
-            date_range = f"({start_year} - {end_year})" if start_year and end_year else ""
-
-            edu_str = f"*   **{degree}**"
-            if field:
-                edu_str += f" in {field}"
-            edu_str += f" - {school} {date_range}\n"
-            formatted_string += edu_str
-        formatted_string += "\n"
-
-    
-    formatted_string += "**Top Skills:**\n"
-    skills = item.get('skills', [])
-    if not skills:
-        formatted_string += "No skills listed.\n"
-    else:
-        for skill in skills:
-            formatted_string += f"*   {skill}\n"
-    formatted_string += "\n"
-
-    
-    formatted_string += "**Certifications:**\n"
-    certifications = item.get('certifications', [])
-    if not certifications:
-        formatted_string += "No certifications listed.\n"
-    else:
-        for cert in certifications:
-            name = cert.get('name', 'N/A')
-            authority = cert.get('authority', '')
-            cert_str = f"*   {name}"
-            if authority:
-                cert_str += f" ({authority})"
-            formatted_string += f"{cert_str}\n"
-    f = open(f"agents/{first_name}_formatted_profile.txt", "w")
-    f.write(formatted_string)
-    f.close()        
-    return formatted_string.strip()
\ No newline at end of file
+    chunk_size = chunk_size or SCRAPER_BATCH_SIZE
+    max_parallel_runs = max_parallel_runs or SCRAPER_MAX_PARALLEL_RUNS
+    profiles, failures, pending, seen = {}, {}, [], set()
+    for url in profile_urls:
+        key = profile_cache.canonical_profile_url(url)
+        if key is None:
+            failures[url] = "Not a linkedin.com/in/ profile URL"
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        item = profile_cache.get_fresh_profile(url) if use_cache else None
+        if item is not None:
+            profiles[url] = item
+            if on_profile:
+                on_profile(url, item)
+        else:
+            pending.append(url)
+    if not pending:
+        return profiles, failures
+
+    cookies = _load_cookies()
+    if cookies is None:
+        failures.update({url: f"{LINKEDIN_COOKIE_PATH} not found" for url in pending})
+        return profiles, failures
+
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    print(f"Running {len(chunks)} Apify actor run(s) for {len(pending)} profile(s)...")
+    with ThreadPoolExecutor(max_workers=max_parallel_runs, thread_name_prefix="apify-batch") as executor:
+        for chunk_profiles, chunk_failures in executor.map(lambda chunk: _scrape_chunk(chunk, cookies, on_profile), chunks):
+            profiles.update(chunk_profiles)
+            failures.update(chunk_failures)
+    print(f"Scraped {len(profiles)} profile(s); {len(failures)} failed.")
+    return profiles, failures
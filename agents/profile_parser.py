@@ -1,107 +1,191 @@
-def format_profile_data(item: dict) -> str:
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional, Tuple
+
+# Save the raw and formatted profile to the artifact store (cache/artifact_store.py)
+# whenever a profile is formatted with its URL. Set to 0 to skip.
+PROFILE_ARTIFACTS = os.getenv("PROFILE_ARTIFACTS", "1").lower() not in ("0", "false", "no")
+
+_writer = None
+
+
+class Position(NamedTuple):
+    title: str
+    company: str
+    period: str
+    description: str
+
+
+class Education(NamedTuple):
+    degree: str
+    school: str
+    field: Optional[str]
+    date_range: str
+
+
+class Certification(NamedTuple):
+    name: str
+    authority: str
+
+
+class Profile(NamedTuple):
+    first_name: str
+    full_name: str
+    headline: str
+    summary: str
+    positions: Tuple[Position, ...]
+    educations: Tuple[Education, ...]
+    skills: Tuple[str, ...]
+    certifications: Tuple[Certification, ...]
+
+
+def _position_period(time_period: dict) -> str:
+    if not time_period:
+        return "Present"
+    start_date = time_period.get('startDate') or {}
+    end_date = time_period.get('endDate') or {}
+    start_month, start_year = start_date.get('month'), start_date.get('year')
+    end_month, end_year = end_date.get('month'), end_date.get('year')
+    start_str = f"{start_month}/{start_year}" if start_month and start_year else "N/A"
+    end_str = f"{end_month}/{end_year}" if end_month and end_year else "Present"
+    return f"{start_str} - {end_str}"
+
+
+def parse_profile(item: dict) -> Profile:
     """
-    Extracts key information from the raw Apify profile data and formats it
-    into a clean, readable string for LLM processing.
+    Extracts the fields used by the agents from the raw Apify profile data.
 
     Args:
         item: The raw dictionary containing the scraped LinkedIn profile data.
 
     Returns:
-        A formatted string containing the cleaned-up profile information.
+        A Profile with one record per position, education and certification.
     """
-    
-   
     first_name = item.get('firstName', '')
-    last_name = item.get('lastName', '')
-    full_name = f"{first_name} {last_name}".strip()
-    headline = item.get('headline', 'N/A')
+    positions = tuple([
+        Position(
+            pos.get('title', 'N/A'),
+            pos.get('companyName', 'N/A'),
+            _position_period(pos.get('timePeriod')),
+            pos.get('description', '[No description provided]').strip(),
+        )
+        for pos in item.get('positions') or ()
+    ])
+    educations = []
+    for edu in item.get('educations') or ():
+        time_period = edu.get('timePeriod') or {}
+        start_year = (time_period.get('startDate') or {}).get('year', '')
+        end_year = (time_period.get('endDate') or {}).get('year', '')
+        educations.append(Education(
+            degree=edu.get('degreeName', ''),
+            school=edu.get('schoolName', 'N/A'),
+            field=edu.get('fieldOfStudy'),
+            date_range=f"({start_year} - {end_year})" if start_year and end_year else "",
+        ))
+    certifications = tuple([
+        Certification(cert.get('name', 'N/A'), cert.get('authority', ''))
+        for cert in item.get('certifications') or ()
+    ])
+    return Profile(
+        first_name=first_name,
+        full_name=f"{first_name} {item.get('lastName', '')}".strip(),
+        headline=item.get('headline', 'N/A'),
+        summary=item.get('summary', 'N/A'),
+        positions=positions,
+        educations=tuple(educations),
+        skills=tuple(item.get('skills') or ()),
+        certifications=certifications,
+    )
+
+
+def render_profile(profile: Profile) -> str:
+    """
+    Renders a Profile as the text sent to the LLM.
 
-    formatted_string = f"**Profile for {full_name}**\n\n"
-    formatted_string += f"**Headline:** {headline}\n\n"
+    The parts are collected in a list and joined once, so the cost grows
+    linearly with the size of the profile.
+    """
+    parts = [
+        f"**Profile for {profile.full_name}**\n\n",
+        f"**Headline:** {profile.headline}\n\n",
+        f"**Summary (About Section):**\n{profile.summary}\n\n",
+        "**Experience:**\n\n",
+    ]
+    if not profile.positions:
+        parts.append("No professional experience listed.\n\n")
+    for i, pos in enumerate(profile.positions, 1):
+        parts.append(f"{i}. **{pos.title}** at {pos.company} ({pos.period})\n    * ")
+        parts.append(pos.description.replace("\n", "\n    * "))
+        parts.append("\n\n")
+
+    parts.append("**Education:**\n\n")
+    if not profile.educations:
+        parts.append("No education listed.\n\n")
+    else:
+        for edu in profile.educations:
+            field = f" in {edu.field}" if edu.field else ""
+            parts.append(f"*   **{edu.degree}**{field} - {edu.school} {edu.date_range}\n")
+        parts.append("\n")
 
+    parts.append("**Top Skills:**\n")
+    if not profile.skills:
+        parts.append("No skills listed.\n")
+    for skill in profile.skills:
+        parts.append(f"*   {skill}\n")
+    parts.append("\n")
 
-    summary = item.get('summary', 'N/A')
-    formatted_string += f"**Summary (About Section):**\n{summary}\n\n"
+    parts.append("**Certifications:**\n")
+    if not profile.certifications:
+        parts.append("No certifications listed.\n")
+    for cert in profile.certifications:
+        authority = f" ({cert.authority})" if cert.authority else ""
+        parts.append(f"*   {cert.name}{authority}\n")
 
+    return "".join(parts).strip()
 
-    formatted_string += "**Experience:**\n\n"
-    positions = item.get('positions', [])
-    if not positions:
-        formatted_string += "No professional experience listed.\n\n"
-    else:
-        for i, pos in enumerate(positions, 1):
-            title = pos.get('title', 'N/A')
-            company_name = pos.get('companyName', 'N/A')
-            
-            # Format the time period
-            time_period_str = "Present"
-            time_period = pos.get('timePeriod', {})
-            if time_period:
-                start_date = time_period.get('startDate', {})
-                start_month = start_date.get('month')
-                start_year = start_date.get('year')
-                
-                end_date = time_period.get('endDate', {})
-                end_month = end_date.get('month')
-                end_year = end_date.get('year')
-
-                start_str = f"{start_month}/{start_year}" if start_month and start_year else "N/A"
-                end_str = f"{end_month}/{end_year}" if end_month and end_year else "Present"
-                time_period_str = f"{start_str} - {end_str}"
-
-            formatted_string += f"{i}. **{title}** at {company_name} ({time_period_str})\n"
-            
-            description = pos.get('description', '[No description provided]').strip()
-      
-            formatted_description = "\n".join([f"    * {line}" for line in description.split('\n')])
-            formatted_string += f"{formatted_description}\n\n"
-
-
-    formatted_string += "**Education:**\n\n"
-    educations = item.get('educations', [])
-    if not educations:
-        formatted_string += "No education listed.\n\n"
-    else:
-        for edu in educations:
-            degree = edu.get('degreeName', '')
-            school = edu.get('schoolName', 'N/A')
-            field = edu.get('fieldOfStudy')
-            
-
-            time_period = edu.get('timePeriod', {})
-            start_year = time_period.get('startDate', {}).get('year', '')
-            end_year = time_period.get('endDate', {}).get('year', '')
-            date_range = f"({start_year} - {end_year})" if start_year and end_year else ""
-
-            edu_str = f"*   **{degree}**"
-            if field:
-                edu_str += f" in {field}"
-            edu_str += f" - {school} {date_range}\n"
-            formatted_string += edu_str
-        formatted_string += "\n"
-
-
-    formatted_string += "**Top Skills:**\n"
-    skills = item.get('skills', [])
-    if not skills:
-        formatted_string += "No skills listed.\n"
-    else:
-        for skill in skills:
-            formatted_string += f"*   {skill}\n"
-    formatted_string += "\n"
 
+def _save_artifacts(profile_url: str, item: dict, text: str) -> None:
+    try:
+        from cache.artifact_store import put_profile
+        put_profile(profile_url, raw_item=item, profile_text=text)
+    except Exception as e:
+        print(f"---PARSER: Could not store profile artifacts for {profile_url}: {e}---")
 
-    formatted_string += "**Certifications:**\n"
-    certifications = item.get('certifications', [])
-    if not certifications:
-        formatted_string += "No certifications listed.\n"
-    else:
-        for cert in certifications:
-            name = cert.get('name', 'N/A')
-            authority = cert.get('authority', '')
-            cert_str = f"*   {name}"
-            if authority:
-                cert_str += f" ({authority})"
-            formatted_string += f"{cert_str}\n"
-            
-    return formatted_string.strip()
\ No newline at end of file
+
+def save_artifacts(profile_url: str, item: dict, text: str):
+    """
+    Stores the raw and formatted profile in the artifact store on a background thread.
+
+    Returns:
+        A Future for the write.
+    """
+    global _writer
+    if _writer is None:
+        _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-artifacts")
+    return _writer.submit(_save_artifacts, profile_url, item, text)
+
+
+def format_profile_data(item: dict, profile_url: str = None) -> str:
+    """
+    Extracts key information from the raw Apify profile data and formats it
+    into a clean, readable string for LLM processing.
+
+    Args:
+        item: The raw dictionary containing the scraped LinkedIn profile data.
+        profile_url: The URL the item was scraped from. When given, the
+            raw and formatted profile are saved to the artifact store in the
+            background (unless PROFILE_ARTIFACTS=0), and the section
+            fingerprints are compared with the last scrape of the same
+            profile (see cache/profile_diff.py).
+
+    Returns:
+        A formatted string containing the cleaned-up profile information.
+    """
+    profile = parse_profile(item)
+    formatted_string = render_profile(profile)
+    if profile_url and PROFILE_ARTIFACTS:
+        save_artifacts(profile_url, item, formatted_string)
+    if profile_url:
+        from cache.profile_diff import record_profile
+        record_profile(profile_url, formatted_string)
+    return formatted_string
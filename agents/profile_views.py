@@ -0,0 +1,218 @@
+import hashlib
+import os
+import re
+import threading
+from functools import lru_cache
+
+PROFILE_VIEW_TOKEN_BUDGET = int(os.getenv("PROFILE_VIEW_TOKEN_BUDGET", "2000"))
+# A position is only shown cut short if at least this many tokens of it fit.
+MIN_TRUNCATED_TOKENS = 50
+
+# Section headers written by `format_profile_data`, in profile order.
+SECTION_HEADERS = {
+    "headline": "**Headline:**",
+    "summary": "**Summary (About Section):**",
+    "positions": "**Experience:**",
+    "education": "**Education:**",
+    "skills": "**Top Skills:**",
+    "certifications": "**Certifications:**",
+}
+
+# The sections each node needs, most important first. When the budget is
+# tight, sections at the end of the list are trimmed first.
+NODE_SECTIONS = {
+    "analyze_profile": ("headline", "summary", "positions", "skills", "education", "certifications"),
+    "analyze_job_fit": ("headline", "positions", "skills", "summary", "certifications", "education"),
+    "counsel_career": ("headline", "skills", "positions", "certifications", "education"),
+    "enhance_content": ("headline", "summary", "positions", "skills", "education", "certifications"),
+}
+
+# Words in the request that point the content enhancer at a single section.
+SECTION_KEYWORDS = {
+    "headline": ("headline", "tagline"),
+    "summary": ("summary", "about section", "about me", "bio"),
+    "positions": ("experience", "job description", "position", "work history", "role description"),
+    "skills": ("skill",),
+    "education": ("education", "degree"),
+    "certifications": ("certification", "certificate"),
+}
+
+_POSITION_RE = re.compile(r"^\d+\. \*\*(?P<title>.*?)\*\* at (?P<company>.*?) \(", re.MULTILINE)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """A cheap token estimate (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+@lru_cache(maxsize=64)
+def split_sections(profile_text: str) -> tuple:
+    """
+    Splits a formatted profile into its sections.
+
+    Returns:
+        A (title, sections, positions) tuple: the "**Profile for ...**" line,
+        a dict of section name to text (including its header), and the list
+        of individual position blocks from the experience section.
+    """
+    starts = sorted(
+        (index, name)
+        for name, header in SECTION_HEADERS.items()
+        if (index := profile_text.find(header)) != -1
+    )
+    title = profile_text[:starts[0][0]].strip() if starts else profile_text.strip()
+    sections = {}
+    for i, (index, name) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(profile_text)
+        sections[name] = profile_text[index:end].strip()
+
+    positions = []
+    experience = sections.get("positions", "")
+    matches = list(_POSITION_RE.finditer(experience))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(experience)
+        positions.append(experience[match.start():end].strip())
+    return title, sections, tuple(positions)
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _position_names(positions: tuple) -> list:
+    """Names positions by title and company, so reordering or adding one leaves the others unchanged."""
+    names, seen = [], {}
+    for block in positions:
+        match = _POSITION_RE.match(block)
+        base = f"position:{match.group('title')} at {match.group('company')}" if match else "position"
+        seen[base] = seen.get(base, 0) + 1
+        names.append(base if seen[base] == 1 else f"{base}#{seen[base]}")
+    return names
+
+
+@lru_cache(maxsize=64)
+def section_fingerprints(profile_text: str) -> tuple:
+    """
+    Fingerprints each section of a formatted profile.
+
+    Sections are the title line, the headline, summary, education, skills
+    and certifications, and every position of the experience section on
+    its own ("position:<title> at <company>").
+
+    Returns:
+        A tuple of (section name, fingerprint) pairs in profile order.
+    """
+    title, sections, positions = split_sections(profile_text)
+    fingerprints = [("title", _fingerprint(title))]
+    for name, text in sections.items():
+        if name != "positions":
+            fingerprints.append((name, _fingerprint(text)))
+    fingerprints.extend((name, _fingerprint(block)) for name, block in zip(_position_names(positions), positions))
+    return tuple(fingerprints)
+
+
+def _word_pattern(phrase: str, plural: bool = False):
+    """Matches `phrase` as whole words (and, with `plural`, its plural), ignoring case."""
+    return re.compile(r"\b" + re.escape(phrase) + (r"s?" if plural else "") + r"\b", re.IGNORECASE)
+
+
+_SECTION_PATTERNS = {
+    name: tuple(_word_pattern(word, plural=True) for word in words) for name, words in SECTION_KEYWORDS.items()
+}
+
+
+def _requested_sections(request_text: str, positions: tuple) -> tuple:
+    """Finds the sections (and specific positions) a rewrite request refers to."""
+    wanted = [name for name, patterns in _SECTION_PATTERNS.items() if any(p.search(request_text) for p in patterns)]
+    mentioned = tuple(
+        i for i, block in enumerate(positions)
+        if (match := _POSITION_RE.match(block))
+        and any(_word_pattern(part.strip()).search(request_text) for part in match.groups() if len(part.strip()) > 2)
+    )
+    if mentioned and "positions" not in wanted:
+        wanted.append("positions")
+    return tuple(wanted), mentioned
+
+
+def _truncate(block: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    if len(block) <= max_chars:
+        return block
+    return block[:max_chars].rsplit(" ", 1)[0] + " [...]"
+
+
+def build_profile_view(profile_text: str, node: str, request_text: str = "", token_budget: int = None) -> str:
+    """
+    Builds the part of the profile a node needs, within a token budget.
+
+    Args:
+        profile_text: The full formatted profile.
+        node: The graph node the prompt is for.
+        request_text: The user's latest message, used by the content
+            enhancer to send only the section being rewritten (plus the
+            headline for context). Pass the user's own words only: AI replies
+            and the summary mention sections and positions too.
+        token_budget: Overrides PROFILE_VIEW_TOKEN_BUDGET.
+
+    Returns:
+        The profile view: the requested sections in profile order, with the
+        lowest-priority sections and the oldest positions trimmed first.
+    """
+    budget = token_budget or PROFILE_VIEW_TOKEN_BUDGET
+    title, sections, positions = split_sections(profile_text)
+    order = NODE_SECTIONS.get(node, tuple(SECTION_HEADERS))
+    mentioned = ()
+    if node == "enhance_content" and request_text:
+        requested, mentioned = _requested_sections(request_text, positions)
+        if requested:
+            order = tuple(dict.fromkeys(("headline",) + requested))
+
+    remaining = budget - estimate_tokens(title)
+    chosen = {}
+    for name in order:
+        if name not in sections or remaining <= 0:
+            continue
+        if name == "positions" and positions:
+            kept = [positions[i] for i in mentioned] if mentioned else list(positions)
+            block = SECTION_HEADERS["positions"]
+            for i, position in enumerate(kept):
+                available = remaining - estimate_tokens(block)
+                if estimate_tokens(position) > available:
+                    omitted = len(kept) - i
+                    if available >= MIN_TRUNCATED_TOKENS:
+                        block += "\n\n" + _truncate(position, available)
+                        omitted -= 1
+                    if omitted:
+                        block += f"\n\n({omitted} older position(s) omitted)"
+                    break
+                block += "\n\n" + position
+        else:
+            block = _truncate(sections[name], remaining)
+        chosen[name] = block
+        remaining -= estimate_tokens(block)
+
+    parts = [title] + [chosen[name] for name in SECTION_HEADERS if name in chosen]
+    view = "\n\n".join(part for part in parts if part)
+    _record(node, profile_text, view)
+    return view
+
+
+def _record(node: str, profile_text: str, view: str) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(node, {"calls": 0, "full_tokens": 0, "view_tokens": 0})
+        stats["calls"] += 1
+        stats["full_tokens"] += estimate_tokens(profile_text)
+        stats["view_tokens"] += estimate_tokens(view)
+
+
+def get_stats() -> dict:
+    """Returns estimated profile tokens sent per node and the reduction achieved."""
+    with _stats_lock:
+        stats = {node: dict(values) for node, values in _stats.items()}
+    for values in stats.values():
+        full = values["full_tokens"]
+        values["reduction"] = 1 - values["view_tokens"] / full if full else 0.0
+    return stats
@@ -1,21 +1,48 @@
+import asyncio
 from states.state import GraphState
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from agents import intent_classifier
+from cache import route_cache
+from llm.registry import get_llm
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=os.getenv("google_api_key"))
+ROUTE_DESCRIPTIONS = {
+    "analyze_profile": "The user wants a general review of their current profile.",
+    "analyze_job_fit": "The user wants a direct comparison of their profile against a job.",
+    "enhance_content": "The user wants help rewriting or improving a specific section.",
+    "counsel_career": "The user is asking for advice on future actions, learning, or filling skill gaps.",
+    "end_session": "The user is saying thank you, goodbye, or indicates the conversation is over.",
+    "general_question": "The user is asking a general question or just chatting.",
+}
 
-def route_requests(state: GraphState) -> str:
+def _format_categories() -> str:
+    """Renders each category with its examples for the classification prompt."""
+    lines = []
+    for route, description in ROUTE_DESCRIPTIONS.items():
+        examples = ", ".join(f'"{example}"' for example in intent_classifier.SEED_EXAMPLES[route])
+        lines.append(f"- `{route}`: {description}\n    (Examples: {examples})")
+    return "\n".join(lines)
+
+
+CATEGORIES_PROMPT = _format_categories()
+
+def _local_route(message: str):
     """
-    This is the simplified central router. It reads the user's last message,
-    classifies the intent, and determines which node to call next.
+    Returns a route from the route cache or the local classifier, or None.
+
+    Only LLM decisions are cached: a fast-path guess is recomputed every
+    time, so a misroute is not pinned for ROUTE_CACHE_TTL.
     """
-    print("---ROUTER: Classifying user intent---")
-    
-    last_message = state['messages'][-1]
+    route = route_cache.get_cached_route(message)
+    if route is not None:
+        print(f"---ROUTER: Cached intent '{route}'---")
+        return route
+
+    route, confidence = intent_classifier.classify(message)
+    if route is not None:
+        print(f"---ROUTER: Fast-path classified intent as '{route}' (confidence {confidence:.2f})---")
+    return route
+
 
- 
+def _build_classification_prompt(message: str) -> str:
     classification_prompt =f"""
 You are an expert request router for an AI career coach. Your primary goal is to accurately classify the user's latest message into one of the predefined categories.
 
@@ -29,31 +56,60 @@ You are an expert request router for an AI career coach. Your primary goal is to
 After your internal thought process, respond with ONLY the category name and nothing else.
 
 **Categories & Examples:**
-- `analyze_profile`: The user wants a general review of their current profile.
-    (Examples: "review my profile", "what do you think of my LinkedIn?", "give me feedback")
-- `analyze_job_fit`: The user wants a direct comparison of their profile against a job.
-    (Examples: "compare me to a data scientist", "am I a good fit for a project manager role?", "how do I stack up for this job?")
-- `enhance_content`: The user wants help rewriting or improving a specific section.
-    (Examples: "help me rewrite my summary", "can you make my headline better?", "improve this job description")
-- `counsel_career`: The user is asking for advice on future actions, learning, or filling skill gaps.
-    (Examples: "what should I learn next?", "how do I transition into AI?", "what skills am I missing for a PM role?")
-- `end_session`: The user is saying thank you, goodbye, or indicates the conversation is over.
-    (Examples: "thanks, that's all for now", "goodbye", "perfect, thank you!")
-- `general_question`: The user is asking a general question or just chatting.
-    (Examples: "hi", "what can you do?", "how does this work?")
+{CATEGORIES_PROMPT}
 
 **User's latest message:**
 ---
-"{last_message.content}"
+"{message}"
 ---
 
 **Classification:**
 """
 
-    classification_response = llm.invoke(classification_prompt)
-    route = classification_response.content.strip()
+    return classification_prompt
+
 
+def _record_llm_route(message: str, route: str) -> None:
     print(f"---ROUTER: Classified intent as '{route}'---")
+    intent_classifier.record_llm_decision(message, route)
+    route_cache.cache_route(message, route)
+
+
+def route_requests(state: GraphState) -> str:
+    """
+    This is the simplified central router. It reads the user's last message,
+    classifies the intent, and determines which node to call next.
+    """
+    print("---ROUTER: Classifying user intent---")
+    
+    last_message = state['messages'][-1]
+
+    route = _local_route(last_message.content)
+    if route is not None:
+        return {"route": route}
+
+    classification_prompt = _build_classification_prompt(last_message.content)
+    classification_response = get_llm("router").invoke(classification_prompt)
+    route = classification_response.content.strip()
+    _record_llm_route(last_message.content, route)
 
     
-    return {"route": route}
\ No newline at end of file
+    return {"route": route}
+
+
+async def aroute_requests(state: GraphState) -> str:
+    """Async variant of `route_requests`. The route cache's SQLite reads and writes run in a worker thread."""
+    print("---ROUTER: Classifying user intent---")
+
+    last_message = state['messages'][-1]
+
+    route = await asyncio.to_thread(_local_route, last_message.content)
+    if route is not None:
+        return {"route": route}
+
+    classification_prompt = _build_classification_prompt(last_message.content)
+    classification_response = await get_llm("router").ainvoke(classification_prompt)
+    route = classification_response.content.strip()
+    await asyncio.to_thread(_record_llm_route, last_message.content, route)
+
+    return {"route": route}
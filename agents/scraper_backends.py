@@ -0,0 +1,181 @@
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+from cache.profile_cache import canonical_profile_url
+
+# "apify" runs the real actor, "record" runs it and saves what it returns,
+# "replay" serves saved profiles locally without network access.
+SCRAPER_BACKEND = os.getenv("SCRAPER_BACKEND", "apify")
+SCRAPER_RECORDINGS_DIR = os.getenv("SCRAPER_RECORDINGS_DIR", "scraper_recordings")
+LINKEDIN_COOKIE_PATH = os.getenv("LINKEDIN_COOKIE_PATH", "unit_test/cookie.json")
+APIFY_ACTOR_ID = "curious_coder/linkedin-profile-scraper"
+
+# Replay behaviour: seconds per actor run plus seconds per URL in the run,
+# and the chance that a run fails outright or that a single URL returns nothing.
+SCRAPER_REPLAY_RUN_LATENCY = float(os.getenv("SCRAPER_REPLAY_RUN_LATENCY", "0"))
+SCRAPER_REPLAY_URL_LATENCY = float(os.getenv("SCRAPER_REPLAY_URL_LATENCY", "0"))
+SCRAPER_REPLAY_FAILURE_RATE = float(os.getenv("SCRAPER_REPLAY_FAILURE_RATE", "0"))
+SCRAPER_REPLAY_MISSING_RATE = float(os.getenv("SCRAPER_REPLAY_MISSING_RATE", "0"))
+
+_backend = None
+_lock = threading.Lock()
+
+
+class ApifyBackend:
+    """Runs the LinkedIn profile actor on Apify."""
+
+    needs_cookies = True
+
+    def __init__(self, token: str = None, actor_id: str = APIFY_ACTOR_ID):
+        from apify_client import ApifyClient
+        self.client = ApifyClient(token or os.getenv("APIFY_API_TOKEN"))
+        self.actor_id = actor_id
+
+    def call(self, run_input: dict) -> dict:
+        """Runs the actor and returns the finished run (with `defaultDatasetId` and `status`)."""
+        run = self.client.actor(self.actor_id).call(run_input=run_input)
+        if run is None:
+            raise RuntimeError("The Apify actor run did not start")
+        print("💾 Check your data here: https://console.apify.com/storage/datasets/" + run["defaultDatasetId"])
+        return run
+
+    def iterate_items(self, dataset_id: str):
+        return self.client.dataset(dataset_id).iterate_items()
+
+
+def _recording_path(directory: str, profile_url: str) -> str:
+    key = canonical_profile_url(profile_url) or profile_url
+    return os.path.join(directory, hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + ".json")
+
+
+def record_item(profile_url: str, item: dict, directory: str = None) -> None:
+    """Saves one profile so that `ReplayBackend` can serve it."""
+    directory = directory or SCRAPER_RECORDINGS_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = _recording_path(directory, profile_url)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"url": profile_url, "item": item}, f)
+    os.replace(tmp_path, path)
+
+
+class RecordingBackend:
+    """
+    Wraps another backend and saves every profile it returns.
+
+    The actor inputs (without the cookie) are appended to `runs.jsonl` in the
+    recordings directory and each dataset item is saved under its input URL.
+    """
+
+    def __init__(self, inner, directory: str = None):
+        self.inner = inner
+        self.directory = directory or SCRAPER_RECORDINGS_DIR
+        self.needs_cookies = inner.needs_cookies
+        self._urls = {}
+
+    def call(self, run_input: dict) -> dict:
+        run = self.inner.call(run_input)
+        os.makedirs(self.directory, exist_ok=True)
+        with _lock:
+            self._urls[run["defaultDatasetId"]] = list(run_input["urls"])
+            with open(os.path.join(self.directory, "runs.jsonl"), "a", encoding="utf-8") as f:
+                logged = {k: v for k, v in run_input.items() if k != "cookie"}
+                f.write(json.dumps({"run_input": logged, "status": run.get("status"), "recorded_at": time.time()}) + "\n")
+        return run
+
+    def iterate_items(self, dataset_id: str):
+        urls = self._urls.get(dataset_id, [])
+        for item in self.inner.iterate_items(dataset_id):
+            url = item_profile_url(item) or (urls[0] if len(urls) == 1 else None)
+            if url:
+                record_item(url, item, self.directory)
+            yield item
+
+
+def item_profile_url(item: dict):
+    """Returns the profile URL an actor output item was scraped from, or None."""
+    for field in ("inputUrl", "url", "linkedinUrl", "profileUrl"):
+        value = item.get(field)
+        if isinstance(value, str) and canonical_profile_url(value):
+            return value
+    if item.get("publicIdentifier"):
+        return f"https://www.linkedin.com/in/{item['publicIdentifier']}"
+    return None
+
+
+class ReplayBackend:
+    """
+    Serves recorded profiles locally, like an actor that never leaves the machine.
+
+    Args:
+        directory: The recordings written by `RecordingBackend` or `record_item`.
+        run_latency: Seconds every run takes.
+        url_latency: Extra seconds per URL in the run.
+        failure_rate: Probability that a whole run fails.
+        missing_rate: Probability that a single URL returns no item.
+        seed: Seeds the failure injection so runs can be repeated.
+    """
+
+    needs_cookies = False
+
+    def __init__(self, directory: str = None, run_latency: float = None, url_latency: float = None,
+                 failure_rate: float = None, missing_rate: float = None, seed: int = None):
+        self.directory = directory or SCRAPER_RECORDINGS_DIR
+        self.run_latency = SCRAPER_REPLAY_RUN_LATENCY if run_latency is None else run_latency
+        self.url_latency = SCRAPER_REPLAY_URL_LATENCY if url_latency is None else url_latency
+        self.failure_rate = SCRAPER_REPLAY_FAILURE_RATE if failure_rate is None else failure_rate
+        self.missing_rate = SCRAPER_REPLAY_MISSING_RATE if missing_rate is None else missing_rate
+        self._random = random.Random(seed)
+        self._datasets = {}
+        self._ids = itertools.count()
+        self.runs = 0
+
+    def call(self, run_input: dict) -> dict:
+        urls = list(run_input["urls"])
+        time.sleep(self.run_latency + self.url_latency * len(urls))
+        with _lock:
+            self.runs += 1
+            failed = self._random.random() < self.failure_rate
+            missing = {url for url in urls if self._random.random() < self.missing_rate}
+            dataset_id = f"replay-{next(self._ids)}"
+        if failed:
+            raise RuntimeError("Injected actor run failure")
+        self._datasets[dataset_id] = [url for url in urls if url not in missing]
+        return {"defaultDatasetId": dataset_id, "status": "SUCCEEDED"}
+
+    def iterate_items(self, dataset_id: str):
+        for url in self._datasets.pop(dataset_id, []):
+            try:
+                with open(_recording_path(self.directory, url), "r", encoding="utf-8") as f:
+                    item = json.load(f)["item"]
+            except FileNotFoundError:
+                continue
+            yield dict(item, inputUrl=url)
+
+
+def get_backend():
+    """Returns the process-wide scraper backend selected by SCRAPER_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                if SCRAPER_BACKEND == "replay":
+                    _backend = ReplayBackend()
+                elif SCRAPER_BACKEND == "record":
+                    _backend = RecordingBackend(ApifyBackend())
+                elif SCRAPER_BACKEND == "apify":
+                    _backend = ApifyBackend()
+                else:
+                    raise ValueError(f"Unknown scraper backend: {SCRAPER_BACKEND}")
+    return _backend
+
+
+def set_backend(backend) -> None:
+    """Replaces the scraper backend, e.g. with a `ReplayBackend` for a benchmark."""
+    global _backend
+    _backend = backend
@@ -0,0 +1,70 @@
+from states.state import GraphState
+from llm.registry import get_llm
+from memory_manager.conversation_memory import split_history, needs_summary, format_message, MEMORY_TOKEN_BUDGET
+from langchain_core.messages import SystemMessage, HumanMessage
+from langgraph.constants import TAG_NOSTREAM
+
+SUMMARY_PROMPT = """
+You maintain the memory of a conversation between a user and an AI career coach.
+Update the running summary with the new part of the conversation. Keep every fact
+that matters for later turns: the user's goals and target roles, advice already
+given, content already rewritten and decisions made. Drop greetings and filler.
+Write plain prose, at most {max_words} words.
+"""
+
+
+def _build_prompt(summary: str, pending: list) -> list:
+    transcript = "\n".join(format_message(message) for message in pending)
+    return [
+        # About a quarter of the memory budget, at roughly 0.75 words per token.
+        SystemMessage(content=SUMMARY_PROMPT.format(max_words=MEMORY_TOKEN_BUDGET * 3 // 16)),
+        HumanMessage(content=f"Current summary:\n{summary or '(none yet)'}\n\nNew conversation:\n{transcript}"),
+    ]
+
+
+def _update(state: GraphState, response, pending: list) -> dict:
+    print(f"---MEMORY: Summarized {len(pending)} older message(s)---")
+    return {
+        "conversation_summary": response.content.strip(),
+        "summarized_messages": (state.get("summarized_messages") or 0) + len(pending),
+    }
+
+
+def summarize_memory(state: GraphState) -> dict:
+    """
+    Folds the messages that no longer fit in the recent window into the
+    rolling summary, once there are at least MEMORY_SUMMARY_CHUNK tokens of them.
+
+    Runs after the reply has been generated; its tokens are never streamed
+    to the user and a failure only postpones the summary to a later turn.
+
+    Args:
+        state: The current state of the graph.
+
+    Returns:
+        The new `conversation_summary` and `summarized_messages`, or no update.
+    """
+    summary, pending, _ = split_history(state)
+    if not needs_summary(pending):
+        return {}
+    try:
+        response = get_llm("summarize_memory").invoke(_build_prompt(summary, pending), config={"tags": [TAG_NOSTREAM]})
+    except Exception as e:
+        print(f"---MEMORY: Summary update failed: {e}---")
+        return {}
+    return _update(state, response, pending)
+
+
+async def asummarize_memory(state: GraphState) -> dict:
+    """Async variant of `summarize_memory`, for graphs run with `ainvoke`/`astream`."""
+    summary, pending, _ = split_history(state)
+    if not needs_summary(pending):
+        return {}
+    try:
+        response = await get_llm("summarize_memory").ainvoke(
+            _build_prompt(summary, pending), config={"tags": [TAG_NOSTREAM]}
+        )
+    except Exception as e:
+        print(f"---MEMORY: Summary update failed: {e}---")
+        return {}
+    return _update(state, response, pending)
@@ -1,23 +1,74 @@
 # app.py
 
 import streamlit as st
+import threading
 import uuid
 from langchain_core.messages import AIMessage, HumanMessage
 
 # --- Import your graph and helper functions ---
-from graph.graph import app
-from agents.linkedin_scraper import linkedin_scraper, format_profile_data
+from graph.graph import get_app, preload_nodes
+from graph.streaming import ReplyStream
+from graph.history import get_history, remember_history
+from agents.ingestion import submit_ingestion, get_job, READY, FAILED
+from states.profile_store import attach_profile
+from llm.registry import warm_up
+from llm.rate_limiter import LLMQueueTimeout
+from graph.retention import start_maintenance
+from graph.episodes import (
+    reserve_episode, release_episode, register_episode, record_activity, list_episodes, count_episodes, get_episode,
+)
+
+# Open LLM connections in the background so the first turn skips TLS setup.
+warm_up()
+# Prune old checkpoints of threads.sqlite in the background (RETENTION_INTERVAL).
+start_maintenance()
+
+
+@st.cache_resource
+def load_app():
+    """The compiled graph, shared by all sessions of this server process."""
+    # The agent modules are imported in the background while the page renders.
+    threading.Thread(target=preload_nodes, daemon=True, name="preload-nodes").start()
+    return get_app()
+
+
+app = load_app()
 
 # --- Page Configuration ---
 st.set_page_config(page_title="AI LinkedIn Coach", layout="wide")
 st.title("🚀 AI LinkedIn Profile Coach")
 
+# Episodes are listed per user; without a login, open the app with ?user=<name> to keep separate lists.
+user_id = st.query_params.get("user", "default")
+EPISODE_PAGE_SIZE = 50
+# Messages shown at first; "Load older messages" shows this many more each time.
+HISTORY_PAGE_SIZE = 20
+
 # --- Initialize Session State for Episodes ---
 if "episodes" not in st.session_state:
     # 'episodes' will be a dictionary mapping a display name to a thread_id
     st.session_state.episodes = {}
     st.session_state.active_episode_name = None
     st.session_state.profile_loaded = False
+if "pending_episodes" not in st.session_state:
+    # Episodes whose profile is still being ingested: name -> {"job_id", "thread_id"}
+    st.session_state.pending_episodes = {}
+if "episode_page" not in st.session_state:
+    st.session_state.episode_page = 0
+if "history_limits" not in st.session_state:
+    # How many of the newest messages are shown, per thread_id
+    st.session_state.history_limits = {}
+
+# The current page of the user's episodes (most recently active first), from the registry in threads.sqlite
+episode_page = list_episodes(user_id, limit=EPISODE_PAGE_SIZE, offset=st.session_state.episode_page * EPISODE_PAGE_SIZE)
+st.session_state.episodes = {episode["name"]: episode["thread_id"] for episode in episode_page}
+episode_info = {episode["name"]: episode for episode in episode_page}
+if st.session_state.active_episode_name and st.session_state.active_episode_name not in st.session_state.episodes:
+    # Keep the active episode selectable while browsing other pages
+    active_episode = get_episode(user_id, st.session_state.active_episode_name)
+    if active_episode:
+        st.session_state.episodes[active_episode["name"]] = active_episode["thread_id"]
+        episode_info[active_episode["name"]] = active_episode
 
 # Helper function to get the active thread_id
 def get_active_thread_id():
@@ -34,14 +85,32 @@ with st.sidebar:
     new_episode_option = "✨ Create New Episode..."
     episode_names.append(new_episode_option)
 
+    # An episode activated outside the selectbox (e.g. when its ingestion finishes) must also be selected in it
+    if st.session_state.active_episode_name and st.session_state.pop("select_active_episode", False):
+        st.session_state.episode_selector = st.session_state.active_episode_name
+
     # The selectbox for switching episodes
     selected_episode = st.selectbox(
         "Select an Episode",
         options=episode_names,
         index=episode_names.index(st.session_state.active_episode_name) if st.session_state.active_episode_name else len(episode_names) - 1,
-        key="episode_selector"
+        key="episode_selector",
+        format_func=lambda name: f"{name} ({episode_info[name]['message_count']} messages)" if name in episode_info else name,
     )
 
+    # Paging through older episodes
+    total_episodes = count_episodes(user_id)
+    if total_episodes > EPISODE_PAGE_SIZE:
+        first = st.session_state.episode_page * EPISODE_PAGE_SIZE
+        st.caption(f"Episodes {first + 1}-{min(first + EPISODE_PAGE_SIZE, total_episodes)} of {total_episodes}")
+        newer_column, older_column = st.columns(2)
+        if newer_column.button("← Newer", disabled=st.session_state.episode_page == 0, key="newer_episodes"):
+            st.session_state.episode_page -= 1
+            st.rerun()
+        if older_column.button("Older →", disabled=first + EPISODE_PAGE_SIZE >= total_episodes, key="older_episodes"):
+            st.session_state.episode_page += 1
+            st.rerun()
+
     # Logic for handling episode selection
     if selected_episode == new_episode_option:
         st.session_state.active_episode_name = None
@@ -61,58 +130,86 @@ with st.sidebar:
 
         if st.button("Start New Episode", key="start_episode_button"):
             if new_episode_name and linkedin_url and "linkedin.com/in/" in linkedin_url:
-                if new_episode_name in st.session_state.episodes:
+                new_thread_id = str(uuid.uuid4())
+                # Claim the name for this user before any thread exists, so two tabs cannot both take it
+                if not reserve_episode(user_id, new_thread_id, new_episode_name, profile_url=linkedin_url):
                     st.error("An episode with this name already exists. Please choose a different name.")
                 else:
-                    with st.spinner("Scraping and analyzing profile... This may take a minute."):
-                        try:
-                            raw_data = linkedin_scraper(linkedin_url)
-                            if raw_data:
-                                profile_text = format_profile_data(raw_data)
-                                
-                                # Create a new thread for this episode
-                                new_thread_id = str(uuid.uuid4())
-                                config = {"configurable": {"thread_id": new_thread_id}}
-                                initial_state = {
-                                    "profile_text": profile_text,
-                                    "messages": [AIMessage(content=f"Welcome to your new episode: '{new_episode_name}'. I've analyzed your profile. How can I help?")]
-                                }
-                                app.update_state(config, initial_state)
-                                
-                                # Save the new episode and make it active
-                                st.session_state.episodes[new_episode_name] = new_thread_id
-                                st.session_state.active_episode_name = new_episode_name
-                                st.session_state.profile_loaded = True
-                                st.success("New episode started!")
-                                st.rerun()
-                            else:
-                                st.error("Failed to scrape profile.")
-                        except Exception as e:
-                            st.error(f"An error occurred: {e}")
+                    # Create the thread for this episode once the profile is ready
+                    def create_episode(profile_text, name=new_episode_name, thread_id=new_thread_id, url=linkedin_url, user=user_id):
+                        config = {"configurable": {"thread_id": thread_id}}
+                        profile_refs = attach_profile(thread_id, profile_text=profile_text, profile_url=url)
+                        initial_state = {
+                            **profile_refs,
+                            "messages": [AIMessage(content=f"Welcome to your new episode: '{name}'. I've analyzed your profile. How can I help?")]
+                        }
+                        app.update_state(config, initial_state)
+                        register_episode(user, thread_id, name, profile_url=url, profile_hash=profile_refs["profile_text_ref"],
+                                         messages=initial_state["messages"])
+
+                    # Scraping runs in the background; the user can keep chatting in other episodes
+                    job_id = submit_ingestion(linkedin_url, on_ready=create_episode)
+                    st.session_state.pending_episodes[new_episode_name] = {"job_id": job_id, "thread_id": new_thread_id}
             else:
                 st.warning("Please provide a name and a valid LinkedIn URL.")
     else:
         st.success(f"Active Episode: {st.session_state.active_episode_name}")
 
+    # --- Profiles being ingested in the background, polled every few seconds ---
+    @st.fragment(run_every=2 if st.session_state.pending_episodes else None)
+    def show_ingestion_progress():
+        finished = False
+        for name, pending in list(st.session_state.pending_episodes.items()):
+            job = get_job(pending["job_id"])
+            if job is None or job["status"] == FAILED:
+                st.error(f"'{name}': {job['error'] if job else 'The ingestion job was lost.'}")
+                if st.button("Dismiss", key=f"dismiss_{pending['job_id']}"):
+                    # Free the name; the thread was never created
+                    release_episode(pending["thread_id"])
+                    del st.session_state.pending_episodes[name]
+                    finished = True
+            elif job["status"] == READY:
+                del st.session_state.pending_episodes[name]
+                st.session_state.episodes[name] = pending["thread_id"]
+                if not st.session_state.active_episode_name:
+                    st.session_state.active_episode_name = name
+                    st.session_state.profile_loaded = True
+                    st.session_state.select_active_episode = True
+                finished = True
+            else:
+                st.info(f"'{name}': {job['status']}...")
+        if finished:
+            # Refresh the episode list outside this fragment
+            st.rerun(scope="app")
+
+    show_ingestion_progress()
+
 
 # --- Main Chat Interface ---
 
-# Get the chat history for the active episode
+def load_older_messages(thread_id):
+    st.session_state.history_limits[thread_id] = st.session_state.history_limits.get(thread_id, HISTORY_PAGE_SIZE) + HISTORY_PAGE_SIZE
+
+# The transcript reruns on its own when older messages are loaded
+@st.fragment
+def show_history(thread_id):
+    if not thread_id:
+        st.chat_message("AI").write("Create a new episode from the sidebar to begin.")
+        return
+    # Loaded from the checkpointer only when the thread has a new checkpoint
+    messages = get_history(app, thread_id)
+    limit = st.session_state.history_limits.get(thread_id, HISTORY_PAGE_SIZE)
+    if len(messages) > limit:
+        st.button(f"Load older messages ({len(messages) - limit} more)", key=f"load_older_{thread_id}",
+                  on_click=load_older_messages, args=(thread_id,))
+    for msg in messages[-limit:]:
+        if isinstance(msg, AIMessage):
+            st.chat_message("AI").write(msg.content)
+        elif isinstance(msg, HumanMessage):
+            st.chat_message("Human").write(msg.content)
+
 active_thread_id = get_active_thread_id()
-if active_thread_id:
-    config = {"configurable": {"thread_id": active_thread_id}}
-    # Load the conversation history from the checkpointer
-    conversation = app.get_state(config)
-    messages = conversation.values.get("messages", [])
-else:
-    messages = [AIMessage(content="Create a new episode from the sidebar to begin.")]
-
-# Display existing messages
-for msg in messages:
-    if isinstance(msg, AIMessage):
-        st.chat_message("AI").write(msg.content)
-    elif isinstance(msg, HumanMessage):
-        st.chat_message("Human").write(msg.content)
+show_history(active_thread_id)
 
 # The chat input box
 if prompt := st.chat_input(disabled=not st.session_state.profile_loaded):
@@ -122,14 +219,22 @@ if prompt := st.chat_input(disabled=not st.session_state.profile_loaded):
     config = {"configurable": {"thread_id": active_thread_id}}
     inputs = {"messages": [HumanMessage(content=prompt)]}
 
-    # Invoke the graph and stream the response
+    # Invoke the graph and stream the response token by token
     with st.chat_message("AI"):
-        with st.spinner("Thinking..."):
-            app.invoke(inputs, config) # The invoke call updates the history in the DB
-            # We need to re-fetch the state to get the latest messages
-            final_conversation = app.get_state(config)
-            ai_response = final_conversation.values["messages"][-1]
-            st.write(ai_response.content)
-    
-    # Rerun the script to display the latest state of the conversation
-    st.rerun()
\ No newline at end of file
+        reply = ReplyStream(app, inputs, config)
+        placeholder = st.empty()
+        try:
+            with placeholder.container():
+                st.write_stream(reply)
+        except LLMQueueTimeout:
+            # The client-side rate limiter gave up; nothing was sent to the LLM
+            placeholder.warning("The AI service is busy right now. Please try again in a moment.")
+            st.stop()
+        # The streamed text must match what was checkpointed; if not, show the stored version
+        ai_response = reply.final_message()
+        if ai_response.content != reply.text:
+            placeholder.write(ai_response.content)
+    # Update the episode's message count and preview in the sidebar
+    record_activity(active_thread_id, [HumanMessage(content=prompt), ai_response])
+    # The new turn is already on screen; cache the state it was read from for the next rerun
+    remember_history(active_thread_id, reply.final_state)
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Compares checkpoints that hold the profile text by value with ones that hold its hash.
+
+Several episodes are created for the same synthetic profile and a few turns
+are run in each, once with `profile_text` in the state (as before) and once
+with `profile_text_ref` from `states/profile_store.py`. Reported per mode:
+  * db KB: the size of threads.sqlite plus the compressed profiles in the
+    artifact store;
+  * checkpoint KB: the average serialized checkpoint;
+  * get_state ms: `app.get_state` on a fresh connection;
+  * resolve ms: `get_state` plus reading the profile text, as a node does
+    (the in-memory profile cache is cleared first).
+
+Usage:
+    python -m benchmarks.checkpoint_size_benchmark --positions 20 --episodes 5 --turns 5
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
+
+from agents.profile_parser import format_profile_data
+from benchmarks.formatter_benchmark import synthetic_profile
+from cache import artifact_store
+from states import profile_store
+from states.state import GraphState
+
+
+def _reply(state):
+    text = profile_store.get_profile_text(state)
+    return {"messages": [AIMessage(content=f"Your profile has {len(text)} characters. " * 20)]}
+
+
+def _compile(path: str):
+    workflow = StateGraph(GraphState)
+    workflow.add_node("reply", _reply)
+    workflow.set_entry_point("reply")
+    workflow.add_edge("reply", END)
+    return workflow.compile(checkpointer=SqliteSaver(sqlite3.connect(path, check_same_thread=False)))
+
+
+def _run(mode: str, profile_text: str, episodes: int, turns: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="checkpoint-size-benchmark-")
+    path = os.path.join(workdir, "threads.sqlite")
+    artifact_store._store = artifact_store.ArtifactStore(root=os.path.join(workdir, "artifacts"))
+    app = _compile(path)
+    for episode in range(episodes):
+        config = {"configurable": {"thread_id": f"episode-{episode}"}}
+        if mode == "value":
+            profile = {"profile_text": profile_text}
+        else:
+            profile = profile_store.attach_profile(config["configurable"]["thread_id"], profile_text=profile_text)
+        app.update_state(config, {**profile, "messages": [AIMessage(content="Welcome!")]})
+        for turn in range(turns):
+            app.invoke({"messages": [HumanMessage(content=f"Question {turn}")]}, config)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    checkpoint_bytes = conn.execute("SELECT AVG(LENGTH(checkpoint)) FROM checkpoints").fetchone()[0]
+    conn.close()
+
+    fresh = _compile(path)
+    configs = [{"configurable": {"thread_id": f"episode-{episode}"}} for episode in range(episodes)]
+    start = time.perf_counter()
+    for config in configs:
+        fresh.get_state(config)
+    get_state_ms = (time.perf_counter() - start) / episodes * 1000
+
+    profile_store._load.cache_clear()
+    start = time.perf_counter()
+    for config in configs:
+        assert profile_store.get_profile_text(fresh.get_state(config).values) == profile_text
+    resolve_ms = (time.perf_counter() - start) / episodes * 1000
+
+    return {
+        "db_kb": (os.path.getsize(path) + artifact_store.get_store().total_bytes()) / 1024,
+        "checkpoint_kb": checkpoint_bytes / 1024,
+        "get_state_ms": get_state_ms,
+        "resolve_ms": resolve_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--positions", type=int, nargs="+", default=[5, 20, 100])
+    parser.add_argument("--episodes", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'positions':>9} {'profile KB':>10} {'mode':>9} {'db KB':>8} {'checkpoint KB':>14} "
+          f"{'get_state ms':>13} {'resolve ms':>11}")
+    for positions in args.positions:
+        profile_text = format_profile_data(synthetic_profile(positions))
+        for mode in ("value", "reference"):
+            result = _run(mode, profile_text, args.episodes, args.turns)
+            print(f"{positions:>9} {len(profile_text.encode('utf-8')) / 1024:>10.1f} {mode:>9} "
+                  f"{result['db_kb']:>8.0f} {result['checkpoint_kb']:>14.1f} "
+                  f"{result['get_state_ms']:>13.2f} {result['resolve_ms']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
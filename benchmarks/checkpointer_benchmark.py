@@ -0,0 +1,127 @@
+"""
+Runs concurrent writers against a plain SqliteSaver and the one from get_checkpointer().
+
+Each worker owns one thread (episode) and repeatedly calls `get_state` and
+runs a turn of a one-node graph, like a Streamlit session does. Workers are
+threads of one process (`--processes 1`, one Streamlit server) or spread
+over several processes sharing the database file.
+
+  * shared: `SqliteSaver(sqlite3.connect(path, check_same_thread=False))`,
+    as graph/graph.py used to create it (5 s busy timeout);
+  * tuned: `get_checkpointer(path)` from graph/checkpointer.py, the same
+    saver with WAL and CHECKPOINT_BUSY_TIMEOUT.
+
+Usage:
+    python -m benchmarks.checkpointer_benchmark --workers 1 4 16 --turns 20 --processes 1 4
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Annotated, List, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
+
+from graph.checkpointer import get_checkpointer
+from states.state import append_messages
+
+
+class _State(TypedDict):
+    messages: Annotated[List[BaseMessage], append_messages]
+
+
+def _reply(state):
+    return {"messages": [AIMessage(content="A reply. " * 100)]}
+
+
+def _app(mode: str, path: str):
+    if mode == "shared":
+        checkpointer = SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+    else:
+        checkpointer = get_checkpointer(path)
+    workflow = StateGraph(_State)
+    workflow.add_node("reply", _reply)
+    workflow.set_entry_point("reply")
+    workflow.add_edge("reply", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def _worker(app, thread_id: str, turns: int, latencies: list, errors: list) -> None:
+    config = {"configurable": {"thread_id": thread_id}}
+    for turn in range(turns):
+        start = time.perf_counter()
+        try:
+            app.get_state(config)
+            app.invoke({"messages": [HumanMessage(content=f"Question {turn}")]}, config)
+        except sqlite3.OperationalError as e:
+            errors.append(str(e))
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def _process(mode: str, path: str, prefix: str, workers: int, turns: int, results) -> None:
+    app = _app(mode, path)
+    app.checkpointer.setup()
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=_worker, args=(app, f"{prefix}-{i}", turns, latencies, errors))
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put((latencies, errors))
+
+
+def _run(mode: str, processes: int, workers: int, turns: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="checkpointer-benchmark-"), "threads.sqlite")
+    _app(mode, path).checkpointer.setup()
+    results = multiprocessing.Queue()
+    start = time.perf_counter()
+    children = [
+        multiprocessing.Process(target=_process, args=(mode, path, f"p{p}", workers, turns, results))
+        for p in range(processes)
+    ]
+    for child in children:
+        child.start()
+    latencies, errors = [], []
+    for _ in children:
+        child_latencies, child_errors = results.get()
+        latencies += child_latencies
+        errors += child_errors
+    for child in children:
+        child.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "turns_per_second": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'processes':>9} {'workers':>7} {'mode':>6} {'turns/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'locked errors':>13}")
+    for processes in args.processes:
+        for workers in args.workers:
+            for mode in ("shared", "tuned"):
+                result = _run(mode, processes, workers, args.turns)
+                print(f"{processes:>9} {workers:>7} {mode:>6} {result['turns_per_second']:>8.0f} "
+                      f"{result['p50_ms']:>7.2f} {result['p95_ms']:>7.2f} {result['errors']:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Times `format_profile_data` on profiles with 1 to 500 positions.
+
+The previous `+=` implementation is kept below as the baseline. Its output
+is checked against the current formatter before timing. "legacy+write"
+adds the synchronous file write the scraper's copy did on every call.
+
+Usage:
+    python -m benchmarks.formatter_benchmark --sizes 1 10 100 500
+"""
+import argparse
+import os
+import tempfile
+import timeit
+
+from agents.profile_parser import format_profile_data, parse_profile, render_profile
+
+
+def _legacy_format_profile_data(item: dict) -> str:
+    first_name = item.get('firstName', '')
+    last_name = item.get('lastName', '')
+    formatted_string = f"**Profile for {f'{first_name} {last_name}'.strip()}**\n\n"
+    formatted_string += f"**Headline:** {item.get('headline', 'N/A')}\n\n"
+    formatted_string += f"**Summary (About Section):**\n{item.get('summary', 'N/A')}\n\n"
+    formatted_string += "**Experience:**\n\n"
+    positions = item.get('positions', [])
+    if not positions:
+        formatted_string += "No professional experience listed.\n\n"
+    else:
+        for i, pos in enumerate(positions, 1):
+            time_period_str = "Present"
+            time_period = pos.get('timePeriod', {})
+            if time_period:
+                start_date = time_period.get('startDate', {})
+                end_date = time_period.get('endDate', {})
+                start_str = f"{start_date.get('month')}/{start_date.get('year')}" if start_date.get('month') and start_date.get('year') else "N/A"
+                end_str = f"{end_date.get('month')}/{end_date.get('year')}" if end_date.get('month') and end_date.get('year') else "Present"
+                time_period_str = f"{start_str} - {end_str}"
+            formatted_string += f"{i}. **{pos.get('title', 'N/A')}** at {pos.get('companyName', 'N/A')} ({time_period_str})\n"
+            description = pos.get('description', '[No description provided]').strip()
+            formatted_description = "\n".join([f"    * {line}" for line in description.split('\n')])
+            formatted_string += f"{formatted_description}\n\n"
+    formatted_string += "**Education:**\n\n"
+    educations = item.get('educations', [])
+    if not educations:
+        formatted_string += "No education listed.\n\n"
+    else:
+        for edu in educations:
+            time_period = edu.get('timePeriod', {})
+            start_year = time_period.get('startDate', {}).get('year', '')
+            end_year = time_period.get('endDate', {}).get('year', '')
+            date_range = f"({start_year} - {end_year})" if start_year and end_year else ""
+            edu_str = f"*   **{edu.get('degreeName', '')}**"
+            if edu.get('fieldOfStudy'):
+                edu_str += f" in {edu.get('fieldOfStudy')}"
+            edu_str += f" - {edu.get('schoolName', 'N/A')} {date_range}\n"
+            formatted_string += edu_str
+        formatted_string += "\n"
+    formatted_string += "**Top Skills:**\n"
+    skills = item.get('skills', [])
+    if not skills:
+        formatted_string += "No skills listed.\n"
+    else:
+        for skill in skills:
+            formatted_string += f"*   {skill}\n"
+    formatted_string += "\n"
+    formatted_string += "**Certifications:**\n"
+    certifications = item.get('certifications', [])
+    if not certifications:
+        formatted_string += "No certifications listed.\n"
+    else:
+        for cert in certifications:
+            cert_str = f"*   {cert.get('name', 'N/A')}"
+            if cert.get('authority', ''):
+                cert_str += f" ({cert.get('authority', '')})"
+            formatted_string += f"{cert_str}\n"
+    return formatted_string.strip()
+
+
+def synthetic_profile(num_positions: int) -> dict:
+    return {
+        "firstName": "Bench",
+        "lastName": "Mark",
+        "headline": "Senior Engineer",
+        "summary": "Engineer with a long history of shipping. " * 10,
+        "positions": [
+            {
+                "title": f"Engineer {i}",
+                "companyName": f"Company {i}",
+                "description": "\n".join(f"Delivered project {j} for team {i}." for j in range(6)),
+                "timePeriod": {"startDate": {"month": 1, "year": 2000 + i % 25}, "endDate": {"month": 12, "year": 2001 + i % 25}},
+            }
+            for i in range(num_positions)
+        ],
+        "educations": [{"degreeName": "BSc", "schoolName": "University", "fieldOfStudy": "CS",
+                        "timePeriod": {"startDate": {"year": 1996}, "endDate": {"year": 2000}}}],
+        "skills": [f"Skill {i}" for i in range(30)],
+        "certifications": [{"name": f"Cert {i}", "authority": "Issuer"} for i in range(10)],
+    }
+
+
+def _legacy_with_write(item: dict, path: str) -> str:
+    text = _legacy_format_profile_data(item)
+    with open(path, "w") as f:
+        f.write(text)
+    return text
+
+
+def _time(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 100, 250, 500])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="formatter-benchmark-"), "profile.txt")
+    print(f"{'positions':>9} {'chars':>8} {'legacy us':>10} {'legacy+write us':>16} {'current us':>11} "
+          f"{'parse us':>9} {'render us':>10} {'speedup':>8}")
+    for size in args.sizes:
+        item = synthetic_profile(size)
+        text = format_profile_data(item)
+        assert text == _legacy_format_profile_data(item), f"Output differs for {size} positions"
+        profile = parse_profile(item)
+        legacy = _time(lambda: _legacy_format_profile_data(item), args.repeat)
+        legacy_write = _time(lambda: _legacy_with_write(item, path), args.repeat)
+        current = _time(lambda: format_profile_data(item), args.repeat)
+        parse = _time(lambda: parse_profile(item), args.repeat)
+        render = _time(lambda: render_profile(profile), args.repeat)
+        print(f"{size:>9} {len(text):>8} {legacy:>10.1f} {legacy_write:>16.1f} {current:>11.1f} "
+              f"{parse:>9.1f} {render:>10.1f} {legacy / current:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measures the per-turn cost of the `messages` reducer at 10, 100 and 1000 messages.
+
+Compares the old `lambda x, y: x + y` reducer with `append_messages`, which
+deduplicates by ID at the price of a pass over the history:
+  * reducer: one turn's updates (a new user message, then the AI reply
+    with its ID) applied to a history of the given size loaded back as a
+    plain list, as happens between turns;
+  * resend: re-sending a message already in the history (as a repeated
+    `app.update_state` does): the old reducer duplicates it, the new one
+    returns the history unchanged;
+  * turn: one `invoke` of a single-node graph on a SqliteSaver, including
+    loading and writing the checkpoint.
+
+Usage:
+    python -m benchmarks.message_log_benchmark --sizes 10 100 1000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from typing import Annotated, List, TypedDict
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, StateGraph
+
+from states.state import append_messages
+
+
+def _legacy(x, y):
+    return x + y
+
+
+def _history(size: int) -> list:
+    return [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content=f"Message {i}: " + "lorem ipsum " * 40, id=f"m{i}")
+        for i in range(size)
+    ]
+
+
+def _reducer_us(reducer, history: list, turns: int) -> float:
+    start = time.perf_counter()
+    for i in range(turns):
+        updated = reducer(history, [HumanMessage(content=f"Question {i}")])
+        reducer(updated, [AIMessage(content="Answer", id=str(uuid.uuid4()))])
+    return (time.perf_counter() - start) / turns * 1e6
+
+
+def _graph(reducer, path: str):
+    class State(TypedDict):
+        messages: Annotated[List[BaseMessage], reducer]
+
+    def reply(state):
+        return {"messages": [AIMessage(content="A reply. " * 40)]}
+
+    workflow = StateGraph(State)
+    workflow.add_node("reply", reply)
+    workflow.set_entry_point("reply")
+    workflow.add_edge("reply", END)
+    return workflow.compile(checkpointer=SqliteSaver(sqlite3.connect(path, check_same_thread=False)))
+
+
+def _turn_ms(reducer, history: list, turns: int) -> float:
+    path = os.path.join(tempfile.mkdtemp(prefix="message-log-benchmark-"), "threads.sqlite")
+    app = _graph(reducer, path)
+    config = {"configurable": {"thread_id": "benchmark"}}
+    app.update_state(config, {"messages": history})
+    start = time.perf_counter()
+    for i in range(turns):
+        app.invoke({"messages": [HumanMessage(content=f"Question {i}")]}, config)
+    return (time.perf_counter() - start) / turns * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'messages':>8} {'reducer legacy us':>18} {'reducer new us':>15} "
+          f"{'resend legacy':>14} {'resend new':>11} {'turn legacy ms':>15} {'turn new ms':>12}")
+    for size in args.sizes:
+        history = _history(size)
+        legacy = _reducer_us(_legacy, history, 200)
+        new = _reducer_us(append_messages, history, 200)
+        resend_legacy = len(_legacy(history, history[-1:]))
+        resend_new = len(append_messages(history, history[-1:]))
+        turn_legacy = _turn_ms(_legacy, history, args.turns)
+        turn_new = _turn_ms(append_messages, history, args.turns)
+        print(f"{size:>8} {legacy:>18.2f} {new:>15.2f} "
+              f"{resend_legacy:>14} {resend_new:>11} {turn_legacy:>15.2f} {turn_new:>12.2f}")
+    print("\nresend columns: history length after re-sending the last message (size + 1 means it was duplicated).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Measures profile ingestion throughput against the offline replay backend.
+
+No network access or Apify credits are used: synthetic profiles are recorded
+into a temporary directory and served by `ReplayBackend` with the given
+latency and failure injection.
+
+Usage:
+    python -m benchmarks.scraper_benchmark --profiles 200 --run-latency 2 --url-latency 0.05
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+_workdir = tempfile.mkdtemp(prefix="scraper-benchmark-")
+os.environ["CACHE_DB_PATH"] = os.path.join(_workdir, "cache.sqlite")
+
+from agents import ingestion, linkedin_scraper as scraper
+from agents.scraper_backends import ReplayBackend, record_item, set_backend
+from cache import profile_cache
+
+
+def _synthetic_profile(i: int) -> dict:
+    return {
+        "firstName": f"User{i}",
+        "lastName": "Benchmark",
+        "headline": "Data Scientist",
+        "summary": "Builds models. " * 20,
+        "positions": [
+            {"title": f"Role {j}", "companyName": f"Company {j}", "description": "Did things.\nShipped more things.",
+             "timePeriod": {"startDate": {"month": 1, "year": 2015 + j}}}
+            for j in range(5)
+        ],
+        "skills": ["Python", "SQL", "Machine Learning"],
+    }
+
+
+def _report(name: str, count: int, seconds: float, **extra) -> None:
+    details = " ".join(f"{key}={value}" for key, value in extra.items())
+    print(f"{name:<32} {count:>5} profiles {seconds:>8.2f}s {count / seconds if seconds else 0:>8.1f}/s  {details}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--single", type=int, default=10, help="Profiles scraped one at a time.")
+    parser.add_argument("--run-latency", type=float, default=2.0)
+    parser.add_argument("--url-latency", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1, 10, 25, 50])
+    parser.add_argument("--parallel-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    recordings = os.path.join(_workdir, "recordings")
+    urls = [f"https://www.linkedin.com/in/benchmark-user-{i}" for i in range(args.profiles)]
+    for i, url in enumerate(urls):
+        record_item(url, _synthetic_profile(i), recordings)
+    backend = ReplayBackend(recordings, args.run_latency, args.url_latency, args.failure_rate, args.missing_rate, seed=0)
+    set_backend(backend)
+    print(f"Replay backend: {args.run_latency}s per run + {args.url_latency}s per URL, "
+          f"failure rate {args.failure_rate}, missing rate {args.missing_rate}\n")
+
+    single = urls[:args.single]
+    start = time.perf_counter()
+    for url in single:
+        scraper.linkedin_scraper(url, use_cache=False)
+    _report("single, no cache", len(single), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for url in single:
+        scraper.linkedin_scraper(url)
+    _report("single, warm cache", len(single), time.perf_counter() - start)
+
+    url, runs = urls[-1], backend.runs
+    threads = [threading.Thread(target=scraper.linkedin_scraper, args=(url,)) for _ in range(10)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    _report("10 concurrent, same profile", 1, time.perf_counter() - start, actor_runs=backend.runs - runs)
+
+    for chunk_size in args.chunk_sizes:
+        runs = backend.runs
+        start = time.perf_counter()
+        profiles, failures = scraper.linkedin_scraper_batch(
+            urls, chunk_size=chunk_size, max_parallel_runs=args.parallel_runs, use_cache=False
+        )
+        _report(f"batch, chunk {chunk_size}", len(profiles), time.perf_counter() - start,
+                actor_runs=backend.runs - runs, failed=len(failures))
+
+    fresh = [f"https://www.linkedin.com/in/benchmark-ingest-{i}" for i in range(ingestion.INGESTION_WORKERS * 2)]
+    for i, url in enumerate(fresh):
+        record_item(url, _synthetic_profile(i), recordings)
+    start = time.perf_counter()
+    jobs = [ingestion.submit_ingestion(url) for url in fresh]
+    while any(ingestion.get_job(job)["status"] not in (ingestion.READY, ingestion.FAILED) for job in jobs):
+        time.sleep(0.01)
+    _report(f"ingestion pool ({ingestion.INGESTION_WORKERS} workers)", len(fresh), time.perf_counter() - start,
+            **ingestion.get_stats())
+
+    print(f"\nProfile cache: {profile_cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
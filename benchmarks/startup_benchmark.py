@@ -0,0 +1,84 @@
+"""
+Measures the cold-start cost of the graph: import time and first-turn latency.
+
+Every run is a fresh Python process (so nothing is already imported) that
+times, in order:
+
+  * import: `import graph.graph`;
+  * build: compiling the graph and opening its checkpointer (`get_app()`);
+  * first turn / second turn: one `invoke` of a new thread each, with the
+    chat models replaced by a fake (no network; the provider SDKs are not
+    imported, which `warm_up()` does in the background in the app).
+
+Pass `--repo` with an older checkout to compare against it; trees from
+before `get_app()` existed compile the graph during the import.
+
+Usage:
+    python -m benchmarks.startup_benchmark --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_CHILD = """
+import time
+start = time.perf_counter()
+import graph.graph as graph_module
+imported = time.perf_counter()
+get_app = getattr(graph_module, "get_app", None) or (lambda: graph_module.app)
+app = get_app()
+built = time.perf_counter()
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+import itertools
+import llm.registry
+llm.registry._build_client = lambda config: GenericFakeChatModel(
+    messages=itertools.cycle([AIMessage(content="general_question")])
+)
+
+turns = []
+for thread_id in ("first", "second"):
+    config = {"configurable": {"thread_id": thread_id}}
+    turn_start = time.perf_counter()
+    app.invoke({"messages": [HumanMessage(content="What should I learn next year?")], "profile_text": "Profile"}, config)
+    turns.append(time.perf_counter() - turn_start)
+print(json.dumps({"import": imported - start, "build": built - imported, "first_turn": turns[0], "second_turn": turns[1]}))
+"""
+
+
+def _run_once(repo: str) -> dict:
+    workdir = tempfile.mkdtemp(prefix="startup-benchmark-")
+    env = dict(
+        os.environ,
+        THREADS_DB_PATH=os.path.join(workdir, "threads.sqlite"),
+        CACHE_DB_PATH=os.path.join(workdir, "cache.sqlite"),
+        ROUTER_TRAFFIC_LOG=os.path.join(workdir, "router_traffic.jsonl"),
+        groq_api_key=os.getenv("groq_api_key", "benchmark"),
+        google_api_key=os.getenv("google_api_key", "benchmark"),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", "import json\n" + _CHILD],
+        cwd=repo, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--repo", default=os.getcwd(), help="The checkout to measure.")
+    args = parser.parse_args()
+
+    samples = [_run_once(args.repo) for _ in range(args.runs)]
+    print(f"{'phase':>12} {'p50 ms':>8} {'min ms':>8} {'max ms':>8}")
+    for phase in ("import", "build", "first_turn", "second_turn"):
+        values = sorted(sample[phase] * 1000 for sample in samples)
+        print(f"{phase:>12} {values[len(values) // 2]:>8.1f} {values[0]:>8.1f} {values[-1]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from cache.profile_cache import canonical_profile_url
+
+ARTIFACT_STORE_DIR = os.getenv("ARTIFACT_STORE_DIR", "artifacts")
+# Compressed bytes kept on disk; the least recently used artifacts are removed beyond this.
+ARTIFACT_STORE_MAX_BYTES = int(os.getenv("ARTIFACT_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+RAW = "raw"
+FORMATTED = "formatted"
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_store = None
+_lock = threading.Lock()
+
+
+class ArtifactStore:
+    """
+    A content-addressed, compressed store for raw and formatted profiles.
+
+    Each artifact is saved once under the SHA-256 of its content as
+    `objects/<2 hex>/<hash>.z` (zlib-compressed), written to a temporary
+    file and renamed into place so readers never see a partial file. A
+    SQLite index maps profile URLs to their latest raw and formatted
+    artifacts and tracks sizes and last access for the size-bounded GC.
+    Artifacts can also be held, e.g. by the graph threads whose state
+    references them; the GC never removes a held artifact.
+    """
+
+    def __init__(self, root: str = None, max_bytes: int = None):
+        self.root = root or ARTIFACT_STORE_DIR
+        self.max_bytes = max_bytes or ARTIFACT_STORE_MAX_BYTES
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                "hash TEXT PRIMARY KEY, kind TEXT NOT NULL, size INTEGER NOT NULL, "
+                "stored_size INTEGER NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS objects_last_access ON objects (last_access)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS refs ("
+                "url TEXT NOT NULL, kind TEXT NOT NULL, hash TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (url, kind))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS refs_hash ON refs (hash)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS holders ("
+                "holder TEXT NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (holder, hash))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS holders_hash ON holders (hash)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.z")
+
+    def put(self, data: bytes, kind: str, holder: str = None) -> str:
+        """
+        Stores content once and returns its hash.
+
+        Storing content that is already present only refreshes its last
+        access. Call `gc` afterwards to enforce the size limit.
+
+        Args:
+            data: The content.
+            kind: RAW or FORMATTED.
+            holder: Also hold the artifact for this holder (see `hold`).
+                The hold is recorded before the content, so a concurrent GC
+                cannot remove it in between.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        if holder is not None:
+            self.hold(holder, [digest])
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM objects WHERE hash = ?", (digest,)).fetchone() and os.path.exists(self._path(digest)):
+            with conn:
+                conn.execute("UPDATE objects SET last_access = ? WHERE hash = ?", (now, digest))
+            return digest
+
+        compressed = zlib.compress(data, 6)
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO objects (hash, kind, size, stored_size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, kind, len(data), len(compressed), now, now),
+            )
+        return digest
+
+    def get(self, digest: str):
+        """Returns the content stored under a hash, or None."""
+        try:
+            with open(self._path(digest), "rb") as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE objects SET last_access = ? WHERE hash = ?", (time.time(), digest))
+        return data
+
+    def tag(self, profile_url: str, kind: str, digest: str) -> None:
+        """Points a profile URL's raw or formatted artifact at a hash."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO refs (url, kind, hash, updated_at) VALUES (?, ?, ?, ?)",
+                (canonical_profile_url(profile_url) or profile_url, kind, digest, time.time()),
+            )
+
+    def hold(self, holder: str, digests: list) -> None:
+        """Protects artifacts from the GC until `release` is called for the holder."""
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO holders (holder, hash) VALUES (?, ?)",
+                             [(holder, digest) for digest in digests])
+
+    def release(self, holders: list) -> None:
+        """Drops every hold of the given holders; their artifacts become collectable."""
+        conn = self._connect()
+        with conn:
+            conn.executemany("DELETE FROM holders WHERE holder = ?", [(holder,) for holder in holders])
+
+    def resolve(self, key: str, kind: str):
+        """Turns a hash or a profile URL into the hash of its latest artifact of `kind`."""
+        if _HASH_RE.match(key):
+            return key
+        row = self._connect().execute(
+            "SELECT hash FROM refs WHERE url = ? AND kind = ?", (canonical_profile_url(key) or key, kind)
+        ).fetchone()
+        return row[0] if row else None
+
+    def total_bytes(self) -> int:
+        return self._connect().execute("SELECT COALESCE(SUM(stored_size), 0) FROM objects").fetchone()[0]
+
+    def gc(self, max_bytes: int = None) -> dict:
+        """
+        Removes artifacts until the store fits in `max_bytes`.
+
+        Artifacts no profile URL points to any more go first, then the least
+        recently used ones (together with the URLs pointing at them). Held
+        artifacts are never removed.
+
+        Returns:
+            The number of artifacts removed and the bytes freed.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        conn = self._connect()
+        total = self.total_bytes()
+        removed, freed = 0, 0
+        if total <= limit:
+            return {"removed": 0, "bytes_freed": 0}
+        candidates = conn.execute(
+            "SELECT hash, stored_size FROM objects "
+            "WHERE NOT EXISTS (SELECT 1 FROM holders WHERE holders.hash = objects.hash) ORDER BY "
+            "EXISTS (SELECT 1 FROM refs WHERE refs.hash = objects.hash), last_access"
+        ).fetchall()
+        for digest, stored_size in candidates:
+            if total - freed <= limit:
+                break
+            try:
+                os.remove(self._path(digest))
+            except FileNotFoundError:
+                pass
+            with conn:
+                conn.execute("DELETE FROM objects WHERE hash = ?", (digest,))
+                conn.execute("DELETE FROM refs WHERE hash = ?", (digest,))
+            removed += 1
+            freed += stored_size
+        return {"removed": removed, "bytes_freed": freed}
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        objects, size, stored = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM objects"
+        ).fetchone()
+        profiles = conn.execute("SELECT COUNT(DISTINCT url) FROM refs").fetchone()[0]
+        held = conn.execute("SELECT COUNT(DISTINCT hash) FROM holders").fetchone()[0]
+        return {
+            "objects": objects,
+            "profiles": profiles,
+            "held": held,
+            "bytes": size,
+            "stored_bytes": stored,
+            "compression_ratio": stored / size if size else 0.0,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def get_store() -> ArtifactStore:
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = ArtifactStore()
+    return _store
+
+
+def put_profile(profile_url: str = None, raw_item: dict = None, profile_text: str = None, holder: str = None) -> dict:
+    """
+    Saves a profile's raw data and/or formatted text.
+
+    Args:
+        profile_url: Indexes the artifacts under this URL when given.
+        raw_item: The raw Apify item.
+        profile_text: The formatted profile.
+        holder: Holds the artifacts for this holder (a graph thread ID), so
+            the GC keeps them until it is released.
+
+    Returns:
+        The hashes of the stored artifacts, keyed by "raw" and "formatted".
+    """
+    store = get_store()
+    hashes = {}
+    if raw_item is not None:
+        hashes[RAW] = store.put(json.dumps(raw_item, sort_keys=True).encode("utf-8"), RAW, holder)
+    if profile_text is not None:
+        hashes[FORMATTED] = store.put(profile_text.encode("utf-8"), FORMATTED, holder)
+    if profile_url:
+        for kind, digest in hashes.items():
+            store.tag(profile_url, kind, digest)
+    if store.total_bytes() > store.max_bytes:
+        store.gc()
+    return hashes
+
+
+def load_profile_text(key: str):
+    """Returns the formatted profile for a profile URL or content hash, or None."""
+    digest = get_store().resolve(key, FORMATTED) if key else None
+    data = get_store().get(digest) if digest else None
+    return data.decode("utf-8") if data is not None else None
+
+
+def load_raw_profile(key: str):
+    """Returns the raw profile data for a profile URL or content hash, or None."""
+    digest = get_store().resolve(key, RAW) if key else None
+    data = get_store().get(digest) if digest else None
+    return json.loads(data) if data is not None else None
+
+
+def get_stats() -> dict:
+    """Returns the number of artifacts and profiles and the stored size."""
+    return get_store().stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the profile artifact store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("import", help="Store a formatted profile text file and print its key.")
+    add.add_argument("path")
+    add.add_argument("--url", help="Also index it under this LinkedIn profile URL.")
+    show = commands.add_parser("show", help="Print a formatted profile by URL or hash.")
+    show.add_argument("key")
+    collect = commands.add_parser("gc", help="Shrink the store to its size limit.")
+    collect.add_argument("--max-bytes", type=int)
+    commands.add_parser("stats")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        with open(args.path, "r", encoding="utf-8", errors="replace") as f:
+            print(put_profile(args.url, profile_text=f.read())[FORMATTED])
+    elif args.command == "show":
+        text = load_profile_text(args.key)
+        if text is None:
+            raise SystemExit(f"No formatted profile for {args.key}")
+        print(text)
+    elif args.command == "gc":
+        print(get_store().gc(args.max_bytes))
+    else:
+        print(get_stats())
+
+
+if __name__ == "__main__":
+    main()
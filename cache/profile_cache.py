@@ -0,0 +1,169 @@
+import os
+import threading
+from concurrent.futures import Future
+from urllib.parse import unquote, urlparse
+
+from cache.sqlite_cache import SqliteCache
+
+# Profiles younger than this are served without contacting Apify.
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", str(24 * 3600)))
+# Older profiles up to this age are served immediately while a background
+# scrape refreshes them; anything older is scraped before returning.
+PROFILE_CACHE_STALE_TTL = float(os.getenv("PROFILE_CACHE_STALE_TTL", str(30 * 24 * 3600)))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "5000"))
+
+_cache = None
+_lock = threading.Lock()
+_inflight = {}
+_stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "shared": 0, "refreshes": 0, "refresh_failures": 0}
+_ages = []
+
+
+def canonical_profile_url(profile_url: str):
+    """
+    Reduces a LinkedIn profile URL to `https://www.linkedin.com/in/<id>`.
+
+    Scheme, subdomain (www., uk., m.), query string, fragment, trailing
+    path segments and letter case are ignored, so every way of writing the
+    same profile maps to one cache key.
+
+    Returns:
+        The canonical URL, or None if the URL is not a linkedin.com/in/ profile.
+    """
+    url = profile_url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if host != "linkedin.com" and not host.endswith(".linkedin.com"):
+        return None
+    parts = [part for part in parsed.path.split("/") if part]
+    if len(parts) < 2 or parts[0].lower() != "in":
+        return None
+    return f"https://www.linkedin.com/in/{unquote(parts[1]).lower()}"
+
+
+def _get_cache() -> SqliteCache:
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = SqliteCache("profile_cache", max_entries=PROFILE_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def _count(name: str, age: float = None) -> None:
+    with _lock:
+        _stats[name] += 1
+        if age is not None:
+            _ages.append(age)
+            del _ages[:-1000]
+
+
+def _scrape_once(key: str, profile_url: str, scrape):
+    """Runs `scrape` for a key, or waits for the scrape already running for it."""
+    with _lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        _count("shared")
+        return future.result()
+    try:
+        item = scrape(profile_url)
+        if item:
+            _get_cache().set(key, item)
+        future.set_result(item)
+        return item
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+
+
+def _refresh(key: str, profile_url: str, scrape) -> None:
+    with _lock:
+        if key in _inflight:
+            return
+    _count("refreshes")
+
+    def run():
+        try:
+            item = _scrape_once(key, profile_url, scrape)
+            if not item:
+                _count("refresh_failures")
+                return
+            # Formatting with the URL saves the new version and diffs its sections (cache/profile_diff.py).
+            from agents.profile_parser import format_profile_data
+            format_profile_data(item, profile_url=profile_url)
+        except Exception as e:
+            _count("refresh_failures")
+            print(f"---SCRAPER: Background refresh of {key} failed: {e}---")
+
+    threading.Thread(target=run, name="profile-refresh", daemon=True).start()
+
+
+def get_profile(profile_url: str, scrape):
+    """
+    Returns the raw profile for a URL, scraping it only when needed.
+
+    Args:
+        profile_url: Any form of a linkedin.com/in/ URL.
+        scrape: The function that scrapes one URL and returns the raw
+            profile dict (or None on failure).
+
+    Returns:
+        The raw profile dict, or None if it could not be scraped. A stale
+        cached copy is returned at once and refreshed in the background;
+        concurrent callers for the same profile share one scrape.
+    """
+    key = canonical_profile_url(profile_url)
+    if key is None:
+        return scrape(profile_url)
+    item, age = _get_cache().get_entry(key)
+    if item is not None and age <= PROFILE_CACHE_TTL:
+        _count("fresh_hits", age)
+        return item
+    if item is not None and age <= PROFILE_CACHE_STALE_TTL:
+        print(f"---SCRAPER: Serving cached profile ({age / 3600:.1f}h old) and refreshing it in the background---")
+        _count("stale_hits", age)
+        _refresh(key, profile_url, scrape)
+        return item
+    _count("misses")
+    return _scrape_once(key, profile_url, scrape)
+
+
+def get_fresh_profile(profile_url: str):
+    """Returns the cached profile if it is younger than PROFILE_CACHE_TTL, else None."""
+    key = canonical_profile_url(profile_url)
+    if key is None:
+        return None
+    item, age = _get_cache().get_entry(key)
+    if item is not None and age <= PROFILE_CACHE_TTL:
+        _count("fresh_hits", age)
+        return item
+    _count("misses")
+    return None
+
+
+def store_profile(profile_url: str, item: dict) -> None:
+    """Caches a profile scraped elsewhere, e.g. by a batch run."""
+    key = canonical_profile_url(profile_url)
+    if key and item:
+        _get_cache().set(key, item)
+
+
+def get_stats() -> dict:
+    """Returns fresh/stale hit and miss counts, the hit rate and the age of the profiles served."""
+    with _lock:
+        stats = dict(_stats)
+        ages = sorted(_ages)
+    lookups = stats["fresh_hits"] + stats["stale_hits"] + stats["misses"]
+    stats["hit_rate"] = (stats["fresh_hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+    stats["age_p50"] = ages[len(ages) // 2] if ages else None
+    stats["age_max"] = ages[-1] if ages else None
+    stats["entries"] = _get_cache().stats()["entries"]
+    return stats
@@ -0,0 +1,77 @@
+import threading
+
+from agents.profile_views import section_fingerprints
+from cache.profile_cache import canonical_profile_url
+from cache.sqlite_cache import SqliteCache
+
+_store = None
+_lock = threading.Lock()
+_stats = {"profiles": 0, "rescrapes": 0, "unchanged_rescrapes": 0, "sections_changed": 0}
+
+
+def _get_store() -> SqliteCache:
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = SqliteCache("profile_sections")
+    return _store
+
+
+def diff_sections(old: dict, new: dict) -> dict:
+    """
+    Compares two {section name: fingerprint} mappings.
+
+    Returns:
+        A dictionary of section name lists under "added", "removed",
+        "changed" and "unchanged".
+    """
+    return {
+        "added": [name for name in new if name not in old],
+        "removed": [name for name in old if name not in new],
+        "changed": [name for name in new if name in old and old[name] != new[name]],
+        "unchanged": [name for name in new if old.get(name) == new[name]],
+    }
+
+
+def record_profile(profile_url: str, profile_text: str):
+    """
+    Stores the section fingerprints of a freshly formatted profile.
+
+    If the profile was seen before, the sections are compared with the
+    previous version. Nothing needs to be dropped: cached responses are
+    keyed by the profile view they were built from (cache/response_cache.py),
+    so only answers that used a changed section stop matching.
+
+    Args:
+        profile_url: The profile's linkedin.com/in/ URL.
+        profile_text: The formatted profile.
+
+    Returns:
+        The section diff (see `diff_sections`), or None on the first scrape.
+    """
+    key = canonical_profile_url(profile_url) or profile_url
+    new = dict(section_fingerprints(profile_text))
+    store = _get_store()
+    old, _ = store.get_entry(key)
+    store.set(key, new)
+    with _lock:
+        _stats["profiles" if old is None else "rescrapes"] += 1
+    if old is None:
+        return None
+
+    diff = diff_sections(old, new)
+    changed = diff["changed"] + diff["removed"] + diff["added"]
+    with _lock:
+        _stats["sections_changed"] += len(changed)
+        if not changed:
+            _stats["unchanged_rescrapes"] += 1
+    if changed:
+        print(f"---PROFILE: {key} changed in {', '.join(changed)}---")
+    return diff
+
+
+def get_stats() -> dict:
+    """Returns counts of first scrapes, re-scrapes and changed sections."""
+    with _lock:
+        return dict(_stats)
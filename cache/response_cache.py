@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.runnables import RunnableConfig
+
+from cache.sqlite_cache import SqliteCache
+from llm.registry import get_llm, get_node_config
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", str(24 * 3600)))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _get_cache() -> SqliteCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SqliteCache("response_cache", ttl_seconds=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def response_key(node: str, prompt_template, inputs: dict) -> str:
+    """
+    Hashes everything that determines a specialist's answer: the node, the
+    prompt template text, the model settings and the prompt inputs (profile
+    view and conversation window).
+
+    The profile view only contains the sections a node uses, so a re-scrape
+    that changes other sections keeps the answer reachable, and one that
+    changes a section in the view makes it unreachable until it expires.
+    """
+    templates = [message.prompt.template for message in prompt_template.messages]
+    payload = json.dumps(
+        {
+            "node": node,
+            "templates": templates,
+            "model": get_node_config(node),
+            "inputs": inputs,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_bypassed(config: RunnableConfig) -> bool:
+    """A request skips the cache with {"configurable": {"cache_bypass": True}}."""
+    return bool((config or {}).get("configurable", {}).get("cache_bypass"))
+
+
+def _lookup(node: str, key: str):
+    cached = _get_cache().get(key)
+    if cached is None:
+        return None
+    print(f"---CACHE: Serving cached response for '{node}'---")
+    return messages_from_dict([cached])[0]
+
+
+def _store(key: str, response) -> None:
+    stored = message_to_dict(response)
+    # A cached answer may be replayed into another thread, so it must not carry this message's ID.
+    stored["data"].pop("id", None)
+    _get_cache().set(key, stored)
+
+
+def invoke_cached(node: str, prompt_template, inputs: dict, config: RunnableConfig = None):
+    """
+    Runs `prompt_template | llm` for a node, serving repeated prompts from the cache.
+
+    Args:
+        node: The graph node name, used to pick the model and scope the key.
+        prompt_template: The node's ChatPromptTemplate.
+        inputs: The template variables.
+        config: The run config; see `is_bypassed`.
+
+    Returns:
+        The AI message, either fresh or rebuilt from the cache.
+    """
+    chain = prompt_template | get_llm(node)
+    if is_bypassed(config):
+        return chain.invoke(inputs)
+
+    key = response_key(node, prompt_template, inputs)
+    cached = _lookup(node, key)
+    if cached is not None:
+        return cached
+
+    response = chain.invoke(inputs)
+    _store(key, response)
+    return response
+
+
+async def ainvoke_cached(node: str, prompt_template, inputs: dict, config: RunnableConfig = None):
+    """Async variant of `invoke_cached`. Cache I/O runs in a worker thread."""
+    chain = prompt_template | get_llm(node)
+    if is_bypassed(config):
+        return await chain.ainvoke(inputs)
+
+    key = response_key(node, prompt_template, inputs)
+    cached = await asyncio.to_thread(_lookup, node, key)
+    if cached is not None:
+        return cached
+
+    response = await chain.ainvoke(inputs)
+    await asyncio.to_thread(_store, key, response)
+    return response
+
+
+def get_stats() -> dict:
+    """Returns hit/miss counters and the number of cached responses."""
+    return _get_cache().stats()
@@ -0,0 +1,65 @@
+import os
+import re
+import threading
+
+from cache.sqlite_cache import SqliteCache
+from states.state import ROUTES
+
+ROUTE_CACHE_TTL = float(os.getenv("ROUTE_CACHE_TTL", str(7 * 24 * 3600)))
+ROUTE_CACHE_MAX_ENTRIES = int(os.getenv("ROUTE_CACHE_MAX_ENTRIES", "10000"))
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+_cache = None
+_cache_lock = threading.Lock()
+_rejected = 0
+
+
+def normalize_message(text: str) -> str:
+    """Case-folds the message and strips whitespace and punctuation."""
+    return _NON_WORD_RE.sub("", text.casefold())
+
+
+def _get_cache() -> SqliteCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SqliteCache("route_cache", ttl_seconds=ROUTE_CACHE_TTL, max_entries=ROUTE_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def get_cached_route(text: str):
+    """
+    Returns the route previously decided for an equivalent message, or None.
+
+    Cached values that are not one of the graph's routes are dropped so a bad
+    classification can never send the graph down a missing edge.
+    """
+    key = normalize_message(text)
+    if not key:
+        return None
+    return _get_cache().get(key, validate=_is_valid_route)
+
+
+def _is_valid_route(route) -> bool:
+    global _rejected
+    if route in ROUTES:
+        return True
+    with _cache_lock:
+        _rejected += 1
+    return False
+
+
+def cache_route(text: str, route: str) -> None:
+    """Remembers the route for a message. Invalid routes are never stored."""
+    key = normalize_message(text)
+    if key and route in ROUTES:
+        _get_cache().set(key, route)
+
+
+def get_stats() -> dict:
+    """Returns hit/miss counters, the number of entries and rejected values."""
+    stats = _get_cache().stats()
+    stats["rejected"] = _rejected
+    return stats
@@ -0,0 +1,121 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "cache.sqlite")
+
+
+class SqliteCache:
+    """
+    A small key-value cache stored in a SQLite table.
+
+    Values are JSON-encoded. Entries expire after `ttl_seconds` and the table
+    is kept under `max_entries` by evicting the least recently used rows. The
+    database runs in WAL mode with one connection per thread, so the same
+    cache can be shared by threads and by separate processes.
+    """
+
+    def __init__(self, table: str, path: str = None, ttl_seconds: float = None, max_entries: int = None):
+        self.table = table
+        self.path = path or CACHE_DB_PATH
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_entry(self, key: str):
+        """
+        Looks up a key regardless of its TTL.
+
+        Returns:
+            A (value, age_seconds) tuple, or (None, None) if the key is absent.
+        """
+        conn = self._connect()
+        row = conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, None
+        now = time.time()
+        with conn:
+            conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), now - row[1]
+
+    def get(self, key: str, validate=None):
+        """
+        Returns the cached value, or None on a miss or an expired entry.
+
+        Args:
+            key: The cache key.
+            validate: An optional predicate. Values it rejects are deleted
+                and counted as misses.
+        """
+        value, age = self.get_entry(key)
+        if value is None:
+            self._count(hit=False)
+            return None
+        expired = self.ttl_seconds is not None and age > self.ttl_seconds
+        if expired or (validate is not None and not validate(value)):
+            self.delete(key)
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return value
+
+    def set(self, key: str, value) -> None:
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            if self.max_entries is not None:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def delete(self, key: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters for this process and the number of stored entries."""
+        size = self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": size,
+        }
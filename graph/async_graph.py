@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+
+from langchain_core.messages import HumanMessage
+
+from graph.checkpointer import THREADS_DB_PATH, get_async_checkpointer
+from graph.graph import build_workflow
+from llm.rate_limiter import with_turn_deadline
+
+
+@asynccontextmanager
+async def async_app(db_path: str = THREADS_DB_PATH):
+    """
+    Compiles the graph with async nodes and an async SQLite checkpointer.
+
+    Usage:
+        async with async_app() as app:
+            await app.ainvoke(inputs, config)
+    """
+    async with get_async_checkpointer(db_path) as checkpointer:
+        yield build_workflow(asynchronous=True).compile(checkpointer=checkpointer)
+
+
+async def run_turn(app, thread_id: str, message: str):
+    """Sends one user message to a thread and returns the AI's reply."""
+    config = with_turn_deadline({"configurable": {"thread_id": thread_id}})
+    final_state = await app.ainvoke({"messages": [HumanMessage(content=message)]}, config)
+    return final_state["messages"][-1]
+
+
+async def run_threads(app, conversations: dict, max_concurrency: int = 16) -> dict:
+    """
+    Drives many threads at once.
+
+    Messages within a thread are sent in order; different threads run
+    concurrently, at most `max_concurrency` turns at a time.
+
+    Args:
+        app: A graph compiled by `async_app`.
+        conversations: A mapping from thread_id to a list of user messages.
+        max_concurrency: The maximum number of turns in flight.
+
+    Returns:
+        A mapping from thread_id to the list of AI replies.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_conversation(thread_id, messages):
+        replies = []
+        for message in messages:
+            async with semaphore:
+                replies.append(await run_turn(app, thread_id, message))
+        return replies
+
+    results = await asyncio.gather(*(
+        run_conversation(thread_id, messages) for thread_id, messages in conversations.items()
+    ))
+    return dict(zip(conversations, results))
+
+
+async def main(thread_ids: list, message: str, max_concurrency: int) -> None:
+    async with async_app() as app:
+        replies = await run_threads(app, {thread_id: [message] for thread_id in thread_ids}, max_concurrency)
+    for thread_id, thread_replies in replies.items():
+        print(f"\n[{thread_id}] AI: {thread_replies[-1].content}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send a message to several existing episodes concurrently.")
+    parser.add_argument("message")
+    parser.add_argument("thread_ids", nargs="+")
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.thread_ids, args.message, args.max_concurrency))
@@ -0,0 +1,52 @@
+import os
+import sqlite3
+from contextlib import asynccontextmanager
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+THREADS_DB_PATH = os.getenv("THREADS_DB_PATH", "threads.sqlite")
+# Seconds a writer waits for another connection's write lock before "database is locked".
+CHECKPOINT_BUSY_TIMEOUT = float(os.getenv("CHECKPOINT_BUSY_TIMEOUT", "30"))
+
+
+def connect(db_path: str = None) -> sqlite3.Connection:
+    """Opens a connection to the checkpoint database in WAL mode with the busy timeout."""
+    conn = sqlite3.connect(db_path or THREADS_DB_PATH, timeout=CHECKPOINT_BUSY_TIMEOUT, check_same_thread=False)
+    # Only takes effect on a new database, and only before it switches to WAL;
+    # graph/retention.py can convert an existing one.
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def get_checkpointer(db_path: str = None) -> SqliteSaver:
+    """
+    Creates the checkpointer for the sync graph.
+
+    This is the stock SqliteSaver (one connection shared behind its lock);
+    only the connection differs from `SqliteSaver.from_conn_string`.
+
+    Args:
+        db_path: The SQLite file; defaults to THREADS_DB_PATH.
+
+    Returns:
+        A SqliteSaver using WAL and CHECKPOINT_BUSY_TIMEOUT, so writers in
+        other processes wait instead of failing.
+    """
+    return SqliteSaver(connect(db_path))
+
+
+@asynccontextmanager
+async def get_async_checkpointer(db_path: str = None):
+    """
+    Opens an AsyncSqliteSaver with the same busy timeout (the saver enables WAL itself).
+
+    Usage:
+        async with get_async_checkpointer() as checkpointer:
+            app = workflow.compile(checkpointer=checkpointer)
+    """
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    async with aiosqlite.connect(db_path or THREADS_DB_PATH, timeout=CHECKPOINT_BUSY_TIMEOUT) as conn:
+        yield AsyncSqliteSaver(conn)
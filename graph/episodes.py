@@ -0,0 +1,214 @@
+import argparse
+import sqlite3
+import threading
+import time
+
+from graph.checkpointer import THREADS_DB_PATH, connect
+
+# Characters of the last message kept for the sidebar.
+PREVIEW_CHARS = 120
+# A name reserved for an episode whose profile never arrived (e.g. the app
+# stopped during ingestion) can be taken again after this many seconds.
+RESERVATION_TTL = 3600
+
+_local = threading.local()
+_initialized = set()
+_lock = threading.Lock()
+
+_COLUMNS = ("thread_id", "user_id", "name", "profile_url", "profile_hash", "message_count",
+            "last_message_preview", "created_at", "last_activity")
+
+
+def _connect(db_path: str = None):
+    db_path = db_path or THREADS_DB_PATH
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = connect(db_path)
+    with _lock:
+        if db_path not in _initialized:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS episodes ("
+                    "thread_id TEXT PRIMARY KEY, user_id TEXT NOT NULL, name TEXT NOT NULL, "
+                    "profile_url TEXT, profile_hash TEXT, message_count INTEGER NOT NULL DEFAULT 0, "
+                    "last_message_preview TEXT NOT NULL DEFAULT '', "
+                    "created_at REAL NOT NULL, last_activity REAL NOT NULL, pending INTEGER NOT NULL DEFAULT 0, "
+                    "UNIQUE (user_id, name))"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS episodes_user_activity ON episodes (user_id, last_activity DESC)"
+                )
+            _initialized.add(db_path)
+    return conn
+
+
+def _preview(message) -> str:
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    content = " ".join(content.split())
+    return content if len(content) <= PREVIEW_CHARS else content[:PREVIEW_CHARS - 1] + "…"
+
+
+def reserve_episode(user_id: str, thread_id: str, name: str, profile_url: str = None, db_path: str = None) -> bool:
+    """
+    Claims an episode name for a thread before the thread is created.
+
+    The name is unique per user across every session and process; the
+    reservation is hidden from `list_episodes` until `register_episode`
+    completes it, and `release_episode` gives it up if ingestion fails.
+
+    Returns:
+        False if the user already has an episode (or a live reservation) with this name.
+    """
+    now = time.time()
+    conn = _connect(db_path)
+    with conn:
+        conn.execute(
+            "DELETE FROM episodes WHERE user_id = ? AND name = ? AND pending = 1 AND created_at < ?",
+            (user_id, name, now - RESERVATION_TTL),
+        )
+        try:
+            conn.execute(
+                "INSERT INTO episodes (thread_id, user_id, name, profile_url, created_at, last_activity, pending) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1)",
+                (thread_id, user_id, name, profile_url, now, now),
+            )
+        except sqlite3.IntegrityError:
+            return False
+    return True
+
+
+def release_episode(thread_id: str, db_path: str = None) -> None:
+    """Drops a reservation that was never completed; registered episodes are kept."""
+    conn = _connect(db_path)
+    with conn:
+        conn.execute("DELETE FROM episodes WHERE thread_id = ? AND pending = 1", (thread_id,))
+
+
+def register_episode(user_id: str, thread_id: str, name: str, profile_url: str = None, profile_hash: str = None,
+                     messages: list = None, db_path: str = None) -> None:
+    """
+    Adds an episode, or updates it if the thread is already registered or
+    reserved (see `reserve_episode`), and makes it visible.
+
+    Args:
+        user_id: Whose sidebar lists the episode.
+        thread_id: The checkpointer thread.
+        name: The display name, unique per user.
+        profile_url: The LinkedIn profile the episode is about.
+        profile_hash: The stored profile's artifact hash (see cache/artifact_store.py).
+        messages: The thread's initial messages.
+        db_path: Defaults to THREADS_DB_PATH.
+    """
+    messages = messages or []
+    now = time.time()
+    conn = _connect(db_path)
+    with conn:
+        conn.execute(
+            "INSERT INTO episodes (thread_id, user_id, name, profile_url, profile_hash, message_count, "
+            "last_message_preview, created_at, last_activity) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (thread_id) DO UPDATE SET name = excluded.name, profile_url = excluded.profile_url, "
+            "profile_hash = excluded.profile_hash, last_activity = excluded.last_activity, "
+            # A reservation has no messages yet; a registered episode keeps its own counts.
+            "message_count = CASE pending WHEN 1 THEN excluded.message_count ELSE message_count END, "
+            "last_message_preview = CASE pending WHEN 1 THEN excluded.last_message_preview "
+            "ELSE last_message_preview END, pending = 0",
+            (thread_id, user_id, name, profile_url, profile_hash, len(messages),
+             _preview(messages[-1]) if messages else "", now, now),
+        )
+
+
+def record_activity(thread_id: str, new_messages: list, db_path: str = None) -> None:
+    """Counts the messages a turn added and shows the last one as the episode's preview."""
+    if not new_messages:
+        return
+    conn = _connect(db_path)
+    with conn:
+        conn.execute(
+            "UPDATE episodes SET message_count = message_count + ?, last_message_preview = ?, last_activity = ? "
+            "WHERE thread_id = ?",
+            (len(new_messages), _preview(new_messages[-1]), time.time(), thread_id),
+        )
+
+
+def list_episodes(user_id: str, limit: int = 50, offset: int = 0, db_path: str = None) -> list:
+    """Returns a page of a user's episodes, most recently active first, as dictionaries."""
+    rows = _connect(db_path).execute(
+        f"SELECT {', '.join(_COLUMNS)} FROM episodes WHERE user_id = ? AND pending = 0 "
+        "ORDER BY last_activity DESC LIMIT ? OFFSET ?",
+        (user_id, limit, offset),
+    ).fetchall()
+    return [dict(zip(_COLUMNS, row)) for row in rows]
+
+
+def count_episodes(user_id: str, db_path: str = None) -> int:
+    return _connect(db_path).execute(
+        "SELECT COUNT(*) FROM episodes WHERE user_id = ? AND pending = 0", (user_id,)
+    ).fetchone()[0]
+
+
+def get_episode(user_id: str, name: str, db_path: str = None):
+    """Returns a user's episode by name, or None; reserved names count as taken, see `reserve_episode`."""
+    row = _connect(db_path).execute(
+        f"SELECT {', '.join(_COLUMNS)} FROM episodes WHERE user_id = ? AND name = ?", (user_id, name)
+    ).fetchone()
+    return dict(zip(_COLUMNS, row)) if row else None
+
+
+def delete_episodes(thread_ids: list, db_path: str = None) -> None:
+    conn = _connect(db_path)
+    with conn:
+        conn.executemany("DELETE FROM episodes WHERE thread_id = ?", [(thread_id,) for thread_id in thread_ids])
+
+
+def backfill(user_id: str, db_path: str = None) -> int:
+    """
+    Registers every checkpointed thread that has no episode yet, named after its thread ID.
+
+    This loads each such thread's latest state once; afterwards the
+    registry is kept up to date as episodes are created and used.
+
+    Returns:
+        The number of episodes added.
+    """
+    from graph.checkpointer import get_checkpointer
+
+    conn = _connect(db_path)
+    missing = [row[0] for row in conn.execute(
+        "SELECT DISTINCT thread_id FROM checkpoints WHERE thread_id NOT IN (SELECT thread_id FROM episodes)"
+    ).fetchall()]
+    saver = get_checkpointer(db_path)
+    try:
+        for thread_id in missing:
+            checkpoint = saver.get_tuple({"configurable": {"thread_id": thread_id}})
+            values = checkpoint.checkpoint["channel_values"] if checkpoint else {}
+            register_episode(user_id, thread_id, f"Episode {thread_id[:8]}", profile_hash=values.get("profile_text_ref"),
+                             messages=values.get("messages", []), db_path=db_path)
+    finally:
+        saver.conn.close()
+    return len(missing)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or backfill the episode registry.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list")
+    listing.add_argument("--user", default="default")
+    listing.add_argument("--limit", type=int, default=50)
+    listing.add_argument("--offset", type=int, default=0)
+    fill = commands.add_parser("backfill", help="Register threads created before the registry existed.")
+    fill.add_argument("--user", default="default")
+    parser.add_argument("--db", default=THREADS_DB_PATH)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for episode in list_episodes(args.user, args.limit, args.offset, args.db):
+            print(f"{episode['name']}\t{episode['thread_id']}\t{episode['message_count']}\t{episode['last_message_preview']}")
+    else:
+        print(f"{backfill(args.user, args.db)} episode(s) added")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,163 @@
-from states.state import GraphState
-from agents.analyze_jobfit import analyze_job_fit
-from agents.router import route_requests
-from agents.analyze_profile import analyze_profile
-from agents.career_counsel import counsel_career
-from agents.career_enhancer import enhance_content
-from agents.general_question import general_question
-from agents.end_session import end_session
-from agents.linkedin_scraper import linkedin_scraper, format_profile_data
+from states.state import GraphState, ROUTES
+from states.profile_store import attach_profile
+from graph.streaming import ReplyStream
+from graph.speculation import SPECULATIVE_ROUTING, make_speculative_router, speculative_node
+from graph.checkpointer import get_checkpointer
+import importlib
+import inspect
 import os
+import threading
 import uuid
 from typing import TypedDict, Annotated, List
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
-workflow = StateGraph(GraphState)
-
-workflow.add_node("router", route_requests)
-workflow.add_node("analyze_profile", analyze_profile)
-workflow.add_node("analyze_job_fit", analyze_job_fit)
-workflow.add_node("enhance_content", enhance_content)
-workflow.add_node("counsel_career", counsel_career)
-workflow.add_node("general_question", general_question)
-workflow.add_node("end_session", end_session)
-
-# Set the entry point of the graph
-workflow.set_entry_point("router")
-
-
-workflow.add_conditional_edges(
-    "router",  
-    lambda state: state["route"],  # The function that reads the route from the state
-    {
-        
-        "analyze_profile": "analyze_profile",
-        "analyze_job_fit": "analyze_job_fit",
-        "enhance_content": "enhance_content",
-        "counsel_career": "counsel_career",
-        "general_question": "general_question",
-        "end_session": "end_session",
-    }
-)
 
 
-workflow.add_edge("analyze_profile", END)
-workflow.add_edge("analyze_job_fit", END)
-workflow.add_edge("enhance_content", END)
-workflow.add_edge("counsel_career", END)
-workflow.add_edge("general_question", END)
-workflow.add_edge("end_session", END)
+def _lazy_node(module: str, name: str, asynchronous: bool = False):
+    """
+    Returns a node that imports `module` and looks up `name` on its first call.
+
+    Agent modules pull in their prompts, profile views and caches; loading
+    them only when a node first runs keeps `import graph.graph` cheap. The
+    config is passed on when the target accepts one.
+    """
+    target = {}
+
+    def load():
+        if not target:
+            fn = getattr(importlib.import_module(module), name)
+            target["fn"] = fn
+            target["takes_config"] = "config" in inspect.signature(fn).parameters
+        return target["fn"], target["takes_config"]
+
+    if asynchronous:
+        async def node(state: GraphState, config: RunnableConfig = None):
+            fn, takes_config = load()
+            return await (fn(state, config) if takes_config else fn(state))
+    else:
+        def node(state: GraphState, config: RunnableConfig = None):
+            fn, takes_config = load()
+            return fn(state, config) if takes_config else fn(state)
+    node.__name__ = name
+    return node
+
+
+# Node name -> (module, sync function, async function).
+NODES = {
+    "router": ("agents.router", "route_requests", "aroute_requests"),
+    "analyze_profile": ("agents.analyze_profile", "analyze_profile", "aanalyze_profile"),
+    "analyze_job_fit": ("agents.analyze_jobfit", "analyze_job_fit", "aanalyze_job_fit"),
+    "enhance_content": ("agents.career_enhancer", "enhance_content", "aenhance_content"),
+    "counsel_career": ("agents.career_counsel", "counsel_career", "acounsel_career"),
+    "general_question": ("agents.general_question", "general_question", "ageneral_question"),
+    "end_session": ("agents.end_session", "end_session", "aend_session"),
+    "summarize_memory": ("agents.summarize_memory", "summarize_memory", "asummarize_memory"),
+}
+
+SPECIALIST_NAMES = ["analyze_profile", "analyze_job_fit", "enhance_content", "counsel_career",
+                    "general_question", "end_session"]
+
+
+def _node(name: str, asynchronous: bool = False):
+    module, sync_name, async_name = NODES[name]
+    return _lazy_node(module, async_name if asynchronous else sync_name, asynchronous)
+
+
+SPECIALISTS = {name: _node(name) for name in SPECIALIST_NAMES}
+
+ASYNC_SPECIALISTS = {name: _node(name, asynchronous=True) for name in SPECIALIST_NAMES}
+
+
+def build_workflow(asynchronous: bool = False) -> StateGraph:
+    """
+    Builds the router -> specialist -> summarize_memory graph.
+
+    Args:
+        asynchronous: Use the async node variants. The graph must then be run
+            with `ainvoke`/`astream` and an async checkpointer.
 
+    Returns:
+        The uncompiled StateGraph.
+    """
+    workflow = StateGraph(GraphState)
 
-conn = sqlite3.connect("threads.sqlite", check_same_thread=False)
-memory = SqliteSaver(conn=conn)
+    if asynchronous:
+        workflow.add_node("router", _node("router", asynchronous=True))
+        for name, node in ASYNC_SPECIALISTS.items():
+            workflow.add_node(name, node)
+    elif SPECULATIVE_ROUTING:
+        # Opt-in: start the most likely specialist while the router is still classifying.
+        workflow.add_node("router", make_speculative_router(_node("router"), SPECIALISTS))
+        for name, node in SPECIALISTS.items():
+            workflow.add_node(name, speculative_node(name, node))
+    else:
+        workflow.add_node("router", _node("router"))
+        for name, node in SPECIALISTS.items():
+            workflow.add_node(name, node)
+
+    # Set the entry point of the graph
+    workflow.set_entry_point("router")
+
+
+    workflow.add_conditional_edges(
+        "router",  
+        lambda state: state["route"],  # The function that reads the route from the state
+        {route: route for route in ROUTES}
+    )
+
+
+    # After the reply, older turns that left the memory window are folded into the rolling summary.
+    workflow.add_node("summarize_memory", _node("summarize_memory", asynchronous))
+    for name in SPECIALISTS:
+        workflow.add_edge(name, "summarize_memory")
+    workflow.add_edge("summarize_memory", END)
+
+    return workflow
+
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def get_app():
+    """
+    Returns the compiled graph, building it on the first call.
+
+    The graph and its checkpointer (see graph/checkpointer.py) are built
+    once per process; Streamlit callers can also wrap this in
+    `st.cache_resource`. Nothing is compiled or opened at import time.
+    """
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                # WAL and a busy timeout; see graph/checkpointer.py.
+                _app = build_workflow().compile(checkpointer=get_checkpointer())
+    return _app
+
+
+def preload_nodes() -> None:
+    """Imports every node module now, e.g. from a background thread, so the first turn does not."""
+    for module, _, _ in NODES.values():
+        importlib.import_module(module)
+
+
+def __getattr__(name: str):
+    # `from graph.graph import app` still works; the graph is built on first access.
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-app = workflow.compile(checkpointer=memory)
 if __name__ == "__main__":
+    from agents.linkedin_scraper import linkedin_scraper, format_profile_data
+    from llm.registry import warm_up
+
+    app = get_app()
     print("--- AI Career Coach ---")
+    warm_up()
     
     # --- Step 1: Get URL from User (Pre-Graph Logic) ---
     profile_url = input("Please enter a LinkedIn Profile URL to begin: ")
@@ -76,7 +175,7 @@ if __name__ == "__main__":
         print("Could not retrieve profile data. Exiting.")
         exit()
         
-    profile_text = format_profile_data(raw_profile_data)
+    profile_text = format_profile_data(raw_profile_data, profile_url=profile_url)
     
     if not profile_text:
         print("Could not format profile data. Exiting.")
@@ -89,9 +188,9 @@ if __name__ == "__main__":
     thread_id = str(uuid.uuid4())
     config = {"configurable": {"thread_id": thread_id}}
 
-    # The initial state now includes the dynamically scraped profile_text
+    # The initial state references the scraped profile by hash; the text itself is stored once
     initial_state = {
-        "profile_text": profile_text,
+        **attach_profile(thread_id, profile_text=profile_text, profile_url=profile_url),
         "messages": [AIMessage(content="Hello! I'm your AI Career Coach. I've successfully analyzed your profile. How can I help you today?")]
     }
     # Persist this initial state
@@ -108,9 +207,12 @@ if __name__ == "__main__":
         # Prepare the input for the graph
         inputs = {"messages": [HumanMessage(content=user_input)]}
 
-        # Invoke the graph. It will use the profile_text already in its memory.
-        final_state = app.invoke(inputs, config=config)
-
-        # Print the AI's last response
-        ai_response = final_state["messages"][-1].content
-        print(f"\nAI: {ai_response}")
\ No newline at end of file
+        # Run the graph and print the reply as it streams. It will use the profile_text already in its memory.
+        print("\nAI: ", end="", flush=True)
+        reply = ReplyStream(app, inputs, config)
+        for chunk in reply:
+            print(chunk, end="", flush=True)
+        print()
+        ai_response = reply.final_message().content
+        if ai_response != reply.text:
+            print(f"\nAI: {ai_response}")
\ No newline at end of file
@@ -0,0 +1,66 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Threads whose message list is kept in memory for rendering.
+HISTORY_CACHE_SIZE = int(os.getenv("HISTORY_CACHE_SIZE", "64"))
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def latest_checkpoint_id(checkpointer, thread_id: str):
+    """Returns the ID of a thread's newest checkpoint without loading it, or None."""
+    checkpointer.setup()
+    row = checkpointer.conn.execute(
+        "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' "
+        "ORDER BY checkpoint_id DESC LIMIT 1",
+        (thread_id,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def remember_history(thread_id: str, snapshot) -> tuple:
+    """Caches the messages of a state snapshot (e.g. `ReplyStream.final_state`) and returns them."""
+    messages = tuple(snapshot.values.get("messages", []))
+    version = snapshot.config["configurable"].get("checkpoint_id") if snapshot.config else None
+    with _lock:
+        _cache[thread_id] = (version, messages)
+        _cache.move_to_end(thread_id)
+        while len(_cache) > HISTORY_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return messages
+
+
+def get_history(app, thread_id: str) -> tuple:
+    """
+    Returns a thread's messages, loading its state only when it has changed.
+
+    The cached messages are reused as long as the thread's newest checkpoint
+    is the one they were read from, so reruns that do not complete a turn
+    cost one indexed query instead of deserializing the whole state. The
+    cache is shared by all sessions; treat the result as read-only.
+
+    Args:
+        app: The compiled graph.
+        thread_id: The episode's thread.
+
+    Returns:
+        A tuple of messages, oldest first.
+    """
+    version = latest_checkpoint_id(app.checkpointer, thread_id)
+    with _lock:
+        cached = _cache.get(thread_id)
+        if cached is not None and version is not None and cached[0] == version:
+            _cache.move_to_end(thread_id)
+            _stats["hits"] += 1
+            return cached[1]
+        _stats["misses"] += 1
+    return remember_history(thread_id, app.get_state({"configurable": {"thread_id": thread_id}}))
+
+
+def get_stats() -> dict:
+    """Returns cache hits and misses and the number of cached threads."""
+    with _lock:
+        return dict(_stats, threads=len(_cache))
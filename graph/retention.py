@@ -0,0 +1,239 @@
+import argparse
+import os
+import threading
+import time
+import uuid
+
+from cache import artifact_store
+from graph.checkpointer import THREADS_DB_PATH, connect, get_checkpointer
+
+# Checkpoints kept per thread; older ones only serve time travel and are deleted.
+RETENTION_KEEP_LAST = int(os.getenv("RETENTION_KEEP_LAST", "20"))
+# Episodes with no activity for this many days are deleted entirely (0 keeps them forever).
+RETENTION_MAX_AGE_DAYS = float(os.getenv("RETENTION_MAX_AGE_DAYS", "90"))
+# Seconds between runs of the background task started by `start_maintenance` (0 disables it).
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", "3600"))
+# Busiest threads timed before and after a run.
+LATENCY_SAMPLE_THREADS = 20
+
+# 100-ns intervals between the UUID epoch (1582-10-15) and the Unix epoch.
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+_maintenance_thread = None
+_lock = threading.Lock()
+
+
+def checkpoint_time(checkpoint_id: str) -> float:
+    """Returns the Unix time encoded in a LangGraph checkpoint ID (a UUIDv6)."""
+    value = uuid.UUID(checkpoint_id).int
+    timestamp = ((value >> 96) << 28) | (((value >> 80) & 0xFFFF) << 12) | ((value >> 64) & 0x0FFF)
+    return (timestamp - _UUID_EPOCH_OFFSET) / 1e7
+
+
+def _db_bytes(db_path: str) -> int:
+    return sum(os.path.getsize(path) for path in (db_path, f"{db_path}-wal") if os.path.exists(path))
+
+
+def _busiest_threads(conn, limit: int) -> list:
+    return [row[0] for row in conn.execute(
+        "SELECT thread_id FROM checkpoints GROUP BY thread_id ORDER BY COUNT(*) DESC LIMIT ?", (limit,)
+    )]
+
+
+def _load_ms(db_path: str, thread_ids: list) -> float:
+    """Average time to load the latest checkpoint of each thread, best of three rounds."""
+    if not thread_ids:
+        return 0.0
+    saver = get_checkpointer(db_path)
+    try:
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for thread_id in thread_ids:
+                saver.get_tuple({"configurable": {"thread_id": thread_id}})
+            best = min(best, time.perf_counter() - start)
+    finally:
+        saver.conn.close()
+    return best / len(thread_ids) * 1000
+
+
+def expire_threads(conn, max_age_days: float) -> list:
+    """
+    Deletes every thread (and its episode) whose latest checkpoint is older
+    than `max_age_days` and releases its hold on its profile in the artifact
+    store; returns their IDs.
+    """
+    if max_age_days <= 0:
+        return []
+    cutoff = time.time() - max_age_days * 86400
+    expired = [
+        thread_id
+        for thread_id, latest in conn.execute("SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id")
+        if checkpoint_time(latest) < cutoff
+    ]
+    with conn:
+        conn.executemany("DELETE FROM checkpoints WHERE thread_id = ?", [(thread_id,) for thread_id in expired])
+        conn.executemany("DELETE FROM writes WHERE thread_id = ?", [(thread_id,) for thread_id in expired])
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'episodes'").fetchone():
+            conn.executemany("DELETE FROM episodes WHERE thread_id = ?", [(thread_id,) for thread_id in expired])
+    if expired:
+        artifact_store.get_store().release(expired)
+    return expired
+
+
+def prune_checkpoints(conn, keep_last: int) -> tuple:
+    """
+    Keeps the `keep_last` newest checkpoints of each thread.
+
+    The latest checkpoint holds the whole state, so older ones (and their
+    pending writes) are only needed to rewind a conversation.
+
+    Returns:
+        The number of checkpoints and writes deleted.
+    """
+    with conn:
+        checkpoints = conn.execute(
+            "DELETE FROM checkpoints WHERE rowid IN ("
+            "SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+            "PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS position FROM checkpoints) "
+            "WHERE position > ?)",
+            (max(keep_last, 1),),
+        ).rowcount
+        writes = conn.execute(
+            "DELETE FROM writes WHERE NOT EXISTS (SELECT 1 FROM checkpoints WHERE "
+            "checkpoints.thread_id = writes.thread_id AND checkpoints.checkpoint_ns = writes.checkpoint_ns "
+            "AND checkpoints.checkpoint_id = writes.checkpoint_id)"
+        ).rowcount
+    return checkpoints, writes
+
+
+def vacuum(conn, full: bool = False) -> str:
+    """
+    Returns freed pages to the file system.
+
+    Databases created by `get_checkpointer` use incremental auto-vacuum, so
+    this is cheap. Older databases need one full VACUUM (`full=True`, which
+    rewrites the file and blocks writers while it runs) to switch over.
+
+    Returns:
+        "incremental", "full" or "skipped".
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        # executescript steps the pragma to completion; execute() would free a single page.
+        conn.executescript("PRAGMA incremental_vacuum;")
+        mode = "incremental"
+    elif full:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        mode = "full"
+    else:
+        mode = "skipped"
+    # Deletions are written to the WAL first; fold them into the database and shrink the WAL.
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    return mode
+
+
+def run_retention(db_path: str = None, keep_last: int = None, max_age_days: float = None,
+                  full_vacuum: bool = False) -> dict:
+    """
+    Expires abandoned threads, prunes old checkpoints and vacuums the database.
+
+    Args:
+        db_path: The checkpoint database; defaults to THREADS_DB_PATH.
+        keep_last: Checkpoints kept per thread; defaults to RETENTION_KEEP_LAST.
+        max_age_days: Idle days before a thread is deleted; defaults to RETENTION_MAX_AGE_DAYS.
+        full_vacuum: Run a full VACUUM if incremental vacuum is not enabled yet.
+
+    Returns:
+        A report with the rows deleted, the bytes reclaimed, the free space
+        left inside the file (reusable, but only returned to the file system
+        by a vacuum) and the average time to load the busiest threads before
+        and after.
+    """
+    db_path = db_path or THREADS_DB_PATH
+    keep_last = RETENTION_KEEP_LAST if keep_last is None else keep_last
+    max_age_days = RETENTION_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    conn = connect(db_path)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'checkpoints'").fetchone():
+            return {"threads_expired": 0, "checkpoints_deleted": 0, "writes_deleted": 0, "profiles_deleted": 0,
+                    "vacuum": "skipped", "bytes_before": 0, "bytes_after": 0, "bytes_reclaimed": 0,
+                    "free_bytes": 0, "load_ms_before": 0.0, "load_ms_after": 0.0}
+        bytes_before = _db_bytes(db_path)
+        sample = _busiest_threads(conn, LATENCY_SAMPLE_THREADS)
+        load_ms_before = _load_ms(db_path, sample)
+
+        expired = expire_threads(conn, max_age_days)
+        checkpoints, writes = prune_checkpoints(conn, keep_last)
+        # Profiles of expired threads are no longer held; the artifact store's GC removes them when it needs the space.
+        profiles = artifact_store.get_store().gc()["removed"]
+        vacuum_mode = vacuum(conn, full_vacuum)
+
+        bytes_after = _db_bytes(db_path)
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        free_bytes = conn.execute("PRAGMA freelist_count").fetchone()[0] * page_size
+        load_ms_after = _load_ms(db_path, [thread_id for thread_id in sample if thread_id not in set(expired)])
+    finally:
+        conn.close()
+    report = {
+        "threads_expired": len(expired),
+        "checkpoints_deleted": checkpoints,
+        "writes_deleted": writes,
+        "profiles_deleted": profiles,
+        "vacuum": vacuum_mode,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_reclaimed": bytes_before - bytes_after,
+        "free_bytes": free_bytes,
+        "load_ms_before": load_ms_before,
+        "load_ms_after": load_ms_after,
+    }
+    print(f"---RETENTION: {len(expired)} thread(s) expired, {checkpoints} checkpoint(s) pruned, "
+          f"{report['bytes_reclaimed']} bytes reclaimed---")
+    return report
+
+
+def _maintenance_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            run_retention()
+        except Exception as e:
+            print(f"---RETENTION: Maintenance run failed: {e}---")
+
+
+def start_maintenance(interval: float = None) -> bool:
+    """
+    Starts the background retention task once per process.
+
+    Returns:
+        True if the task is running.
+    """
+    global _maintenance_thread
+    interval = RETENTION_INTERVAL if interval is None else interval
+    if interval <= 0:
+        return False
+    with _lock:
+        if _maintenance_thread is None:
+            _maintenance_thread = threading.Thread(
+                target=_maintenance_loop, args=(interval,), name="checkpoint-retention", daemon=True
+            )
+            _maintenance_thread.start()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune and vacuum the checkpoint database.")
+    parser.add_argument("--db", default=THREADS_DB_PATH)
+    parser.add_argument("--keep-last", type=int, default=RETENTION_KEEP_LAST)
+    parser.add_argument("--max-age-days", type=float, default=RETENTION_MAX_AGE_DAYS)
+    parser.add_argument("--full-vacuum", action="store_true",
+                        help="Rewrite the file once to enable incremental vacuum on an older database.")
+    args = parser.parse_args()
+    report = run_retention(args.db, args.keep_last, args.max_age_days, args.full_vacuum)
+    for key, value in report.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import inspect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs, set_config_context
+
+from agents import intent_classifier
+from states.state import GraphState
+
+SPECULATIVE_ROUTING = os.getenv("SPECULATIVE_ROUTING", "0") == "1"
+# A local guess below this confidence falls back to the thread's previous route.
+SPECULATION_MIN_CONFIDENCE = float(os.getenv("SPECULATION_MIN_CONFIDENCE", "0.2"))
+
+# Metadata key that marks the tokens of a speculative specialist run with its
+# route. graph/streaming.py holds them back until the router has agreed.
+SPECULATIVE_ROUTE_KEY = "speculative_route"
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SPECULATION_WORKERS", "4")),
+    thread_name_prefix="speculation",
+)
+# thread_id -> (route, message_key, future) for speculations the router has committed.
+_pending = {}
+_lock = threading.Lock()
+_stats = {"turns": 0, "speculations": 0, "hits": 0, "misses": 0, "cancelled": 0, "wasted_tokens": 0}
+
+
+def _thread_id(config: RunnableConfig) -> str:
+    return (config or {}).get("configurable", {}).get("thread_id")
+
+
+def _message_key(state: GraphState) -> tuple:
+    messages = state["messages"]
+    return len(messages), messages[-1].content
+
+
+def _call_node(node_fn, state: GraphState, config: RunnableConfig) -> dict:
+    if "config" in inspect.signature(node_fn).parameters:
+        return node_fn(state, config=config)
+    return node_fn(state)
+
+
+def _run_speculative(route: str, node_fn, state: GraphState, config: RunnableConfig) -> dict:
+    """
+    Runs a specialist in a worker thread under the router's callbacks, so its
+    tokens reach the graph's stream, tagged with SPECULATIVE_ROUTE_KEY.
+    """
+    config = merge_configs(config, {"metadata": {SPECULATIVE_ROUTE_KEY: route}})
+    with set_config_context(config) as context:
+        return context.run(_call_node, node_fn, state, config)
+
+
+def guess_route(state: GraphState):
+    """
+    Picks the specialist most likely to be chosen for the latest message.
+
+    Uses the local intent classifier when it has a reasonable guess, and
+    otherwise the route the router chose on the previous turn of the thread.
+    """
+    route, confidence = intent_classifier.get_classifier().predict(state["messages"][-1].content)
+    if route is not None and confidence >= SPECULATION_MIN_CONFIDENCE:
+        return route
+    return state.get("route")
+
+
+def _response_tokens(result: dict) -> int:
+    total = 0
+    for message in result.get("messages", []):
+        usage = getattr(message, "usage_metadata", None) or {}
+        total += usage.get("total_tokens", 0)
+    return total
+
+
+def _discard(future) -> None:
+    if future.cancel():
+        with _lock:
+            _stats["cancelled"] += 1
+        return
+
+    def record_waste(done):
+        if done.exception() is None:
+            with _lock:
+                _stats["wasted_tokens"] += _response_tokens(done.result())
+
+    future.add_done_callback(record_waste)
+
+
+def make_speculative_router(route_fn, specialists: dict):
+    """
+    Wraps the router so that the most likely specialist starts in parallel.
+
+    Args:
+        route_fn: The router node function.
+        specialists: A mapping from route name to specialist node function.
+
+    Returns:
+        A router node. If the router agrees with the guess, the running
+        specialist is handed to the matching `speculative_node`; otherwise it
+        is cancelled or its result discarded.
+    """
+    def speculative_router(state: GraphState, config: RunnableConfig) -> dict:
+        thread_id = _thread_id(config)
+        with _lock:
+            _stats["turns"] += 1
+            stale = _pending.pop(thread_id, None)
+        if stale is not None:
+            _discard(stale[2])
+
+        guess = guess_route(state)
+        future = None
+        if thread_id is not None and guess in specialists:
+            print(f"---SPECULATION: Starting '{guess}' alongside the router---")
+            future = _executor.submit(_run_speculative, guess, specialists[guess], state, config)
+
+        if future is None:
+            return route_fn(state)
+
+        committed = False
+        try:
+            result = route_fn(state)
+            with _lock:
+                _stats["speculations"] += 1
+                if result["route"] == guess:
+                    _stats["hits"] += 1
+                    _pending[thread_id] = (guess, _message_key(state), future)
+                    committed = True
+                    return result
+                _stats["misses"] += 1
+            print(f"---SPECULATION: Router chose '{result['route']}', discarding '{guess}'---")
+            return result
+        finally:
+            # Also reached when the router raises: the specialist is never used then either.
+            if not committed:
+                _discard(future)
+
+    return speculative_router
+
+
+def speculative_node(name: str, node_fn):
+    """
+    Wraps a specialist so it reuses a committed speculative run if one exists.
+    """
+    def node(state: GraphState, config: RunnableConfig) -> dict:
+        with _lock:
+            pending = _pending.pop(_thread_id(config), None)
+        if pending is not None:
+            route, message_key, future = pending
+            if route == name and message_key == _message_key(state):
+                print(f"---SPECULATION: Using speculative result for '{name}'---")
+                return future.result()
+            _discard(future)
+        return _call_node(node_fn, state, config)
+
+    return node
+
+
+def get_stats() -> dict:
+    """Returns speculation counters, the hit rate and tokens spent on discarded runs."""
+    with _lock:
+        stats = dict(_stats)
+    stats["hit_rate"] = stats["hits"] / stats["speculations"] if stats["speculations"] else 0.0
+    return stats
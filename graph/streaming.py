@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import deque
+
+from langchain_core.messages import AIMessage
+
+from graph.speculation import SPECULATIVE_ROUTE_KEY
+from llm.rate_limiter import with_turn_deadline
+
+# Nodes whose tokens are internal to the graph and never shown to the user.
+HIDDEN_NODES = {"router", "summarize_memory"}
+
+_ttft_samples = deque(maxlen=1000)
+_stats = {"turns": 0, "mismatches": 0}
+_lock = threading.Lock()
+
+
+def _text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+class ReplyStream:
+    """
+    Streams the text of the AI's reply for one graph turn.
+
+    Iterate over it (with `for` or `async for`) to receive text chunks as
+    the specialist node generates them (messages that are not produced token
+    by token, such as cached answers, arrive as a single chunk). After
+    iteration, `final_message()` (or `afinal_message()`) returns the
+    checkpointed reply and checks it against what was streamed; the state
+    snapshot it was read from is kept in `final_state`.
+
+    Tokens of a speculative specialist run (see graph/speculation.py) are
+    held back until the router's decision arrives, then passed on if the
+    router chose that specialist and dropped otherwise.
+    """
+
+    def __init__(self, app, inputs: dict, config: dict):
+        self.app = app
+        self.inputs = inputs
+        # All of the turn's LLM calls share one rate-limit deadline (llm/rate_limiter.py).
+        self.config = with_turn_deadline(config)
+        self.text = ""
+        self.time_to_first_token = None
+        self.final_state = None
+        self._route = None
+        self._held = []
+        self._speculative_ids = set()
+
+    def __iter__(self):
+        start = time.perf_counter()
+        for mode, payload in self.app.stream(self.inputs, self.config, stream_mode=["messages", "updates"]):
+            yield from self._accept(mode, payload, start)
+
+    async def __aiter__(self):
+        start = time.perf_counter()
+        async for mode, payload in self.app.astream(self.inputs, self.config, stream_mode=["messages", "updates"]):
+            for text in self._accept(mode, payload, start):
+                yield text
+
+    def _accept(self, mode: str, payload, start: float) -> list:
+        if mode == "updates":
+            update = payload.get("router")
+            if not isinstance(update, dict) or "route" not in update:
+                return []
+            self._route = update["route"]
+            held, self._held = self._held, []
+            return [self._emit(text, start) for route, text in held if route == self._route]
+
+        chunk, metadata = payload
+        if not isinstance(chunk, AIMessage):
+            return []
+        speculative_route = metadata.get(SPECULATIVE_ROUTE_KEY)
+        if speculative_route is not None:
+            if chunk.id:
+                self._speculative_ids.add(chunk.id)
+            text = _text(chunk.content)
+            if not text:
+                return []
+            if self._route is None:
+                self._held.append((speculative_route, text))
+                return []
+            return [self._emit(text, start)] if speculative_route == self._route else []
+        if metadata.get("langgraph_node") in HIDDEN_NODES or chunk.id in self._speculative_ids:
+            return []
+        text = _text(chunk.content)
+        return [self._emit(text, start)] if text else []
+
+    def _emit(self, text: str, start: float) -> str:
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - start
+            with _lock:
+                _ttft_samples.append(self.time_to_first_token)
+        self.text += text
+        return text
+
+    def final_message(self) -> AIMessage:
+        """
+        Returns the reply as stored by the checkpointer.
+
+        If the streamed text differs from it, the mismatch is counted and
+        the caller should display the returned message instead.
+        """
+        self.final_state = self.app.get_state(self.config)
+        return self._check(self.final_state.values["messages"][-1])
+
+    async def afinal_message(self) -> AIMessage:
+        """Async variant of `final_message`."""
+        self.final_state = await self.app.aget_state(self.config)
+        return self._check(self.final_state.values["messages"][-1])
+
+    def _check(self, message: AIMessage) -> AIMessage:
+        with _lock:
+            _stats["turns"] += 1
+            if _text(message.content) != self.text:
+                _stats["mismatches"] += 1
+                print("---STREAM: Streamed reply differs from the checkpointed message---")
+        return message
+
+
+def _percentile(samples: list, fraction: float) -> float:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def get_stats() -> dict:
+    """Returns time-to-first-token percentiles (seconds) and mismatch counts."""
+    with _lock:
+        samples = list(_ttft_samples)
+        stats = dict(_stats)
+    stats["ttft_p50"] = _percentile(samples, 0.5)
+    stats["ttft_p95"] = _percentile(samples, 0.95)
+    stats["ttft_last"] = samples[-1] if samples else None
+    return stats
@@ -0,0 +1,274 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Optional
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import ensure_config
+
+from llm.rate_limiter import LLMQueueTimeout
+
+# Send the prompt to the secondary provider once the primary has been silent
+# for longer than this percentile of its recent time-to-first-token.
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+# Until enough latencies are recorded, hedge after a fixed delay (seconds).
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "5"))
+HEDGE_MIN_SAMPLES = 20
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_HEDGE_WORKERS", "16")), thread_name_prefix="llm-hedge")
+_latencies = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _provider_errors() -> tuple:
+    """The SDK exceptions for rate limits, server errors and dropped connections, for the installed providers."""
+    errors = [TimeoutError, httpx.TransportError]
+    try:
+        import groq
+        errors += [groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError]
+    except ImportError:
+        pass
+    try:
+        from langchain_google_genai import chat_models
+        errors += [getattr(chat_models, name) for name in ("GoogleRateLimitError", "GoogleAPIError") if hasattr(chat_models, name)]
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def _is_transient(error: BaseException) -> bool:
+    if isinstance(error, _provider_errors()):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def should_fail_over(error: BaseException) -> bool:
+    """
+    Rate limits (429), server errors (5xx), timeouts and connection failures go to the other provider.
+
+    Provider wrappers such as langchain_google_genai's
+    `ChatGoogleGenerativeAIError` carry the status only on the exception they
+    were raised from, so the `__cause__`/`__context__` chain is checked too.
+    Our own rate limiter giving up (`LLMQueueTimeout`, `LLMQueueFull`) is not
+    a provider failure: the turn's wait budget is spent, so it is raised as is.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, LLMQueueTimeout):
+            return False
+        if _is_transient(error):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def hedge_delay(node: str) -> float:
+    with _lock:
+        samples = sorted(_latencies.get(node, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    return samples[min(len(samples) - 1, int(HEDGE_PERCENTILE * len(samples)))]
+
+
+def _record(node: str, served_by: str, first_token_latency: float, primary: str, hedged: bool, failed_over: bool) -> None:
+    with _lock:
+        # If the hedge won, the primary had still not answered: its latency is at least this long.
+        # Leaving these slow calls out would bias `hedge_delay` low and make hedging ever more frequent.
+        if served_by == primary or not failed_over:
+            _latencies.setdefault(node, deque(maxlen=500)).append(first_token_latency)
+        stats = _stats.setdefault(node, {"turns": 0, "hedged": 0, "failovers": 0, "served_by": {}})
+        stats["turns"] += 1
+        stats["hedged"] += int(hedged)
+        stats["failovers"] += int(failed_over)
+        stats["served_by"][served_by] = stats["served_by"].get(served_by, 0) + 1
+        stats["last_served_by"] = served_by
+
+
+def _inner_config() -> dict:
+    """
+    The config for the raced calls: the caller's `configurable` (queue
+    timeouts and the like) but no callbacks, so only the chunks re-emitted
+    by the hedged model reach the graph's stream.
+    """
+    return {"callbacks": [], "configurable": dict(ensure_config().get("configurable", {}))}
+
+
+class HedgedChatModel(BaseChatModel):
+    """
+    A chat model that races a primary and a secondary provider.
+
+    The primary starts first. If it has not produced its first token within
+    the node's hedge delay, the same prompt goes to the secondary and the
+    first one to start answering wins; the loser is stopped and its output
+    ignored. A primary failing with a 429, a 5xx or a connection error fails
+    over to the secondary immediately. The provider that served the answer is
+    recorded in `get_stats()` and in the message's `response_metadata`.
+    """
+
+    node: str
+    primary: Runnable
+    secondary: Runnable
+    primary_name: str
+    secondary_name: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged-chat"
+
+    def _start(self, name: str, messages, events: queue.Queue, stop: threading.Event):
+        runnable = self.primary if name == self.primary_name else self.secondary
+        config = _inner_config()
+
+        def run():
+            try:
+                for chunk in runnable.stream(messages, config=config):
+                    if stop.is_set():
+                        return
+                    events.put((name, "chunk", chunk))
+                events.put((name, "done", None))
+            except BaseException as e:
+                events.put((name, "error", e))
+
+        _executor.submit(run)
+
+    def _stream(self, messages, stop: Optional[list] = None, run_manager=None, **kwargs: Any):
+        events = queue.Queue()
+        stops = {self.primary_name: threading.Event(), self.secondary_name: threading.Event()}
+        start = time.monotonic()
+        self._start(self.primary_name, messages, events, stops[self.primary_name])
+        started, failed, winner = {self.primary_name}, {}, None
+        delay = hedge_delay(self.node)
+        try:
+            while True:
+                timeout = None
+                if winner is None and self.secondary_name not in started:
+                    timeout = max(0.0, delay - (time.monotonic() - start))
+                try:
+                    name, kind, payload = events.get(timeout=timeout)
+                except queue.Empty:
+                    print(f"---LLM: {self.primary_name} slow for '{self.node}', hedging to {self.secondary_name}---")
+                    self._start(self.secondary_name, messages, events, stops[self.secondary_name])
+                    started.add(self.secondary_name)
+                    continue
+                if winner is not None and name != winner:
+                    continue
+                if kind == "error":
+                    failed[name] = payload
+                    if winner is None and name == self.primary_name and self.secondary_name not in started and should_fail_over(payload):
+                        print(f"---LLM: {self.primary_name} failed for '{self.node}' ({payload}), failing over---")
+                        self._start(self.secondary_name, messages, events, stops[self.secondary_name])
+                        started.add(self.secondary_name)
+                        continue
+                    if winner is None and len(failed) < len(started):
+                        continue
+                    raise failed.get(self.primary_name, payload)
+                if winner is None:
+                    winner = name
+                    _record(self.node, winner, time.monotonic() - start, self.primary_name,
+                            hedged=len(started) > 1, failed_over=self.primary_name in failed)
+                    for other, event in stops.items():
+                        if other != winner:
+                            event.set()
+                if kind == "done":
+                    yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata={"served_by": winner}))
+                    return
+                # The base class reports each yielded chunk to the callbacks under this run's id.
+                yield ChatGenerationChunk(message=payload.model_copy(update={"id": None}))
+        finally:
+            for event in stops.values():
+                event.set()
+
+    def _generate(self, messages, stop: Optional[list] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = None
+        for chunk in self._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            message = chunk.message if message is None else message + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(message))])
+
+    async def _astream(self, messages, stop: Optional[list] = None, run_manager=None, **kwargs: Any):
+        events = asyncio.Queue()
+        tasks = {}
+        start = time.monotonic()
+
+        config = _inner_config()
+
+        async def run(name):
+            runnable = self.primary if name == self.primary_name else self.secondary
+            try:
+                async for chunk in runnable.astream(messages, config=config):
+                    await events.put((name, "chunk", chunk))
+                await events.put((name, "done", None))
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                await events.put((name, "error", e))
+
+        def launch(name):
+            tasks[name] = asyncio.create_task(run(name))
+
+        launch(self.primary_name)
+        failed, winner = {}, None
+        delay = hedge_delay(self.node)
+        try:
+            while True:
+                timeout = None
+                if winner is None and self.secondary_name not in tasks:
+                    timeout = max(0.0, delay - (time.monotonic() - start))
+                try:
+                    name, kind, payload = await asyncio.wait_for(events.get(), timeout)
+                except asyncio.TimeoutError:
+                    print(f"---LLM: {self.primary_name} slow for '{self.node}', hedging to {self.secondary_name}---")
+                    launch(self.secondary_name)
+                    continue
+                if winner is not None and name != winner:
+                    continue
+                if kind == "error":
+                    failed[name] = payload
+                    if winner is None and name == self.primary_name and self.secondary_name not in tasks and should_fail_over(payload):
+                        print(f"---LLM: {self.primary_name} failed for '{self.node}' ({payload}), failing over---")
+                        launch(self.secondary_name)
+                        continue
+                    if winner is None and len(failed) < len(tasks):
+                        continue
+                    raise failed.get(self.primary_name, payload)
+                if winner is None:
+                    winner = name
+                    _record(self.node, winner, time.monotonic() - start, self.primary_name,
+                            hedged=len(tasks) > 1, failed_over=self.primary_name in failed)
+                    for other, task in tasks.items():
+                        if other != winner:
+                            task.cancel()
+                if kind == "done":
+                    yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata={"served_by": winner}))
+                    return
+                yield ChatGenerationChunk(message=payload.model_copy(update={"id": None}))
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    async def _agenerate(self, messages, stop: Optional[list] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = None
+        async for chunk in self._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            message = chunk.message if message is None else message + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(message))])
+
+
+def get_stats() -> dict:
+    """Returns per-node turn, hedge and failover counts and which provider served them."""
+    with _lock:
+        stats = {node: dict(values, served_by=dict(values["served_by"])) for node, values in _stats.items()}
+    for node, values in stats.items():
+        values["hedge_delay"] = hedge_delay(node)
+    return stats
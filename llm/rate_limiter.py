@@ -0,0 +1,260 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+
+# Requests and tokens per minute allowed per provider/model. Keys are
+# "<provider>/<model>"; unknown models fall back to the provider's entry.
+RATE_LIMITS = {
+    "groq": {"rpm": 30, "tpm": 12000},
+    "google": {"rpm": 10, "tpm": 250000},
+}
+
+# Lower numbers are served first when calls are queued on the same bucket.
+NODE_PRIORITIES = {
+    "router": 0,
+    "general_question": 1,
+    "enhance_content": 2,
+    "analyze_profile": 3,
+    "analyze_job_fit": 3,
+    "counsel_career": 3,
+    "summarize_memory": 4,
+}
+DEFAULT_PRIORITY = 2
+
+# Expected completion size, added to the prompt estimate before a call.
+OUTPUT_TOKEN_ESTIMATES = {"router": 16, "summarize_memory": 512}
+DEFAULT_OUTPUT_TOKENS = 1024
+
+# Seconds one graph turn may spend waiting for capacity, summed over all its LLM calls.
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "60"))
+# Calls allowed to wait per provider/model; beyond that new calls are rejected at once (0 = unlimited).
+LLM_MAX_QUEUE_DEPTH = int(os.getenv("LLM_MAX_QUEUE_DEPTH", "64"))
+
+
+class LLMQueueTimeout(TimeoutError):
+    """Raised when a call could not get rate-limit capacity before its deadline."""
+
+
+class LLMQueueFull(LLMQueueTimeout):
+    """Raised at once when a provider/model already has LLM_MAX_QUEUE_DEPTH calls waiting."""
+
+
+class TokenBucket:
+    """A bucket refilled continuously up to `capacity` at `rate` units per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken. Requests larger than the bucket wait for a full one."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class _Lane:
+    """The request and token buckets for one provider/model and its wait queue."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm, rpm / 60.0)
+        self.tokens = TokenBucket(tpm, tpm / 60.0)
+        self.queue = []
+        self.stats = {"calls": 0, "queued": 0, "timeouts": 0, "rejected": 0, "wait_seconds": 0.0, "max_queue_depth": 0}
+
+
+class Scheduler:
+    """
+    Admits LLM calls through per-provider/model token buckets.
+
+    Callers wait in a priority queue per bucket; only the head of the queue
+    may take capacity, so a queued router call always goes before a queued
+    long analysis. A caller whose deadline passes leaves the queue and gets
+    `LLMQueueTimeout` instead of waiting forever, and a caller arriving at a
+    full queue gets `LLMQueueFull` without waiting at all.
+    """
+
+    def __init__(self, limits: dict = None, max_queue_depth: int = None):
+        self.limits = limits or RATE_LIMITS
+        self.max_queue_depth = LLM_MAX_QUEUE_DEPTH if max_queue_depth is None else max_queue_depth
+        self._lanes = {}
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        # (event loop, asyncio.Event) of every `aacquire` waiting; woken whenever a thread would be notified.
+        self._async_waiters = set()
+
+    def _lane(self, provider: str, model: str) -> _Lane:
+        key = f"{provider}/{model}"
+        lane = self._lanes.get(key)
+        if lane is None:
+            limits = self.limits.get(key) or self.limits.get(provider, {"rpm": 60, "tpm": 100000})
+            lane = self._lanes[key] = _Lane(limits["rpm"], limits["tpm"])
+        return lane
+
+    def _enqueue(self, provider: str, model: str, priority: int) -> tuple:
+        lane = self._lane(provider, model)
+        if self.max_queue_depth and len(lane.queue) >= self.max_queue_depth:
+            lane.stats["rejected"] += 1
+            raise LLMQueueFull(f"{len(lane.queue)} calls already waiting for {provider}/{model}")
+        entry = (priority, next(self._sequence))
+        heapq.heappush(lane.queue, entry)
+        lane.stats["max_queue_depth"] = max(lane.stats["max_queue_depth"], len(lane.queue))
+        if len(lane.queue) > 1:
+            lane.stats["queued"] += 1
+        return lane, entry
+
+    def _try_admit(self, lane: _Lane, entry: tuple, tokens: int, start: float):
+        """Takes capacity if `entry` is at the head and the buckets allow it; otherwise returns the wait, if known."""
+        now = time.monotonic()
+        if lane.queue[0] != entry:
+            return False, None
+        wait = max(lane.requests.wait_time(1, now), lane.tokens.wait_time(tokens, now))
+        if wait > 0.0:
+            return False, wait
+        lane.requests.take(1)
+        lane.tokens.take(tokens)
+        lane.stats["calls"] += 1
+        lane.stats["wait_seconds"] += now - start
+        return True, None
+
+    def _leave(self, lane: _Lane, entry: tuple) -> None:
+        lane.queue.remove(entry)
+        heapq.heapify(lane.queue)
+        self._condition.notify_all()
+        for loop, event in self._async_waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def _timeout(self, lane: _Lane, provider: str, model: str) -> LLMQueueTimeout:
+        lane.stats["timeouts"] += 1
+        return LLMQueueTimeout(f"No {provider}/{model} capacity before the deadline")
+
+    def acquire(self, provider: str, model: str, tokens: int, priority: int = DEFAULT_PRIORITY, deadline: float = None) -> None:
+        """
+        Blocks until the call may proceed.
+
+        Args:
+            provider: The LLM provider, e.g. "groq".
+            model: The model name.
+            tokens: The estimated prompt plus completion tokens.
+            priority: Lower values are admitted first.
+            deadline: A time.monotonic() deadline; defaults to LLM_QUEUE_TIMEOUT from now.
+
+        Raises:
+            LLMQueueTimeout: If the deadline passes before capacity is available.
+        """
+        deadline = deadline if deadline is not None else time.monotonic() + LLM_QUEUE_TIMEOUT
+        start = time.monotonic()
+        with self._condition:
+            lane, entry = self._enqueue(provider, model, priority)
+            try:
+                while True:
+                    admitted, wait = self._try_admit(lane, entry, tokens, start)
+                    if admitted:
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._timeout(lane, provider, model)
+                    self._condition.wait(min(remaining, wait) if wait is not None else remaining)
+            finally:
+                self._leave(lane, entry)
+
+    async def aacquire(self, provider: str, model: str, tokens: int, priority: int = DEFAULT_PRIORITY,
+                       deadline: float = None) -> None:
+        """
+        Async variant of `acquire`: waits on the event loop instead of holding a thread.
+
+        Async and threaded callers share the same queues and buckets.
+        """
+        deadline = deadline if deadline is not None else time.monotonic() + LLM_QUEUE_TIMEOUT
+        start = time.monotonic()
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._condition:
+            lane, entry = self._enqueue(provider, model, priority)
+            self._async_waiters.add(waiter)
+        try:
+            while True:
+                # Cleared before checking, so a wake-up sent after the check is not lost.
+                waiter[1].clear()
+                with self._condition:
+                    admitted, wait = self._try_admit(lane, entry, tokens, start)
+                    remaining = deadline - time.monotonic()
+                    if admitted:
+                        return
+                    if remaining <= 0:
+                        raise self._timeout(lane, provider, model)
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), min(remaining, wait) if wait is not None else remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._condition:
+                self._async_waiters.discard(waiter)
+                self._leave(lane, entry)
+
+    def stats(self) -> dict:
+        """Returns per-lane call, queueing, timeout and rejection counters and the current queue depth."""
+        with self._condition:
+            return {
+                key: dict(lane.stats, queue_depth=len(lane.queue))
+                for key, lane in self._lanes.items()
+            }
+
+
+scheduler = Scheduler()
+
+
+def with_turn_deadline(config: dict, timeout: float = None) -> dict:
+    """
+    Returns a copy of a graph run config that gives the whole turn one
+    rate-limit deadline, so the router, the specialist, a hedged secondary
+    and the summarizer share `timeout` seconds (default: the config's
+    "llm_queue_timeout", else LLM_QUEUE_TIMEOUT) instead of each waiting it out.
+    """
+    configurable = dict((config or {}).get("configurable", {}))
+    if timeout is None:
+        timeout = configurable.get("llm_queue_timeout", LLM_QUEUE_TIMEOUT)
+    configurable["llm_deadline"] = time.monotonic() + timeout
+    return dict(config or {}, configurable=configurable)
+
+
+def call_deadline(config: dict) -> float:
+    """The time.monotonic() deadline for an LLM call made under a run config; see `with_turn_deadline`."""
+    configurable = (config or {}).get("configurable", {})
+    if "llm_deadline" in configurable:
+        return configurable["llm_deadline"]
+    return time.monotonic() + configurable.get("llm_queue_timeout", LLM_QUEUE_TIMEOUT)
+
+
+def estimate_input_tokens(value) -> int:
+    """Estimates the prompt size of a string, prompt value or list of messages."""
+    if hasattr(value, "to_messages"):
+        value = value.to_messages()
+    if isinstance(value, str):
+        text = value
+    else:
+        text = "".join(str(getattr(message, "content", message)) for message in value)
+    return (len(text) + 3) // 4
+
+
+def node_priority(node: str) -> int:
+    return NODE_PRIORITIES.get(node, DEFAULT_PRIORITY)
+
+
+def estimate_call_tokens(node: str, value) -> int:
+    return estimate_input_tokens(value) + OUTPUT_TOKEN_ESTIMATES.get(node, DEFAULT_OUTPUT_TOKENS)
+
+
+def get_stats() -> dict:
+    return scheduler.stats()
@@ -0,0 +1,246 @@
+import json
+import os
+import threading
+
+import httpx
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from dotenv import load_dotenv
+load_dotenv()
+
+from llm import rate_limiter
+
+# Model settings per provider. A node's entry in NODE_CONFIG picks a provider
+# and may override any of these.
+PROVIDER_DEFAULTS = {
+    "groq": {"model": "llama-3.3-70b-versatile", "temperature": 0.0, "max_retries": 2},
+    "google": {"model": "gemini-2.5-flash"},
+}
+
+# "secondary" is the fallback model used for hedging and failover (see llm/hedging.py).
+NODE_CONFIG = {
+    "router": {"provider": "google", "secondary": {"provider": "groq"}},
+    "analyze_profile": {"provider": "groq", "secondary": {"provider": "google"}},
+    "analyze_job_fit": {"provider": "groq", "secondary": {"provider": "google"}},
+    "enhance_content": {"provider": "groq", "secondary": {"provider": "google"}},
+    "counsel_career": {"provider": "groq", "secondary": {"provider": "google"}},
+    "general_question": {"provider": "groq", "secondary": {"provider": "google"}},
+    "summarize_memory": {"provider": "groq", "secondary": {"provider": "google"}},
+}
+
+# Optional JSON file with per-node overrides, e.g. {"router": {"model": "gemini-2.5-flash-lite"}}
+# ({"secondary": null} turns the fallback off for a node), and a "rate_limits"
+# section for llm/rate_limiter.py.
+LLM_CONFIG_PATH = os.getenv("LLM_CONFIG_PATH")
+
+# Set LLM_HEDGING=0 to call only the primary model.
+LLM_HEDGING = os.getenv("LLM_HEDGING", "1").lower() not in ("0", "false", "no")
+
+GROQ_BASE_URL = "https://api.groq.com"
+# Warm-up requests are admitted after every node's calls.
+WARM_UP_PRIORITY = max(rate_limiter.NODE_PRIORITIES.values()) + 1
+
+_clients = {}
+_runnables = {}
+_http_clients = {}
+_lock = threading.Lock()
+_overrides = None
+_warmed = False
+
+
+def _load_overrides() -> dict:
+    global _overrides
+    if _overrides is None:
+        _overrides = {}
+        if LLM_CONFIG_PATH:
+            with open(LLM_CONFIG_PATH, "r") as f:
+                _overrides = json.load(f)
+            # {"rate_limits": {"groq/llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000}}}
+            rate_limiter.RATE_LIMITS.update(_overrides.get("rate_limits", {}))
+    return _overrides
+
+
+def _resolve(node_config: dict) -> dict:
+    provider = node_config.get("provider", "groq")
+    config = dict(PROVIDER_DEFAULTS[provider])
+    config.update(node_config)
+    config["provider"] = provider
+    return config
+
+
+def get_node_config(node: str) -> dict:
+    """
+    Returns the resolved model settings for a node.
+
+    Args:
+        node: The graph node name, e.g. "analyze_profile".
+
+    Returns:
+        A dictionary with the provider, the model and its parameters.
+    """
+    node_config = dict(NODE_CONFIG.get(node, {"provider": "groq"}))
+    node_config.update(_load_overrides().get(node, {}))
+    node_config.pop("secondary", None)
+    return _resolve(node_config)
+
+
+def get_secondary_config(node: str):
+    """
+    Returns the resolved settings of a node's fallback model.
+
+    Args:
+        node: The graph node name, e.g. "analyze_profile".
+
+    Returns:
+        A dictionary like `get_node_config`'s, or None if the node has no
+        fallback model.
+    """
+    node_config = dict(NODE_CONFIG.get(node, {}))
+    node_config.update(_load_overrides().get(node, {}))
+    secondary = node_config.get("secondary")
+    return _resolve(secondary) if secondary else None
+
+
+def _shared_http_client(kind: str):
+    """One keep-alive connection pool per process, shared by every Groq client."""
+    if kind not in _http_clients:
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=300.0)
+        client_cls = httpx.AsyncClient if kind == "async" else httpx.Client
+        _http_clients[kind] = client_cls(limits=limits, timeout=httpx.Timeout(120.0, connect=10.0))
+    return _http_clients[kind]
+
+
+def _build_client(config: dict):
+    params = {k: v for k, v in config.items() if k != "provider"}
+    if config["provider"] == "groq":
+        from langchain_groq import ChatGroq
+        return ChatGroq(
+            api_key=os.getenv("groq_api_key"),
+            http_client=_shared_http_client("sync"),
+            http_async_client=_shared_http_client("async"),
+            **params,
+        )
+    if config["provider"] == "google":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(api_key=os.getenv("google_api_key"), **params)
+    raise ValueError(f"Unknown LLM provider: {config['provider']}")
+
+
+def _get_client(config: dict):
+    """Returns the raw chat model for a config; nodes with identical settings share one."""
+    key = json.dumps(config, sort_keys=True)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _build_client(config)
+                _clients[key] = client
+    return client
+
+
+def _rate_limit_gate(node: str, config: dict):
+    """Builds a pass-through step that waits for rate-limit capacity before the model runs."""
+    provider, model, priority = config["provider"], config["model"], rate_limiter.node_priority(node)
+
+    def gate(value, config: RunnableConfig):
+        rate_limiter.scheduler.acquire(
+            provider, model, rate_limiter.estimate_call_tokens(node, value), priority, rate_limiter.call_deadline(config)
+        )
+        return value
+
+    async def agate(value, config: RunnableConfig):
+        await rate_limiter.scheduler.aacquire(
+            provider, model, rate_limiter.estimate_call_tokens(node, value), priority, rate_limiter.call_deadline(config)
+        )
+        return value
+
+    return RunnableLambda(gate, afunc=agate, name="rate_limit")
+
+
+def _hedged_primary(config: dict) -> dict:
+    """
+    A hedged primary does not retry in its SDK: the hedge fails over on the
+    first 429, 5xx or connection error instead of waiting out the SDK's backoff.
+    """
+    return dict(config, max_retries=0)
+
+
+def _model_name(config: dict) -> str:
+    return f"{config['provider']}/{config['model']}"
+
+
+def get_llm(node: str):
+    """
+    Returns the chat model for a node, building it on first use.
+
+    Every call made through it first waits for capacity in the shared
+    rate-limit scheduler (see llm/rate_limiter.py). Nodes with a secondary
+    model get a `HedgedChatModel` that falls back to it when the primary is
+    slow or failing.
+    """
+    llm = _runnables.get(node)
+    if llm is None:
+        config = get_node_config(node)
+        secondary = get_secondary_config(node) if LLM_HEDGING else None
+        if secondary:
+            from llm.hedging import HedgedChatModel
+            llm = HedgedChatModel(
+                node=node,
+                primary=_rate_limit_gate(node, config) | _get_client(_hedged_primary(config)),
+                secondary=_rate_limit_gate(node, secondary) | _get_client(secondary),
+                primary_name=_model_name(config),
+                secondary_name=_model_name(secondary),
+            )
+        else:
+            llm = _rate_limit_gate(node, config) | _get_client(config)
+        _runnables[node] = llm
+    return llm
+
+
+def _open_connection(config: dict) -> None:
+    client = _get_client(config)
+    if config["provider"] == "groq":
+        # Any response will do; the point is the TCP/TLS handshake in the shared pool.
+        _shared_http_client("sync").head(GROQ_BASE_URL)
+    elif config["provider"] == "google":
+        # An API request: it waits its turn behind every node's calls.
+        rate_limiter.scheduler.acquire(
+            config["provider"], config["model"], 1, WARM_UP_PRIORITY, rate_limiter.call_deadline(None)
+        )
+        client.client.models.get(model=config["model"])
+
+
+def warm_up(nodes=None, background: bool = True) -> None:
+    """
+    Builds the clients and opens their connections ahead of the first turn.
+
+    Args:
+        nodes: The nodes to warm; defaults to every configured node.
+        background: Run in a daemon thread so startup is not delayed.
+    """
+    global _warmed
+    with _lock:
+        if _warmed:
+            return
+        _warmed = True
+
+    def run():
+        seen = set()
+        for node in nodes or NODE_CONFIG:
+            configs = [get_node_config(node)]
+            if LLM_HEDGING and get_secondary_config(node):
+                configs = [_hedged_primary(configs[0]), get_secondary_config(node)]
+            for config in configs:
+                key = json.dumps(config, sort_keys=True)
+                if key in seen:
+                    continue
+                seen.add(key)
+                try:
+                    _open_connection(config)
+                except Exception as e:
+                    print(f"---LLM: Could not warm up '{node}' ({_model_name(config)}): {e}---")
+
+    if background:
+        threading.Thread(target=run, name="llm-warm-up", daemon=True).start()
+    else:
+        run()
@@ -0,0 +1,67 @@
+import os
+
+from agents.profile_views import estimate_tokens
+
+# Tokens of conversation context every node gets: the rolling summary plus as many recent messages as fit.
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "3000"))
+# Unsummarized tokens that have fallen out of the window before the summary is updated.
+MEMORY_SUMMARY_CHUNK = int(os.getenv("MEMORY_SUMMARY_CHUNK", str(MEMORY_TOKEN_BUDGET // 4)))
+
+
+def format_message(message) -> str:
+    role = "User" if message.type == "human" else "AI"
+    return f"{role}: {message.content}"
+
+
+def message_tokens(message) -> int:
+    return estimate_tokens(format_message(message)) + 1
+
+
+def split_history(state: dict, token_budget: int = None) -> tuple:
+    """
+    Splits the conversation into the part covered by the summary, the part
+    waiting to be summarized and the recent window.
+
+    The window is filled from the newest message backwards until the budget
+    (minus the summary) is used up; the newest message is always included.
+    Only the window and the pending messages are visited, so the cost does
+    not grow with the length of the thread.
+
+    Args:
+        state: The graph state with `messages`, `conversation_summary` and
+            `summarized_messages` (how many leading messages the summary covers).
+        token_budget: Defaults to MEMORY_TOKEN_BUDGET.
+
+    Returns:
+        A (summary, pending, window) tuple; `pending` and `window` are lists of messages.
+    """
+    budget = MEMORY_TOKEN_BUDGET if token_budget is None else token_budget
+    messages = state.get("messages") or []
+    summary = state.get("conversation_summary") or ""
+    summarized = min(state.get("summarized_messages") or 0, len(messages))
+    available = budget - estimate_tokens(summary)
+
+    start, used = len(messages), 0
+    while start > summarized:
+        tokens = message_tokens(messages[start - 1])
+        if start < len(messages) and used + tokens > available:
+            break
+        used += tokens
+        start -= 1
+    return summary, messages[summarized:start], messages[start:]
+
+
+def format_history(state: dict, token_budget: int = None) -> str:
+    """
+    Formats the conversation context for a prompt: the rolling summary of
+    older turns followed by the recent window as "User: ..." / "AI: ..." lines.
+    """
+    summary, _, window = split_history(state, token_budget)
+    lines = [f"Summary of the earlier conversation: {summary}"] if summary else []
+    lines.extend(format_message(message) for message in window)
+    return "\n".join(lines).strip()
+
+
+def needs_summary(pending: list) -> bool:
+    """True once the messages that fell out of the window are worth a summarizer call."""
+    return bool(pending) and sum(message_tokens(message) for message in pending) >= MEMORY_SUMMARY_CHUNK
@@ -0,0 +1,82 @@
+import json
+import os
+from functools import lru_cache
+
+from cache import artifact_store
+
+# Resolved profiles kept in memory, by hash.
+PROFILE_STORE_CACHE_SIZE = int(os.getenv("PROFILE_STORE_CACHE_SIZE", "128"))
+
+
+def attach_profile(thread_id: str, profile_text: str = None, profile_data: dict = None, profile_url: str = None) -> dict:
+    """
+    Stores a profile in the artifact store (cache/artifact_store.py), holds
+    it for a thread and returns the state fields that reference it.
+
+    The references are the artifact hashes, so a thread and the artifact
+    saved at ingestion share one copy. The hold keeps the artifact store's
+    GC from removing the profile while the thread exists.
+
+    Args:
+        thread_id: The thread whose state will reference the profile.
+        profile_text: The formatted profile.
+        profile_data: The raw scraped profile.
+        profile_url: Also index the artifacts under this URL.
+
+    Returns:
+        A state update with `profile_text_ref` and/or `profile_data_ref`.
+    """
+    hashes = artifact_store.put_profile(profile_url, raw_item=profile_data, profile_text=profile_text, holder=thread_id)
+    refs = {}
+    if artifact_store.FORMATTED in hashes:
+        refs["profile_text_ref"] = hashes[artifact_store.FORMATTED]
+    if artifact_store.RAW in hashes:
+        refs["profile_data_ref"] = hashes[artifact_store.RAW]
+    return refs
+
+
+@lru_cache(maxsize=PROFILE_STORE_CACHE_SIZE)
+def _load(digest: str) -> bytes:
+    data = artifact_store.get_store().get(digest)
+    if data is None:
+        # Raised rather than returned so that the miss is not cached.
+        raise KeyError(digest)
+    return data
+
+
+def _get(digest: str):
+    try:
+        return _load(digest)
+    except KeyError:
+        print(f"---PROFILE STORE: No profile stored under {digest}---")
+        return None
+
+
+def get_profile_text(state: dict):
+    """
+    Returns the formatted profile of a state, loading it by hash on first use.
+
+    States saved before profiles were stored by reference still carry the
+    text itself in `profile_text`, which is returned as is.
+    """
+    if state.get("profile_text"):
+        return state["profile_text"]
+    ref = state.get("profile_text_ref")
+    data = _get(ref) if ref else None
+    return data.decode("utf-8") if data is not None else None
+
+
+def get_profile_data(state: dict):
+    """Returns the raw profile of a state, loading it by hash; see `get_profile_text`."""
+    if state.get("profile_data"):
+        return state["profile_data"]
+    ref = state.get("profile_data_ref")
+    data = _get(ref) if ref else None
+    return json.loads(data) if data is not None else None
+
+
+def get_stats() -> dict:
+    """Returns the artifact store's counts and sizes and the in-memory hit rate."""
+    info = _load.cache_info()
+    lookups = info.hits + info.misses
+    return dict(artifact_store.get_stats(), cache_hit_rate=info.hits / lookups if lookups else 0.0)
@@ -1,7 +1,54 @@
-import os
+import uuid
 from typing import TypedDict, Annotated, List
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, convert_to_messages
 
+# The routes the router can emit. Each one is an edge out of the router node.
+ROUTES = (
+    "analyze_profile",
+    "analyze_job_fit",
+    "enhance_content",
+    "counsel_career",
+    "general_question",
+    "end_session",
+)
+
+def append_messages(left: list, right) -> list:
+    """
+    The reducer for `messages`: appends new messages, ignoring ones already present.
+
+    Messages without an ID are added as copies with a new ID (the caller's
+    objects are not changed), and a message whose ID is already in the
+    history (for example one sent again through `app.update_state`) is
+    skipped, so applying the same update twice changes nothing. Existing
+    messages are never replaced or removed, and `left` is never changed in
+    place, because LangGraph may still be serializing the checkpoint that
+    holds it.
+
+    This buys idempotence, not speed: like `x + y` it copies the history,
+    and an update carrying an ID (every AI reply does) also scans it once.
+
+    Args:
+        left: The current history.
+        right: A message or list of messages to add.
+
+    Returns:
+        The unchanged history if nothing was new, otherwise a new list.
+    """
+    if not isinstance(right, list):
+        right = [right]
+    left = left or []
+    incoming = convert_to_messages(right)
+    # Only a message that already has an ID can be in the history.
+    known = {message.id for message in left} if any(message.id is not None for message in incoming) else set()
+    new = []
+    for message in incoming:
+        if message.id is None:
+            message = message.model_copy(update={"id": str(uuid.uuid4())})
+        elif message.id in known:
+            continue
+        known.add(message.id)
+        new.append(message)
+    return left + new if new else left
 
 
 class GraphState(TypedDict):
@@ -11,17 +58,28 @@ class GraphState(TypedDict):
     Attributes:
         linkedin_url: The URL of the LinkedIn profile to analyze.
         job_role: The target job role for comparison.
-        profile_data: The raw JSON data scraped from Apify.
-        profile_text: The cleaned, formatted text version of the profile.
+        profile_data_ref: The hash of the raw JSON data scraped from Apify.
+        profile_text_ref: The hash of the cleaned, formatted text version of
+            the profile. Both are artifact hashes (cache/artifact_store.py),
+            read with `get_profile_data` / `get_profile_text` from
+            `states/profile_store.py`.
+        profile_data: The raw data itself, only in states saved before it was stored by reference.
+        profile_text: The profile text itself, only in states saved before it was stored by reference.
         initial_analysis: The output from the general profile analysis.
         job_fit_report: The output from the job fit analysis.
         messages: The list of messages in the conversation history.
+        conversation_summary: A rolling summary of the older messages.
+        summarized_messages: How many leading messages the summary covers.
     """
     linkedin_url: str
     job_role: str
+    profile_data_ref: str
+    profile_text_ref: str
     profile_data: dict
     profile_text: str
     initial_analysis: str
     job_fit_report: str
-    messages: Annotated[List[BaseMessage], lambda x, y: x + y]
+    messages: Annotated[List[BaseMessage], append_messages]
+    conversation_summary: str
+    summarized_messages: int
     route: str
\ No newline at end of file
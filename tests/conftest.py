@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# Keep the caches, checkpoints and logs the modules open at import out of the working tree.
+_tmp = tempfile.mkdtemp(prefix="linkedin-agent-tests-")
+os.environ.setdefault("THREADS_DB_PATH", os.path.join(_tmp, "threads.sqlite"))
+os.environ.setdefault("CACHE_DB_PATH", os.path.join(_tmp, "cache.sqlite"))
+os.environ.setdefault("ROUTER_TRAFFIC_LOG", os.path.join(_tmp, "router_traffic.jsonl"))
+os.environ.setdefault("groq_api_key", "test")
+os.environ.setdefault("google_api_key", "test")
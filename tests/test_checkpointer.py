@@ -0,0 +1,77 @@
+import multiprocessing
+import sqlite3
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, StateGraph
+
+from graph.checkpointer import connect, get_checkpointer
+from states.state import GraphState
+
+TURNS = 5
+
+
+def _app(db_path: str):
+    workflow = StateGraph(GraphState)
+    workflow.add_node("reply", lambda state: {"messages": [AIMessage(content="A reply")]})
+    workflow.set_entry_point("reply")
+    workflow.add_edge("reply", END)
+    return workflow.compile(checkpointer=get_checkpointer(db_path))
+
+
+def _chat(app, thread_id: str, errors: list) -> None:
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        for turn in range(TURNS):
+            app.get_state(config)
+            app.invoke({"messages": [HumanMessage(content=f"Question {turn}")]}, config)
+    except sqlite3.OperationalError as e:
+        errors.append(str(e))
+
+
+def _process(db_path: str, prefix: str, workers: int, results) -> None:
+    app = _app(db_path)
+    errors = []
+    threads = [threading.Thread(target=_chat, args=(app, f"{prefix}-{i}", errors)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(errors)
+
+
+def test_concurrent_processes_and_threads_keep_every_turn(tmp_path):
+    db_path = str(tmp_path / "threads.sqlite")
+    _app(db_path).checkpointer.setup()
+    results = multiprocessing.Queue()
+    children = [multiprocessing.Process(target=_process, args=(db_path, f"p{p}", 4, results)) for p in range(3)]
+    for child in children:
+        child.start()
+    errors = [error for _ in children for error in results.get(timeout=60)]
+    for child in children:
+        child.join()
+
+    assert errors == []
+    app = _app(db_path)
+    for p in range(3):
+        for i in range(4):
+            messages = app.get_state({"configurable": {"thread_id": f"p{p}-{i}"}}).values["messages"]
+            assert len(messages) == 2 * TURNS
+
+
+def test_a_writer_waits_for_another_connections_write_lock(tmp_path):
+    db_path = str(tmp_path / "threads.sqlite")
+    app = _app(db_path)
+    app.checkpointer.setup()
+    assert app.checkpointer.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = connect(db_path)
+    other.execute("BEGIN IMMEDIATE")
+    releaser = threading.Timer(0.5, other.commit)
+    releaser.start()
+    start = time.monotonic()
+    app.invoke({"messages": [HumanMessage(content="Question")]}, {"configurable": {"thread_id": "t"}})
+    assert time.monotonic() - start >= 0.4
+    releaser.join()
+    other.close()
@@ -0,0 +1,23 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from memory_manager.conversation_memory import format_history, split_history
+
+
+def _messages(count: int) -> list:
+    return [(HumanMessage if i % 2 == 0 else AIMessage)(content=f"message {i} " + "word " * 50, id=str(i))
+            for i in range(count)]
+
+
+def test_window_fits_the_budget_and_keeps_the_newest_message():
+    messages = _messages(40)
+    _, pending, window = split_history({"messages": messages}, token_budget=300)
+    assert window[-1] is messages[-1]
+    assert 0 < len(window) < len(messages)
+    assert pending + window == messages
+
+
+def test_summary_comes_before_the_window():
+    state = {"messages": _messages(10), "conversation_summary": "The user wants a data role.", "summarized_messages": 6}
+    history = format_history(state)
+    assert history.startswith("Summary of the earlier conversation: The user wants a data role.")
+    assert "message 5 " not in history and "message 9 " in history
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from graph import episodes
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "threads.sqlite")
+
+
+def test_a_name_can_only_be_reserved_once(db_path):
+    assert episodes.reserve_episode("ana", "thread-1", "Data role", db_path=db_path)
+    assert not episodes.reserve_episode("ana", "thread-2", "Data role", db_path=db_path)
+    # Names are unique per user only
+    assert episodes.reserve_episode("bo", "thread-3", "Data role", db_path=db_path)
+    assert episodes.get_episode("ana", "Data role", db_path=db_path)["thread_id"] == "thread-1"
+
+
+def test_concurrent_reservations_of_one_name_have_a_single_winner(db_path):
+    results = {}
+    start = threading.Barrier(8)
+
+    def reserve(i):
+        start.wait()
+        results[i] = episodes.reserve_episode("ana", f"thread-{i}", "Data role", db_path=db_path)
+
+    workers = [threading.Thread(target=reserve, args=(i,)) for i in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert sorted(results.values()) == [False] * 7 + [True]
+
+
+def test_a_reservation_is_listed_once_registered(db_path):
+    episodes.reserve_episode("ana", "thread-1", "Data role", profile_url="https://linkedin.com/in/ana", db_path=db_path)
+    assert episodes.list_episodes("ana", db_path=db_path) == []
+    assert episodes.count_episodes("ana", db_path=db_path) == 0
+
+    welcome = AIMessage(content="Welcome to your new episode")
+    episodes.register_episode("ana", "thread-1", "Data role", profile_url="https://linkedin.com/in/ana",
+                              profile_hash="abc", messages=[welcome], db_path=db_path)
+    [episode] = episodes.list_episodes("ana", db_path=db_path)
+    assert episode["thread_id"] == "thread-1"
+    assert episode["profile_hash"] == "abc"
+    assert episode["message_count"] == 1
+    assert episode["last_message_preview"] == "Welcome to your new episode"
+    assert episodes.count_episodes("ana", db_path=db_path) == 1
+
+
+def test_releasing_frees_the_name_but_keeps_registered_episodes(db_path):
+    episodes.reserve_episode("ana", "thread-1", "Failed", db_path=db_path)
+    episodes.release_episode("thread-1", db_path=db_path)
+    assert episodes.get_episode("ana", "Failed", db_path=db_path) is None
+    assert episodes.reserve_episode("ana", "thread-2", "Failed", db_path=db_path)
+
+    episodes.register_episode("ana", "thread-3", "Kept", messages=[], db_path=db_path)
+    episodes.release_episode("thread-3", db_path=db_path)
+    assert episodes.get_episode("ana", "Kept", db_path=db_path) is not None
+
+
+def test_an_abandoned_reservation_expires(db_path, monkeypatch):
+    episodes.reserve_episode("ana", "thread-1", "Data role", db_path=db_path)
+    monkeypatch.setattr(episodes, "RESERVATION_TTL", 0)
+    time.sleep(0.01)
+    assert episodes.reserve_episode("ana", "thread-2", "Data role", db_path=db_path)
+    assert episodes.get_episode("ana", "Data role", db_path=db_path)["thread_id"] == "thread-2"
+
+
+def test_activity_updates_counts_and_order(db_path):
+    episodes.register_episode("ana", "thread-1", "First", messages=[AIMessage(content="Hi")], db_path=db_path)
+    episodes.register_episode("ana", "thread-2", "Second", messages=[AIMessage(content="Hi")], db_path=db_path)
+    episodes.record_activity("thread-1", [HumanMessage(content="Question"), AIMessage(content="x " * 200)],
+                             db_path=db_path)
+
+    first, second = episodes.list_episodes("ana", db_path=db_path)
+    assert (first["name"], second["name"]) == ("First", "Second")
+    assert first["message_count"] == 3
+    assert len(first["last_message_preview"]) == episodes.PREVIEW_CHARS
+    assert [e["name"] for e in episodes.list_episodes("ana", limit=1, offset=1, db_path=db_path)] == ["Second"]
+
+    # Registering an existing episode again keeps its counts
+    episodes.register_episode("ana", "thread-1", "First", messages=[], db_path=db_path)
+    assert episodes.get_episode("ana", "First", db_path=db_path)["message_count"] == 3
@@ -0,0 +1,94 @@
+import httpx
+import pytest
+
+from llm.hedging import should_fail_over
+
+_REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+def _raised_from(error: BaseException, cause: BaseException) -> BaseException:
+    try:
+        raise error from cause
+    except BaseException as e:
+        return e
+
+
+def _google_client_error(code: int):
+    from google.genai.errors import ClientError
+    return ClientError(code, {"error": {"code": code, "message": "error", "status": "ERROR"}})
+
+
+def _google_server_error(code: int):
+    from google.genai.errors import ServerError
+    return ServerError(code, {"error": {"code": code, "message": "error", "status": "UNAVAILABLE"}})
+
+
+def test_groq_connection_error_fails_over():
+    groq = pytest.importorskip("groq")
+    assert should_fail_over(groq.APIConnectionError(request=_REQUEST))
+
+
+def test_groq_timeout_fails_over():
+    groq = pytest.importorskip("groq")
+    assert should_fail_over(groq.APITimeoutError(request=_REQUEST))
+
+
+def test_groq_rate_limit_fails_over():
+    groq = pytest.importorskip("groq")
+    response = httpx.Response(429, request=_REQUEST)
+    assert should_fail_over(groq.RateLimitError("rate limited", response=response, body=None))
+
+
+def test_google_rate_limit_fails_over():
+    chat_models = pytest.importorskip("langchain_google_genai.chat_models")
+    error = _raised_from(chat_models.GoogleRateLimitError("rate limited"), _google_client_error(429))
+    assert should_fail_over(error)
+
+
+def test_google_wrapped_server_error_fails_over():
+    chat_models = pytest.importorskip("langchain_google_genai.chat_models")
+    error = _raised_from(chat_models.ChatGoogleGenerativeAIError("unavailable"), _google_server_error(503))
+    assert should_fail_over(error)
+
+
+def test_google_wrapped_connection_error_fails_over():
+    chat_models = pytest.importorskip("langchain_google_genai.chat_models")
+    error = _raised_from(chat_models.ChatGoogleGenerativeAIError("connection"), httpx.ConnectError("reset"))
+    assert should_fail_over(error)
+
+
+def test_google_bad_request_does_not_fail_over():
+    chat_models = pytest.importorskip("langchain_google_genai.chat_models")
+    error = _raised_from(chat_models.ChatGoogleGenerativeAIError("bad request"), _google_client_error(400))
+    assert not should_fail_over(error)
+
+
+def test_other_errors_do_not_fail_over():
+    assert not should_fail_over(ValueError("bad prompt"))
+
+
+def test_queue_timeouts_do_not_fail_over():
+    from llm.rate_limiter import LLMQueueFull, LLMQueueTimeout
+    assert not should_fail_over(LLMQueueTimeout("no capacity"))
+    assert not should_fail_over(LLMQueueFull("queue full"))
+    assert not should_fail_over(_raised_from(RuntimeError("wrapped"), LLMQueueTimeout("no capacity")))
+
+
+def test_primary_latency_is_sampled_when_the_hedge_wins(monkeypatch):
+    import time
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+    from llm import hedging
+
+    def fake(text):
+        return GenericFakeChatModel(messages=iter([AIMessage(content=text)]))
+
+    slow = RunnableLambda(lambda value: (time.sleep(0.5), value)[1]) | fake("primary")
+    monkeypatch.setattr(hedging, "HEDGE_DEFAULT_DELAY", 0.05)
+    monkeypatch.setattr(hedging, "_latencies", {})
+    model = hedging.HedgedChatModel(node="hedge-test", primary=slow, secondary=fake("secondary"),
+                                    primary_name="slow", secondary_name="fast")
+    assert model.invoke("hi").content == "secondary"
+    assert len(hedging._latencies["hedge-test"]) == 1
+    assert hedging._latencies["hedge-test"][0] >= 0.05
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, StateGraph
+
+from graph import history
+from graph.checkpointer import get_checkpointer
+from states.state import GraphState
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "_cache", OrderedDict())
+    monkeypatch.setattr(history, "_stats", {"hits": 0, "misses": 0})
+    workflow = StateGraph(GraphState)
+    workflow.add_node("reply", lambda state: {"messages": [AIMessage(content="A reply")]})
+    workflow.set_entry_point("reply")
+    workflow.add_edge("reply", END)
+    checkpointer = get_checkpointer(str(tmp_path / "threads.sqlite"))
+    yield workflow.compile(checkpointer=checkpointer)
+    checkpointer.conn.close()
+
+
+def _ask(app, thread_id: str, question: str) -> None:
+    app.invoke({"messages": [HumanMessage(content=question)]}, {"configurable": {"thread_id": thread_id}})
+
+
+def test_a_new_checkpoint_invalidates_the_cached_history(app):
+    _ask(app, "t", "First question")
+    first = history.get_history(app, "t")
+    assert [m.content for m in first] == ["First question", "A reply"]
+    assert history.get_history(app, "t") is first
+    assert history.get_stats()["hits"] == 1
+
+    _ask(app, "t", "Second question")
+    second = history.get_history(app, "t")
+    assert [m.content for m in second] == ["First question", "A reply", "Second question", "A reply"]
+    assert history.get_stats() == {"hits": 1, "misses": 2, "threads": 1}
+
+
+def test_remembered_history_is_reused_until_the_next_checkpoint(app):
+    config = {"configurable": {"thread_id": "t"}}
+    _ask(app, "t", "Question")
+    remembered = history.remember_history("t", app.get_state(config))
+    assert history.get_history(app, "t") is remembered
+    assert history.get_stats()["misses"] == 0
+
+
+def test_the_least_recently_used_thread_is_evicted(app, monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_CACHE_SIZE", 2)
+    for thread_id in ("a", "b", "c"):
+        _ask(app, thread_id, f"Question in {thread_id}")
+    history.get_history(app, "a")
+    history.get_history(app, "b")
+    history.get_history(app, "a")  # "b" is now the least recently used
+    history.get_history(app, "c")
+
+    assert list(history._cache) == ["a", "c"]
+    assert history.get_stats()["threads"] == 2
+    misses = history.get_stats()["misses"]
+    history.get_history(app, "a")
+    assert history.get_stats()["misses"] == misses
+    history.get_history(app, "b")
+    assert history.get_stats()["misses"] == misses + 1
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import agents.router
+from agents import intent_classifier
+from cache import route_cache
+
+
+def _seeded():
+    classifier = intent_classifier.IntentClassifier()
+    classifier.add_examples(
+        [(example, route) for route, examples in intent_classifier.SEED_EXAMPLES.items() for example in examples]
+    )
+    classifier.threshold, _, _ = intent_classifier.calibrate_threshold(classifier, intent_classifier.HELD_OUT_EXAMPLES)
+    return classifier
+
+
+@pytest.mark.parametrize("text", ["help", "good", "ok", "bye"])
+def test_one_word_messages_never_take_the_fast_path(text):
+    _, confidence = _seeded().predict(text)
+    assert confidence == 0.0
+
+
+def test_calibrated_threshold_is_precise_on_held_out_examples():
+    classifier = _seeded()
+    threshold, precision, coverage = intent_classifier.calibrate_threshold(
+        classifier, intent_classifier.HELD_OUT_EXAMPLES, min_precision=0.95
+    )
+    assert precision >= 0.95 and coverage > 0.0
+    for text, route in intent_classifier.HELD_OUT_EXAMPLES:
+        predicted, confidence = classifier.predict(text)
+        if confidence >= threshold:
+            assert predicted == route
+
+
+def test_centroids_are_only_rebuilt_when_examples_are_added():
+    classifier = _seeded()
+    model = classifier._model
+    classifier.predict("review my profile")
+    assert classifier._model is model
+    classifier.add_example("look at my linkedin please", "analyze_profile")
+    assert classifier._model is not model
+
+
+def test_fast_path_routes_are_not_cached(monkeypatch):
+    monkeypatch.setattr(intent_classifier, "classify", lambda text: ("analyze_profile", 0.9))
+    message = "please review my whole profile for the fast path test"
+    assert agents.router._local_route(message) == "analyze_profile"
+    assert route_cache.get_cached_route(message) is None
+
+
+def test_traffic_log_is_rotated(monkeypatch, tmp_path):
+    log = tmp_path / "traffic.jsonl"
+    monkeypatch.setattr(intent_classifier, "TRAFFIC_LOG_PATH", str(log))
+    monkeypatch.setattr(intent_classifier, "TRAFFIC_LOG_MAX_BYTES", 200)
+    for i in range(20):
+        intent_classifier._append_traffic_log({"text": f"message number {i}", "route": "general_question"})
+    assert log.stat().st_size <= 200 + 80
+    rotated = [json.loads(line)["text"] for line in (tmp_path / "traffic.jsonl.1").read_text().splitlines()]
+    current = [json.loads(line)["text"] for line in log.read_text().splitlines()]
+    assert current[-1] == "message number 19"
+    assert [text for text, _ in intent_classifier._load_traffic_log()] == rotated + current
@@ -0,0 +1,28 @@
+import threading
+
+import agents.profile_parser
+import cache.profile_diff
+from cache import profile_cache
+
+URL = "https://www.linkedin.com/in/stale-refresh-test"
+
+
+def test_background_refresh_records_the_new_sections(monkeypatch):
+    monkeypatch.setattr(profile_cache, "PROFILE_CACHE_TTL", -1.0)
+    monkeypatch.setattr(agents.profile_parser, "PROFILE_ARTIFACTS", False)
+    recorded = threading.Event()
+    calls = []
+
+    def record_profile(profile_url, profile_text):
+        calls.append((profile_url, profile_text))
+        recorded.set()
+
+    monkeypatch.setattr(cache.profile_diff, "record_profile", record_profile)
+    profile_cache.store_profile(URL, {"fullName": "Old Name", "headline": "Old headline"})
+
+    item = profile_cache.get_profile(URL, lambda url: {"fullName": "New Name", "headline": "New headline"})
+
+    assert item["fullName"] == "Old Name"
+    assert recorded.wait(5)
+    assert calls[0][0] == URL
+    assert "New headline" in calls[0][1]
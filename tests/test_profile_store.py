@@ -0,0 +1,31 @@
+import pytest
+
+from cache import artifact_store
+from states import profile_store
+
+PROFILE = "Jane Doe\nData Scientist\n" * 50
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = artifact_store.ArtifactStore(root=str(tmp_path / "artifacts"))
+    monkeypatch.setattr(artifact_store, "_store", store)
+    profile_store._load.cache_clear()
+    yield store
+    profile_store._load.cache_clear()
+
+
+def test_attached_profile_is_read_back_and_shares_the_ingestion_artifact(store):
+    hashes = artifact_store.put_profile("https://www.linkedin.com/in/jane", profile_text=PROFILE)
+    refs = profile_store.attach_profile("thread-1", profile_text=PROFILE)
+    assert refs == {"profile_text_ref": hashes[artifact_store.FORMATTED]}
+    assert profile_store.get_profile_text(refs) == PROFILE
+    assert store.stats()["objects"] == 1
+
+
+def test_gc_keeps_held_profiles_until_released(store):
+    refs = profile_store.attach_profile("thread-1", profile_text=PROFILE)
+    assert store.gc(max_bytes=0)["removed"] == 0
+    store.release(["thread-1"])
+    assert store.gc(max_bytes=0)["removed"] == 1
+    assert store.get(refs["profile_text_ref"]) is None
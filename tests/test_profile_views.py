@@ -0,0 +1,44 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents import career_enhancer
+from agents.profile_views import build_profile_view
+
+PROFILE = """**Profile for Test User**
+
+**Headline:** Data person
+
+**Experience:**
+
+1. **Senior Engineer** at Google (2022 - Present)
+   Builds search infrastructure.
+
+2. **Data Analyst** at Meta (2019 - 2022)
+   Reporting dashboards.
+
+3. **Intern** at Acme (2018 - 2019)
+   Spreadsheets.
+
+**Top Skills:** Python, SQL"""
+
+
+def test_ai_replies_do_not_narrow_the_positions():
+    state = {
+        "profile_text": PROFILE,
+        "messages": [
+            HumanMessage(content="What stands out in my profile?"),
+            AIMessage(content="Your time as Data Analyst at Meta shows you handle metadata and skills well."),
+            HumanMessage(content="Rewrite my experience section"),
+        ],
+    }
+    _, inputs = career_enhancer._build_prompt(state)
+    view = inputs["profile_text"]
+    for title in ("Senior Engineer", "Data Analyst", "Intern"):
+        assert title in view
+    assert "Top Skills" not in view
+
+
+def test_keywords_match_whole_words_only():
+    view = build_profile_view(PROFILE, "enhance_content", "Please improve the metadata of my Acme role")
+    assert "Intern" in view
+    assert "Data Analyst" not in view and "Senior Engineer" not in view
+    assert "Skills" in build_profile_view(PROFILE, "enhance_content", "Polish my skills")
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm.rate_limiter import LLMQueueFull, LLMQueueTimeout, Scheduler, call_deadline, with_turn_deadline
+
+
+def _scheduler(rpm=60):
+    # One request per second refilled; a full bucket admits `rpm` calls at once.
+    return Scheduler({"test": {"rpm": rpm, "tpm": 1_000_000}})
+
+
+def test_aacquire_waits_without_blocking_the_loop():
+    scheduler = _scheduler(rpm=1)
+
+    async def main():
+        await scheduler.aacquire("test", "m", 1)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        with pytest.raises(LLMQueueTimeout):
+            await scheduler.aacquire("test", "m", 1, deadline=time.monotonic() + 0.3)
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 10
+    assert scheduler.stats()["test/m"]["timeouts"] == 1
+
+
+def test_aacquire_serves_lower_priority_values_first():
+    scheduler = _scheduler(rpm=60)
+    order = []
+
+    async def call(name, priority):
+        await scheduler.aacquire("test", "m", 1, priority=priority)
+        order.append(name)
+
+    async def main():
+        # Drain the bucket so the next calls queue behind the refill.
+        for _ in range(60):
+            await scheduler.aacquire("test", "m", 1)
+        low = asyncio.create_task(call("low", 4))
+        await asyncio.sleep(0)
+        high = asyncio.create_task(call("high", 0))
+        await asyncio.gather(low, high)
+
+    asyncio.run(main())
+    assert order == ["high", "low"]
+
+
+def test_aacquire_is_woken_when_a_threaded_caller_leaves_the_queue():
+    scheduler = _scheduler(rpm=60)
+    for _ in range(60):
+        scheduler.acquire("test", "m", 1)
+
+    async def main():
+        # The thread is queued first and with a lower value, so it is admitted at the next refill;
+        # the async caller only becomes the head, and learns its wait, once the thread leaves.
+        worker = threading.Thread(target=scheduler.acquire, args=("test", "m", 1, 0))
+        worker.start()
+        await asyncio.sleep(0.1)
+        start = time.monotonic()
+        await scheduler.aacquire("test", "m", 1, priority=4, deadline=time.monotonic() + 5)
+        elapsed = time.monotonic() - start
+        await asyncio.to_thread(worker.join)
+        return elapsed
+
+    assert asyncio.run(main()) < 4.0
+    assert scheduler.stats()["test/m"]["calls"] == 62
+
+
+def test_full_queue_rejects_new_calls_at_once():
+    scheduler = Scheduler({"test": {"rpm": 1, "tpm": 1_000_000}}, max_queue_depth=1)
+    scheduler.acquire("test", "m", 1)
+    waiter = threading.Thread(target=lambda: pytest.raises(LLMQueueTimeout, scheduler.acquire, "test", "m", 1,
+                                                           deadline=time.monotonic() + 0.5))
+    waiter.start()
+    time.sleep(0.1)
+    start = time.monotonic()
+    with pytest.raises(LLMQueueFull):
+        scheduler.acquire("test", "m", 1, deadline=time.monotonic() + 5)
+    assert time.monotonic() - start < 0.1
+    waiter.join()
+    assert scheduler.stats()["test/m"]["rejected"] == 1
+
+
+def test_turn_deadline_is_shared_by_every_call():
+    config = with_turn_deadline({"configurable": {"thread_id": "t", "llm_queue_timeout": 5}})
+    first = call_deadline(config)
+    time.sleep(0.01)
+    assert call_deadline(config) == first
+    assert first - time.monotonic() <= 5
+    assert call_deadline({"configurable": {}}) > first
+
+
+def test_gemini_warm_up_waits_for_the_rate_limiter(monkeypatch):
+    from types import SimpleNamespace
+
+    import llm.rate_limiter
+    import llm.registry
+
+    calls = []
+    models = SimpleNamespace(get=lambda model: calls.append(("get", model)))
+    monkeypatch.setattr(llm.registry, "_get_client", lambda config: SimpleNamespace(client=SimpleNamespace(models=models)))
+    monkeypatch.setattr(llm.rate_limiter.scheduler, "acquire",
+                        lambda provider, model, tokens, priority, deadline: calls.append(("acquire", model)))
+    llm.registry._open_connection({"provider": "google", "model": "gemini-test"})
+    assert calls == [("acquire", "gemini-test"), ("get", "gemini-test")]
@@ -0,0 +1,30 @@
+from agents import career_enhancer
+from agents.profile_views import build_profile_view
+from cache import response_cache
+
+PROFILE = """**Profile for Test User**
+
+**Headline:** Data engineer
+
+**Experience:**
+
+1. **Data Engineer** at Acme (2020 - Present)
+   Builds pipelines.
+
+**Top Skills:** Python, SQL"""
+
+
+def _key(profile_text: str, request: str) -> str:
+    view = build_profile_view(profile_text, "enhance_content", request)
+    inputs = {"conversation_history": f"User: {request}", "profile_text": view}
+    return response_cache.response_key("enhance_content", career_enhancer.PROMPT_TEMPLATE, inputs)
+
+
+def test_rescrape_keeps_answers_built_from_unchanged_sections():
+    rescraped = PROFILE.replace("Builds pipelines.", "Builds streaming pipelines.")
+    assert _key(PROFILE, "Rewrite my headline") == _key(rescraped, "Rewrite my headline")
+
+
+def test_rescrape_misses_answers_built_from_changed_sections():
+    rescraped = PROFILE.replace("Builds pipelines.", "Builds streaming pipelines.")
+    assert _key(PROFILE, "Rewrite my experience") != _key(rescraped, "Rewrite my experience")
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, StateGraph
+
+from cache import artifact_store
+from graph import retention
+from graph.checkpointer import connect, get_checkpointer
+from states import profile_store
+from states.state import GraphState
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = artifact_store.ArtifactStore(root=str(tmp_path / "artifacts"))
+    monkeypatch.setattr(artifact_store, "_store", store)
+    profile_store._load.cache_clear()
+    yield store
+    profile_store._load.cache_clear()
+
+
+@pytest.fixture
+def db(tmp_path):
+    db_path = str(tmp_path / "threads.sqlite")
+    workflow = StateGraph(GraphState)
+    workflow.add_node("reply", lambda state: {"messages": [AIMessage(content="A reply")]})
+    workflow.set_entry_point("reply")
+    workflow.add_edge("reply", END)
+    checkpointer = get_checkpointer(db_path)
+    yield db_path, workflow.compile(checkpointer=checkpointer)
+    checkpointer.conn.close()
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _start_thread(app, thread_id: str, turns: int = 1) -> None:
+    app.update_state(_config(thread_id), profile_store.attach_profile(thread_id, profile_text=f"Profile of {thread_id}"))
+    for i in range(turns):
+        app.invoke({"messages": [HumanMessage(content=f"Question {i}")]}, _config(thread_id))
+
+
+def _checkpoints(conn, thread_id: str) -> int:
+    return conn.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+
+
+def _holders(store) -> set:
+    return {row[0] for row in store._connect().execute("SELECT holder FROM holders")}
+
+
+def test_old_threads_are_expired_with_their_holds(db, store):
+    db_path, app = db
+    _start_thread(app, "old")
+    time.sleep(0.2)
+    cutoff = time.time()
+    time.sleep(0.2)
+    _start_thread(app, "recent")
+    recent_before = app.get_state(_config("recent")).values
+
+    conn = connect(db_path)
+    try:
+        max_age_days = (time.time() - cutoff) / 86400
+        assert retention.expire_threads(conn, max_age_days) == ["old"]
+        assert _checkpoints(conn, "old") == 0
+        assert _checkpoints(conn, "recent") > 0
+    finally:
+        conn.close()
+    assert _holders(store) == {"recent"}
+    assert store.gc(max_bytes=0)["removed"] == 1
+    assert app.get_state(_config("recent")).values == recent_before
+    assert profile_store.get_profile_text(recent_before) == "Profile of recent"
+
+
+def test_pruning_keeps_the_newest_checkpoints_and_the_thread_resumes(db, store):
+    db_path, app = db
+    _start_thread(app, "busy", turns=5)
+    _start_thread(app, "quiet", turns=1)
+    busy_before = app.get_state(_config("busy")).values
+
+    conn = connect(db_path)
+    try:
+        quiet_checkpoints = _checkpoints(conn, "quiet")
+        assert _checkpoints(conn, "busy") > 3
+        retention.prune_checkpoints(conn, keep_last=3)
+        assert _checkpoints(conn, "busy") == 3
+        assert _checkpoints(conn, "quiet") == min(quiet_checkpoints, 3)
+        assert conn.execute(
+            "SELECT COUNT(*) FROM writes WHERE checkpoint_id NOT IN (SELECT checkpoint_id FROM checkpoints)"
+        ).fetchone()[0] == 0
+    finally:
+        conn.close()
+
+    assert app.get_state(_config("busy")).values == busy_before
+    app.invoke({"messages": [HumanMessage(content="One more question")]}, _config("busy"))
+    messages = app.get_state(_config("busy")).values["messages"]
+    assert len(messages) == len(busy_before["messages"]) + 2
+    assert messages[-1].content == "A reply"
+
+
+def test_run_retention_leaves_recent_threads_untouched(db, store):
+    db_path, app = db
+    _start_thread(app, "recent", turns=2)
+    before = app.get_state(_config("recent")).values
+
+    report = retention.run_retention(db_path, keep_last=20, max_age_days=90)
+
+    assert report["threads_expired"] == 0
+    assert report["checkpoints_deleted"] == 0
+    assert report["vacuum"] == "incremental"
+    assert app.get_state(_config("recent")).values == before
+    assert _holders(store) == {"recent"}
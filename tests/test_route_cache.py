@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from cache import route_cache
+from cache.sqlite_cache import SqliteCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    def make(ttl_seconds=None, max_entries=None):
+        cache = SqliteCache("route_cache", path=str(tmp_path / "cache.sqlite"), ttl_seconds=ttl_seconds,
+                            max_entries=max_entries)
+        monkeypatch.setattr(route_cache, "_cache", cache)
+        return cache
+
+    return make
+
+
+def test_equivalent_messages_share_a_route(cache):
+    cache()
+    route_cache.cache_route("Rewrite my About section!", "enhance_content")
+    assert route_cache.get_cached_route("  rewrite my about SECTION") == "enhance_content"
+    assert route_cache.get_cached_route("Rewrite my headline") is None
+
+
+def test_entries_expire_after_the_ttl(cache):
+    store = cache(ttl_seconds=0.2)
+    route_cache.cache_route("Analyze my profile", "analyze_profile")
+    assert route_cache.get_cached_route("Analyze my profile") == "analyze_profile"
+    time.sleep(0.3)
+    assert route_cache.get_cached_route("Analyze my profile") is None
+    assert store.stats()["entries"] == 0
+
+
+def test_the_least_recently_used_entry_is_evicted(cache):
+    store = cache(max_entries=2)
+    route_cache.cache_route("first", "general_question")
+    time.sleep(0.01)
+    route_cache.cache_route("second", "general_question")
+    time.sleep(0.01)
+    # Reading "first" makes "second" the least recently used
+    assert route_cache.get_cached_route("first") == "general_question"
+    time.sleep(0.01)
+    route_cache.cache_route("third", "general_question")
+
+    assert store.stats()["entries"] == 2
+    assert route_cache.get_cached_route("second") is None
+    assert route_cache.get_cached_route("first") == "general_question"
+    assert route_cache.get_cached_route("third") == "general_question"
+
+
+def test_routes_outside_the_graph_are_never_stored(cache):
+    store = cache()
+    route_cache.cache_route("Tell me a joke", "comedian")
+    assert store.stats()["entries"] == 0
+    assert route_cache.get_cached_route("Tell me a joke") is None
+
+
+def test_a_cached_route_no_longer_in_routes_is_ignored(cache):
+    store = cache()
+    # Written by an older version whose graph had this route
+    store.set(route_cache.normalize_message("Find me a job"), "job_finder")
+    rejected = route_cache.get_stats()["rejected"]
+
+    assert route_cache.get_cached_route("Find me a job") is None
+    assert route_cache.get_stats()["rejected"] == rejected + 1
+    assert store.get_entry(route_cache.normalize_message("Find me a job")) == (None, None)
@@ -0,0 +1,39 @@
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+import graph.speculation
+from graph.speculation import get_stats, make_speculative_router
+
+TOKENS = {"input_tokens": 5, "output_tokens": 7, "total_tokens": 12}
+
+
+def test_speculation_is_discarded_when_the_router_raises(monkeypatch):
+    monkeypatch.setattr(graph.speculation, "guess_route", lambda state: "general_question")
+    started, release = threading.Event(), threading.Event()
+
+    def specialist(state):
+        started.set()
+        release.wait(5)
+        return {"messages": [AIMessage(content="wasted", usage_metadata=TOKENS)]}
+
+    def failing_router(state):
+        started.wait(5)
+        raise RuntimeError("router down")
+
+    router = make_speculative_router(failing_router, {"general_question": specialist})
+    config = {"configurable": {"thread_id": "router-raises"}}
+    before = get_stats()
+
+    with pytest.raises(RuntimeError):
+        router({"messages": [HumanMessage(content="hi")]}, config)
+
+    assert "router-raises" not in graph.speculation._pending
+    release.set()
+    # The waste is recorded by a done callback in the worker thread.
+    deadline = time.monotonic() + 5
+    while get_stats()["wasted_tokens"] == before["wasted_tokens"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert get_stats()["wasted_tokens"] == before["wasted_tokens"] + TOKENS["total_tokens"]
@@ -0,0 +1,22 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from states.state import append_messages
+
+
+def test_new_messages_get_ids_without_changing_the_caller():
+    message = HumanMessage(content="hi")
+    history = append_messages([], [message])
+    assert message.id is None
+    assert history[0].id is not None and history[0].content == "hi"
+
+
+def test_resent_messages_are_ignored():
+    history = append_messages([], [AIMessage(content="hello", id="a1")])
+    assert append_messages(history, [AIMessage(content="hello", id="a1")]) is history
+    assert [m.id for m in append_messages(history, AIMessage(content="more", id="a2"))] == ["a1", "a2"]
+
+
+def test_history_is_not_changed_in_place():
+    history = [AIMessage(content="hello", id="a1")]
+    updated = append_messages(history, [HumanMessage(content="hi")])
+    assert len(history) == 1 and len(updated) == 2
@@ -0,0 +1,66 @@
+import itertools
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+import agents.router
+import graph.graph
+import graph.speculation
+import llm.rate_limiter
+import llm.registry
+from graph.streaming import ReplyStream
+
+ANSWER = "one two three four five six"
+
+
+def _app(monkeypatch, route: str, guess: str, speculative: bool):
+    monkeypatch.setattr(llm.registry, "_clients", {})
+    monkeypatch.setattr(llm.registry, "_runnables", {})
+    monkeypatch.setattr(llm.registry, "_build_client", lambda config: GenericFakeChatModel(
+        messages=itertools.cycle([AIMessage(content=ANSWER)])
+    ))
+    monkeypatch.setattr(agents.router, "_local_route", lambda message: route)
+    monkeypatch.setattr(graph.speculation, "guess_route", lambda state: guess)
+    monkeypatch.setattr(graph.graph, "SPECULATIVE_ROUTING", speculative)
+    return graph.graph.build_workflow().compile(checkpointer=InMemorySaver())
+
+
+def _stream(app, thread_id: str):
+    config = {"configurable": {"thread_id": thread_id}}
+    reply = ReplyStream(app, {"messages": [HumanMessage(content="Tell me something")]}, config)
+    chunks = list(reply)
+    return chunks, reply
+
+
+@pytest.mark.parametrize("speculative", [False, True])
+def test_reply_streams_token_by_token(monkeypatch, speculative):
+    app = _app(monkeypatch, "general_question", "general_question", speculative)
+    chunks, reply = _stream(app, f"tokens-{speculative}")
+    assert len(chunks) > 1
+    assert "".join(chunks) == ANSWER
+    assert reply.final_message().content == ANSWER
+
+
+def test_discarded_speculation_is_not_streamed(monkeypatch):
+    # The router picks analyze_profile, which answers without a model because there is no profile.
+    app = _app(monkeypatch, "analyze_profile", "general_question", True)
+    chunks, reply = _stream(app, "miss")
+    assert ANSWER not in "".join(chunks)
+    assert "".join(chunks) == reply.final_message().content
+
+
+def test_every_llm_call_of_a_turn_shares_one_deadline(monkeypatch):
+    app = _app(monkeypatch, "general_question", "general_question", False)
+    deadlines = []
+    monkeypatch.setattr(llm.rate_limiter.scheduler, "acquire",
+                        lambda provider, model, tokens, priority, deadline: deadlines.append(deadline))
+    # Route through the LLM too, so the turn makes two calls.
+    monkeypatch.setattr(agents.router, "_local_route", lambda message: None)
+    monkeypatch.setattr(llm.registry, "_build_client", lambda config: GenericFakeChatModel(
+        messages=itertools.cycle([AIMessage(content="general_question")])
+    ))
+    _stream(app, "deadline")
+    assert len(deadlines) >= 2
+    assert len(set(deadlines)) == 1